@@ -38,6 +38,10 @@
         "data/delete.xml",
         "data/booking_sequence.xml",
         "data/purchase_sequence.xml",
+        "data/product_stock_cron.xml",
+        "data/partner_balance_cron.xml",
+        "data/inventory_snapshot_cron.xml",
+        "data/item_reorder_cron.xml",
         "reports/report_placeorder.xml",
         "views/customer_view.xml",
         "views/vendor_view.xml",
@@ -46,12 +50,17 @@
         "views/unit_measure_view.xml",
         "views/item_category_view.xml",
         "views/chart_of_accounts_views.xml",
+        "views/account_daily_balance_views.xml",
+        "views/inventory_valuation_views.xml",
+        "views/movement_archive_views.xml",
+        "views/item_reorder_views.xml",
         "views/purchase_view.xml",
         "views/view__purchase_order.xml",
         "views/BOM.xml",
         "views/bom_type_view.xml",
         "views/product_views.xml",
         "views/view_manufacturing_order.xml",
+        "views/production_plan_views.xml",
         "reports/Account_balance_report.xml",
         "reports/Vendor_balance_report.xml",
         "reports/vendor_transaction_report.xml",
@@ -66,6 +75,7 @@
         "views/Sales_reciept.xml",
         "views/pos_menu_view.xml",
         "views/pos_session_view.xml",
+        "views/pos_session_accounting_views.xml",
         "views/pos_payment_method_views.xml",
         "views/idil_employee_views.xml",
         "views/Idil_employee_Salary.xml",
@@ -1,5 +1,6 @@
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools import float_compare
 
 
 # BOM Model
@@ -41,13 +42,13 @@ class BOM(models.Model):
         tracking=True,
     )
 
-    @api.depends("bom_line_ids", "bom_line_ids.Item_id")
+    @api.depends("bom_line_ids", "bom_line_ids.currency_id")
     def _compute_currency_id(self):
         for bom in self:
             currency = None
             all_same = True
             for line in bom.bom_line_ids:
-                line_currency = line.Item_id.asset_account_id.currency_id
+                line_currency = line.currency_id
                 if not currency:
                     currency = line_currency
                 elif line_currency != currency:
@@ -60,13 +61,97 @@ class BOM(models.Model):
         for bom in self:
             bom.total_cost = round(sum(line.total for line in bom.bom_line_ids), 5)
 
+    def explode(self, quantity=1.0):
+        """Return the items consumed by ``quantity`` units of this BOM.
+
+        Sub-assembly lines are exploded through the BOM of their product, so
+        only items are returned, merged per item.
+
+        :return: list of dicts with ``item_id``, ``quantity`` and
+            ``cost_price``, in BOM line order
+        """
+        self.ensure_one()
+        components = {}
+        self._explode_into(components, quantity, self)
+        return list(components.values())
+
+    def _explode_into(self, components, quantity, path):
+        for line in self.bom_line_ids:
+            line_qty = line.quantity * quantity
+            if line.sub_product_id:
+                sub_bom = line.sub_product_id.bom_id
+                if sub_bom in path:
+                    raise ValidationError(
+                        f"BOM '{self.name}' uses itself through '{line.sub_product_id.name}'."
+                    )
+                sub_bom._explode_into(components, line_qty, path | sub_bom)
+            elif line.Item_id:
+                component = components.setdefault(
+                    line.Item_id.id,
+                    {
+                        "item_id": line.Item_id.id,
+                        "quantity": 0.0,
+                        "cost_price": line.Item_id.cost_price,
+                    },
+                )
+                component["quantity"] += line_qty
+
+    @api.model
+    def where_used(self, items=None, products=None):
+        """Return the BOMs using ``items`` or ``products``, directly or
+        through sub-assemblies."""
+        return self._walk_where_used(items, products)
+
+    @api.model
+    def _propagate_component_costs(self, items=None, products=None):
+        """Refresh rolled-up costs after the cost of components changed.
+
+        Only the BOM lines found through the where-used index are touched,
+        level by level, instead of recomputing every BOM.
+        """
+        return self._walk_where_used(items, products, refresh=True)
+
+    @api.model
+    def _walk_where_used(self, items=None, products=None, refresh=False):
+        BOMLine = self.env["idil.bom.line"]
+        domain = []
+        if items:
+            domain = [("Item_id", "in", items.ids)]
+        if products:
+            product_domain = [("sub_product_id", "in", products.ids)]
+            domain = ["|"] + domain + product_domain if domain else product_domain
+        if not domain:
+            return self.browse()
+
+        lines = BOMLine.search(domain)
+        boms = self.browse()
+        while lines:
+            if refresh:
+                lines._refresh_cost_price()
+            level = lines.bom_id - boms
+            boms |= level
+            # Products costed from these BOMs are sub-assemblies of the next level.
+            parents = self.env["my_product.product"].search(
+                [("bom_id", "in", level.ids)]
+            )
+            lines = BOMLine.search(
+                [("sub_product_id", "in", parents.ids), ("bom_id", "not in", boms.ids)]
+            )
+        return boms
+
+    def _propagate_to_parents(self):
+        """Push the new total of these BOMs to the BOMs using their products."""
+        products = self.env["my_product.product"].search([("bom_id", "in", self.ids)])
+        if products:
+            self._propagate_component_costs(products=products)
+
     @api.constrains("bom_line_ids")
     def _check_uniform_currency(self):
         for bom in self:
             currencies = set()
             for line in bom.bom_line_ids:
-                if line.Item_id and line.Item_id.asset_account_id.currency_id:
-                    currencies.add(line.Item_id.asset_account_id.currency_id.id)
+                if line.currency_id:
+                    currencies.add(line.currency_id.id)
             if len(currencies) > 1:
                 raise ValidationError(
                     "All BOM line items must use the same asset account currency."
@@ -80,14 +165,22 @@ class BOMLine(models.Model):
     _description = "BOM Line"
 
     Item_id = fields.Many2one(
-        "idil.item", string="Component", required=True, tracking=True
+        "idil.item", string="Component", index=True, tracking=True
+    )
+    sub_product_id = fields.Many2one(
+        "my_product.product",
+        string="Sub-assembly",
+        index=True,
+        tracking=True,
+        help="Product made from its own BOM and used as a component.",
     )
     quantity = fields.Float(string="Quantity", digits=(16, 5), required=True)
-    # 🔹 Directly show the item's cost_price (not computed)
+    # 🔹 Cached unit cost of the component; refreshed through
+    # idil.bom._propagate_component_costs when the component cost changes.
     cost_price = fields.Float(
         string="Cost Price",
         digits=(16, 5),
-        related="Item_id.cost_price",
+        compute="_compute_cost_price",
         store=True,
         readonly=True,
         tracking=True,
@@ -98,7 +191,7 @@ class BOMLine(models.Model):
     currency_id = fields.Many2one(
         "res.currency",
         string="Currency",
-        related="Item_id.asset_account_id.currency_id",
+        compute="_compute_currency_id",
         store=True,
         readonly=True,
         tracking=True,
@@ -120,8 +213,72 @@ class BOMLine(models.Model):
             "unique(bom_id, Item_id)",
             "Item already exists in BOM lines!",
         ),
+        (
+            "unique_bom_line_sub_product",
+            "unique(bom_id, sub_product_id)",
+            "Sub-assembly already exists in BOM lines!",
+        ),
     ]
 
+    def _get_component_cost(self):
+        self.ensure_one()
+        if self.sub_product_id:
+            return self.sub_product_id.cost
+        return self.Item_id.cost_price
+
+    # Deliberately not depending on the component cost: cost changes are
+    # pushed along the where-used graph instead of through ORM triggers.
+    @api.depends("Item_id", "sub_product_id")
+    def _compute_cost_price(self):
+        for line in self:
+            line.cost_price = line._get_component_cost()
+
+    def _refresh_cost_price(self):
+        lines_by_cost = {}
+        for line in self:
+            cost = line._get_component_cost()
+            if float_compare(cost, line.cost_price, precision_digits=5):
+                lines_by_cost.setdefault(cost, self.browse())
+                lines_by_cost[cost] |= line
+        for cost, lines in lines_by_cost.items():
+            lines.write({"cost_price": cost})
+
+    @api.depends(
+        "Item_id.asset_account_id.currency_id", "sub_product_id.bom_id.currency_id"
+    )
+    def _compute_currency_id(self):
+        for line in self:
+            if line.sub_product_id:
+                line.currency_id = line.sub_product_id.bom_id.currency_id
+            else:
+                line.currency_id = line.Item_id.asset_account_id.currency_id
+
+    @api.constrains("Item_id", "sub_product_id")
+    def _check_component(self):
+        for line in self:
+            if bool(line.Item_id) == bool(line.sub_product_id):
+                raise ValidationError(
+                    "Each BOM line needs either an item or a sub-assembly, not both."
+                )
+            if not line.sub_product_id:
+                continue
+            sub_bom = line.sub_product_id.bom_id
+            if not sub_bom:
+                raise ValidationError(
+                    f"Sub-assembly '{line.sub_product_id.name}' has no BOM."
+                )
+            # A cycle exists if the sub-assembly's BOM already uses this BOM.
+            products = self.env["my_product.product"].search(
+                [("bom_id", "=", line.bom_id.id)]
+            )
+            if sub_bom == line.bom_id or sub_bom in self.env["idil.bom"].where_used(
+                products=products
+            ):
+                raise ValidationError(
+                    f"'{line.sub_product_id.name}' cannot be used in BOM "
+                    f"'{line.bom_id.name}': it would make the BOM use itself."
+                )
+
     @api.depends("cost_price", "quantity")
     def _compute_line_total(self):
         for line in self:
@@ -129,11 +286,12 @@ class BOMLine(models.Model):
 
     @api.model
     def create(self, values):
-        # Check if the item already exists in BOM lines for this BOM
+        # Check if the component already exists in BOM lines for this BOM
         existing_line = self.search(
             [
                 ("bom_id", "=", values.get("bom_id")),
                 ("Item_id", "=", values.get("Item_id")),
+                ("sub_product_id", "=", values.get("sub_product_id")),
             ],
             limit=1,
         )
@@ -146,4 +304,18 @@ class BOMLine(models.Model):
             return existing_line
         else:
             # If the item doesn't exist, proceed with normal creation
-            return super(BOMLine, self).create(values)
+            line = super(BOMLine, self).create(values)
+            line.bom_id._propagate_to_parents()
+            return line
+
+    def write(self, vals):
+        res = super(BOMLine, self).write(vals)
+        if {"quantity", "Item_id", "sub_product_id", "bom_id"} & set(vals):
+            self.bom_id._propagate_to_parents()
+        return res
+
+    def unlink(self):
+        boms = self.bom_id
+        res = super(BOMLine, self).unlink()
+        boms._propagate_to_parents()
+        return res
@@ -122,15 +122,9 @@ class Commission(models.Model):
         self._create_commission_payment_transaction_lines(payment)
 
     def _get_cash_account_balance(self):
-        self.env.cr.execute(
-            """
-               SELECT COALESCE(SUM(dr_amount), 0) - COALESCE(SUM(cr_amount), 0)
-               FROM idil_transaction_bookingline
-               WHERE account_number = %s
-           """,
-            (self.cash_account_id.id,),
+        return self.env["idil.account.daily.balance"].get_balance(
+            self.cash_account_id
         )
-        return self.env.cr.fetchone()[0]
 
     @api.depends("commission_payment_ids.amount")
     def _compute_commission_paid(self):
@@ -179,7 +173,6 @@ class Commission(models.Model):
             "transaction_date": fields.Date.today(),
             "commission_payment_id": payment.id,
         }
-        self.env["idil.transaction_bookingline"].create(debit_line_vals)
 
         # Credit line for reducing employee's commission account
         credit_line_vals = {
@@ -194,7 +187,10 @@ class Commission(models.Model):
             "transaction_date": fields.Date.today(),
             "commission_payment_id": payment.id,
         }
-        self.env["idil.transaction_bookingline"].create(credit_line_vals)
+        # Manufacturing orders have no booking to post on.
+        self.env["idil.transaction_bookingline"].create(
+            [debit_line_vals, credit_line_vals]
+        )
 
     def unlink(self):
         for rec in self:
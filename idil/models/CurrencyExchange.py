@@ -150,18 +150,7 @@ class CurrencyExchange(models.Model):
             )
 
     def _get_account_balance(self, account_id):
-        if not account_id:
-            return 0.0
-        self.env.cr.execute(
-            """
-             SELECT COALESCE(SUM(dr_amount) - SUM(cr_amount), 0) AS balance
-             FROM idil_transaction_bookingline
-             WHERE account_number = %s
-         """,
-            (account_id,),
-        )
-        result = self.env.cr.fetchone()
-        return result[0] if result else 0.0
+        return self.env["idil.account.daily.balance"].get_balance(account_id)
 
     def perform_exchange(self):
         for record in self:
@@ -179,15 +168,9 @@ class CurrencyExchange(models.Model):
                 )
 
             # Calculate the source account balance
-            self.env.cr.execute(
-                """
-                SELECT SUM(dr_amount) - SUM(cr_amount)
-                FROM idil_transaction_bookingline
-                WHERE account_number = %s
-            """,
-                (record.source_account_id.id,),
+            source_account_balance = self._get_account_balance(
+                record.source_account_id.id
             )
-            source_account_balance = self.env.cr.fetchone()[0] or 0.0
 
             # Check if there is enough balance in the source account
             if source_account_balance < record.amount:
@@ -349,15 +332,9 @@ class CurrencyExchange(models.Model):
                 )
 
             # Calculate the source account balance
-            self.env.cr.execute(
-                """
-                SELECT SUM(dr_amount) - SUM(cr_amount)
-                FROM idil_transaction_bookingline
-                WHERE account_number = %s
-            """,
-                (record.source_account_id.id,),
+            source_account_balance = self._get_account_balance(
+                record.source_account_id.id
             )
-            source_account_balance = self.env.cr.fetchone()[0] or 0.0
 
             # Check if there is enough balance in the source account
             if source_account_balance < record.amount:
@@ -232,71 +232,62 @@ class CustomerSaleReturn(models.Model):
                         )
                         # Create transaction booking lines for the reversed booking
                         # Credit entry Expanses inventory of COGS account for the product
-                        self.env["idil.transaction_bookingline"].create(
-                            {
-                                "transaction_booking_id": reversed_booking.id,
-                                "description": f"Reversal of -- COGS for - {product.name}",
-                                "product_id": product.id,
-                                "account_number": product.account_cogs_id.id,
-                                # Use the COGS Account_number
-                                "transaction_type": "cr",
-                                "dr_amount": 0,
-                                "cr_amount": product_cost_amount,
-                                "transaction_date": rec.return_date,
-                                "company_id": self.env.company.id,
-                                "customer_sales_return_id": line.id,
-                                # Include other necessary fields
-                            }
-                        )
-                        # Credit entry asset inventory account of the product
-                        self.env["idil.transaction_bookingline"].create(
-                            {
-                                "transaction_booking_id": reversed_booking.id,
-                                "description": f"Reversal of -- Asset Inventory for - {product.name}",
-                                "product_id": product.id,
-                                "account_number": product.asset_account_id.id,
-                                "transaction_type": "dr",
-                                "dr_amount": product_cost_amount,
-                                "cr_amount": 0,
-                                "transaction_date": rec.return_date,
-                                "company_id": self.env.company.id,
-                                "customer_sales_return_id": line.id,
-                                # Include other necessary fields
-                            }
-                        )
-                        # ------------------------------------------------------------------------------------------------------
-                        # Debit entry for the order line amount Sales Account Receivable
-                        self.env["idil.transaction_bookingline"].create(
-                            {
-                                "transaction_booking_id": reversed_booking.id,
-                                "description": f"Reversal of -- Sales Receivable for - {product.name}",
-                                "product_id": product.id,
-                                "account_number": rec.sale_order_id.account_number.id,
-                                "transaction_type": "cr",  # Debit transaction
-                                "dr_amount": 0,
-                                "cr_amount": total_return_amount,
-                                "transaction_date": rec.return_date,
-                                "company_id": self.env.company.id,
-                                "customer_sales_return_id": line.id,
-                                # Include other necessary fields
-                            }
-                        )
-
-                        # Debit entry using the product's income account for the product - This is the revenue account for the product
-                        self.env["idil.transaction_bookingline"].create(
-                            {
-                                "transaction_booking_id": reversed_booking.id,
-                                "description": f"Reversal of -- Revenue - {product.name}",
-                                "product_id": product.id,
-                                "account_number": product.income_account_id.id,
-                                "transaction_type": "dr",
-                                "dr_amount": total_return_amount,
-                                "cr_amount": 0,
-                                "transaction_date": rec.return_date,
-                                "company_id": self.env.company.id,
-                                "customer_sales_return_id": line.id,
-                                # Include other necessary fields
-                            }
+                        reversed_booking.post_lines(
+                            [
+                                {
+                                    "description": f"Reversal of -- COGS for - {product.name}",
+                                    "product_id": product.id,
+                                    "account_number": product.account_cogs_id.id,
+                                    # Use the COGS Account_number
+                                    "transaction_type": "cr",
+                                    "dr_amount": 0,
+                                    "cr_amount": product_cost_amount,
+                                    "transaction_date": rec.return_date,
+                                    "company_id": self.env.company.id,
+                                    "customer_sales_return_id": line.id,
+                                    # Include other necessary fields
+                                },
+                                # Credit entry asset inventory account of the product
+                                {
+                                    "description": f"Reversal of -- Asset Inventory for - {product.name}",
+                                    "product_id": product.id,
+                                    "account_number": product.asset_account_id.id,
+                                    "transaction_type": "dr",
+                                    "dr_amount": product_cost_amount,
+                                    "cr_amount": 0,
+                                    "transaction_date": rec.return_date,
+                                    "company_id": self.env.company.id,
+                                    "customer_sales_return_id": line.id,
+                                    # Include other necessary fields
+                                },
+                                # ------------------------------------------------------------------------------------------------------
+                                # Debit entry for the order line amount Sales Account Receivable
+                                {
+                                    "description": f"Reversal of -- Sales Receivable for - {product.name}",
+                                    "product_id": product.id,
+                                    "account_number": rec.sale_order_id.account_number.id,
+                                    "transaction_type": "cr",  # Debit transaction
+                                    "dr_amount": 0,
+                                    "cr_amount": total_return_amount,
+                                    "transaction_date": rec.return_date,
+                                    "company_id": self.env.company.id,
+                                    "customer_sales_return_id": line.id,
+                                    # Include other necessary fields
+                                },
+                                # Debit entry using the product's income account for the product - This is the revenue account for the product
+                                {
+                                    "description": f"Reversal of -- Revenue - {product.name}",
+                                    "product_id": product.id,
+                                    "account_number": product.income_account_id.id,
+                                    "transaction_type": "dr",
+                                    "dr_amount": total_return_amount,
+                                    "cr_amount": 0,
+                                    "transaction_date": rec.return_date,
+                                    "company_id": self.env.company.id,
+                                    "customer_sales_return_id": line.id,
+                                    # Include other necessary fields
+                                },
+                            ]
                         )
 
                         if total_return_amount > 0:
@@ -161,27 +161,26 @@ class IdilEmployeeSalaryAdvance(models.Model):
             })
 
             # Create a Transaction Booking Line for the debit entry (Salary Advance Expense)
-            self.env['idil.transaction_bookingline'].create({
-                'transaction_booking_id': transaction_booking.id,
-                'employee_salary_advance_id': record.id,
-                'description': 'Salary Advance Approved',
-                'account_number': salary_advance_expense_account.id,
-                'transaction_type': 'dr',
-                'dr_amount': record.advance_amount,
-                'cr_amount': 0,
-                'transaction_date': record.request_date,
-            })
-
-            self.env['idil.transaction_bookingline'].create({
-                'transaction_booking_id': transaction_booking.id,
-                'employee_salary_advance_id': record.id,
-                'description': 'Salary Advance Paid',
-                'account_number': record.account_id.id,
-                'transaction_type': 'cr',
-                'cr_amount': record.advance_amount,
-                'dr_amount': 0,
-                'transaction_date': record.request_date,
-            })
+            transaction_booking.post_lines([
+                {
+                    'employee_salary_advance_id': record.id,
+                    'description': 'Salary Advance Approved',
+                    'account_number': salary_advance_expense_account.id,
+                    'transaction_type': 'dr',
+                    'dr_amount': record.advance_amount,
+                    'cr_amount': 0,
+                    'transaction_date': record.request_date,
+                },
+                {
+                    'employee_salary_advance_id': record.id,
+                    'description': 'Salary Advance Paid',
+                    'account_number': record.account_id.id,
+                    'transaction_type': 'cr',
+                    'cr_amount': record.advance_amount,
+                    'dr_amount': 0,
+                    'transaction_date': record.request_date,
+                },
+            ])
 
             record.state = 'approved'
 
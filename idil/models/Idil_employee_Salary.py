@@ -329,36 +329,33 @@ class IdilEmployeeSalary(models.Model):
         )
 
         # Create transaction booking lines
-        self.env["idil.transaction_bookingline"].create(
-            {
-                "transaction_booking_id": transaction_booking.id,
-                "employee_salary_id": record.id,
-                "description": "Salary Payment of - "
-                + record.salary_date.strftime("%Y-%m")
-                + " for - "
-                + record.employee_id.name,
-                "account_number": salary_expense_account.id,  # Debit salary expense account
-                "transaction_type": "dr",
-                "dr_amount": record.total_salary,
-                "cr_amount": 0,
-                "transaction_date": record.salary_date,
-            }
-        )
-
-        self.env["idil.transaction_bookingline"].create(
-            {
-                "transaction_booking_id": transaction_booking.id,
-                "employee_salary_id": record.id,
-                "description": "Salary Payment of - "
-                + record.salary_date.strftime("%Y-%m")
-                + " for - "
-                + record.employee_id.name,
-                "account_number": credit_account.id,  # Credit the advance account
-                "transaction_type": "cr",
-                "dr_amount": 0,
-                "cr_amount": record.total_salary,
-                "transaction_date": record.salary_date,
-            }
+        transaction_booking.post_lines(
+            [
+                {
+                    "employee_salary_id": record.id,
+                    "description": "Salary Payment of - "
+                    + record.salary_date.strftime("%Y-%m")
+                    + " for - "
+                    + record.employee_id.name,
+                    "account_number": salary_expense_account.id,  # Debit salary expense account
+                    "transaction_type": "dr",
+                    "dr_amount": record.total_salary,
+                    "cr_amount": 0,
+                    "transaction_date": record.salary_date,
+                },
+                {
+                    "employee_salary_id": record.id,
+                    "description": "Salary Payment of - "
+                    + record.salary_date.strftime("%Y-%m")
+                    + " for - "
+                    + record.employee_id.name,
+                    "account_number": credit_account.id,  # Credit the advance account
+                    "transaction_type": "cr",
+                    "dr_amount": 0,
+                    "cr_amount": record.total_salary,
+                    "transaction_date": record.salary_date,
+                },
+            ]
         )
 
     @api.depends(
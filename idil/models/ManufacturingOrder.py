@@ -96,6 +96,13 @@ class ManufacturingOrder(models.Model):
     transaction_booking_id = fields.Many2one(
         "idil.transaction_booking", string="Transaction Booking", readonly=True
     )
+    production_plan_id = fields.Many2one(
+        "idil.production.plan",
+        string="Production Plan",
+        readonly=True,
+        index=True,
+        ondelete="restrict",
+    )
     # Currency fields
     currency_id = fields.Many2one(
         "res.currency",
@@ -286,13 +293,14 @@ class ManufacturingOrder(models.Model):
 
         # Mapping of BOM item IDs to their quantities for easy lookup
         bom_quantities = {
-            line.Item_id.id: line.quantity for line in self.bom_id.bom_line_ids
+            component["item_id"]: component["quantity"]
+            for component in self.bom_id.explode(self.product_qty)
         }
 
         for line in self.manufacturing_order_line_ids:
             if line.item_id.id in bom_quantities:
-                # Calculate the new quantity for this item based on the product_qty
-                new_quantity = bom_quantities[line.item_id.id] * self.product_qty
+                # New quantity for this item based on the product_qty
+                new_quantity = bom_quantities[line.item_id.id]
 
                 # Update the line's quantity directly. Since we're in an onchange method,
                 # these changes are temporary and reflected in the UI.
@@ -343,328 +351,309 @@ class ManufacturingOrder(models.Model):
 
         # Load BOM lines into manufacturing order lines
         commands = [(5, 0, 0)]  # Clear old lines
-        for bom_line in self.bom_id.bom_line_ids:
+        for component in self.bom_id.explode():
             commands.append(
                 (
                     0,
                     0,
                     {
-                        "item_id": bom_line.Item_id.id,
-                        "quantity": bom_line.quantity,
-                        "quantity_bom": bom_line.quantity,
-                        "cost_price": bom_line.Item_id.cost_price,
+                        "item_id": component["item_id"],
+                        "quantity": component["quantity"],
+                        "quantity_bom": component["quantity"],
+                        "cost_price": component["cost_price"],
                     },
                 )
             )
         self.manufacturing_order_line_ids = commands
 
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         try:
             with self.env.cr.savepoint():
-                _logger.info("Creating Manufacturing Order with values: %s", vals)
-
-                # Check BOM and product setup
-                if "bom_id" in vals:
-                    bom = self.env["idil.bom"].browse(vals["bom_id"])
-                    if bom and bom.product_id:
-                        vals["product_id"] = bom.product_id.id
-                        product = bom.product_id
-                        if product.account_id and not vals.get(
-                            "commission_employee_id"
-                        ):
-                            raise ValidationError(
-                                "The product has a commission account but no employee is selected."
-                            )
+                for vals in vals_list:
+                    _logger.info("Creating Manufacturing Order with values: %s", vals)
+
+                    # Check BOM and product setup
+                    if "bom_id" in vals:
+                        bom = self.env["idil.bom"].browse(vals["bom_id"])
+                        if bom and bom.product_id:
+                            vals["product_id"] = bom.product_id.id
+                            product = bom.product_id
+                            if product.account_id and not vals.get(
+                                "commission_employee_id"
+                            ):
+                                raise ValidationError(
+                                    "The product has a commission account but no employee is selected."
+                                )
 
-                # Set order reference if not provided
-                if "name" not in vals or not vals["name"]:
-                    vals["name"] = self._generate_order_reference(vals)
+                    # Set order reference if not provided
+                    if "name" not in vals or not vals["name"]:
+                        vals["name"] = self._generate_order_reference(vals)
 
-                # Set status to done
-                vals["status"] = "done"
+                    # Set status to done
+                    vals["status"] = "done"
 
-                # Create order
-                order = super(ManufacturingOrder, self).create(vals)
+                # Create orders
+                orders = super(ManufacturingOrder, self).create(vals_list)
+                orders._post_manufacturing_orders()
+
+                return orders
+        except Exception as e:
+            _logger.error(f"Create transaction failed: {str(e)}")
+            raise ValidationError(f"Transaction failed: {str(e)}")
 
-                # Ensure valid asset accounts
-                if not order.product_id.asset_account_id:
+    def _post_manufacturing_orders(self):
+        """Book the accounting, stock movements and commission of newly
+        created orders."""
+        for order in self:
+            # Ensure valid asset accounts
+            if not order.product_id.asset_account_id:
+                raise ValidationError(
+                    f"The product '{order.product_id.name}' does not have a valid asset account."
+                )
+            for line in order.manufacturing_order_line_ids:
+                if not line.item_id.asset_account_id:
                     raise ValidationError(
-                        f"The product '{order.product_id.name}' does not have a valid asset account."
+                        f"The item '{line.item_id.name}' does not have a valid asset account."
                     )
-                for line in order.manufacturing_order_line_ids:
-                    if not line.item_id.asset_account_id:
-                        raise ValidationError(
-                            f"The item '{line.item_id.name}' does not have a valid asset account."
-                        )
 
-                # Check if asset account balance is sufficient
-                for line in order.manufacturing_order_line_ids:
-                    item_account_balance = self._get_account_balance(
-                        line.item_id.asset_account_id.id
+            # Check if asset account balances are sufficient
+            # (production plans check their aggregated needs up front)
+            if not self.env.context.get("production_plan_checked"):
+                order._check_item_account_balances()
+
+            # Create transaction booking record
+            transaction_booking = self.env["idil.transaction_booking"].create(
+                {
+                    "transaction_number": self.env["ir.sequence"].next_by_code(
+                        "idil.transaction_booking"
+                    ),
+                    "reffno": order.name,
+                    "rate": order.rate,
+                    "manufacturing_order_id": order.id,
+                    "order_number": order.name,
+                    "amount": order.product_cost,
+                    "trx_date": order.scheduled_start_date,
+                    "payment_status": "paid",
+                }
+            )
+
+            if order.manufacturing_order_line_ids and order.rate <= 0:
+                raise ValidationError("Rate cannot be zero")
+
+            # Get clearing accounts
+            product_currency = order.product_id.asset_account_id.currency_id
+            clearing_accounts = self._get_clearing_accounts(
+                order.manufacturing_order_line_ids.mapped(
+                    "item_id.asset_account_id.currency_id"
+                )
+                | product_currency
+            )
+            target_clearing_account = clearing_accounts.get(product_currency.id)
+
+            # Collect the booking lines and post them as one entry
+            line_vals = []
+            for line in order.manufacturing_order_line_ids:
+                cost_amount_usd = line.cost_price * line.quantity
+                cost_amount_sos = cost_amount_usd * order.rate
+
+                source_clearing_account = clearing_accounts.get(
+                    line.item_id.asset_account_id.currency_id.id
+                )
+
+                if not source_clearing_account or not target_clearing_account:
+                    raise ValidationError(
+                        "Exchange clearing accounts are required for currency conversion."
                     )
-                    required_balance = line.cost_price * line.quantity
-                    if item_account_balance < required_balance:
-                        raise ValidationError(
-                            f"Insufficient balance in account for item '{line.item_id.name}'. "
-                            f"Required: {required_balance}, Available: {item_account_balance}"
-                        )
 
-                # Create transaction booking record
-                transaction_booking = self.env["idil.transaction_booking"].create(
+                # Debit line for increasing product stock
+                line_vals.append(
                     {
-                        "transaction_number": self.env["ir.sequence"].next_by_code(
-                            "idil.transaction_booking"
-                        ),
-                        "reffno": order.name,
-                        "rate": order.rate,
-                        "manufacturing_order_id": order.id,
-                        "order_number": order.name,
-                        "amount": order.product_cost,
-                        "trx_date": order.scheduled_start_date,
-                        "payment_status": "paid",
+                        "description": "Manufacturing Order Transaction - Debit",
+                        "item_id": line.item_id.id,
+                        "product_id": order.product_id.id,
+                        "account_number": order.product_id.asset_account_id.id,
+                        "transaction_type": "dr",
+                        "dr_amount": float(cost_amount_sos),
+                        "cr_amount": 0.0,
+                        "transaction_date": order.scheduled_start_date,
                     }
                 )
 
-                # Create transaction booking lines individually
-                for line in order.manufacturing_order_line_ids:
-                    if order.rate <= 0:
-                        raise ValidationError("Rate cannot be zero")
-
-                    cost_amount_usd = line.cost_price * line.quantity
-                    cost_amount_sos = cost_amount_usd * order.rate
-
-                    # Get clearing accounts
-                    source_clearing_account = self.env["idil.chart.account"].search(
-                        [
-                            ("name", "=", "Exchange Clearing Account"),
-                            (
-                                "currency_id",
-                                "=",
-                                line.item_id.asset_account_id.currency_id.id,
-                            ),
-                        ],
-                        limit=1,
-                    )
-                    target_clearing_account = self.env["idil.chart.account"].search(
-                        [
-                            ("name", "=", "Exchange Clearing Account"),
-                            (
-                                "currency_id",
-                                "=",
-                                order.product_id.asset_account_id.currency_id.id,
-                            ),
-                        ],
-                        limit=1,
-                    )
+                # Credit target clearing account for currency adjustment
+                line_vals.append(
+                    {
+                        "description": "Manufacturing Order Transaction Exchange - Credit",
+                        "item_id": line.item_id.id,
+                        "product_id": order.product_id.id,
+                        "account_number": target_clearing_account.id,
+                        "transaction_type": "cr",
+                        "dr_amount": 0.0,
+                        "cr_amount": float(cost_amount_sos),
+                        "transaction_date": order.scheduled_start_date,
+                    }
+                )
 
-                    if not source_clearing_account or not target_clearing_account:
-                        raise ValidationError(
-                            "Exchange clearing accounts are required for currency conversion."
-                        )
+                # Debit source clearing account for currency adjustment
+                line_vals.append(
+                    {
+                        "description": "Manufacturing Order Transaction Exchange - Debit",
+                        "item_id": line.item_id.id,
+                        "product_id": order.product_id.id,
+                        "account_number": source_clearing_account.id,
+                        "transaction_type": "dr",
+                        "dr_amount": float(line.row_total),
+                        "cr_amount": 0.0,
+                        "transaction_date": order.scheduled_start_date,
+                    }
+                )
 
-                    # Debit line for increasing product stock
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "description": "Manufacturing Order Transaction - Debit",
-                            "item_id": line.item_id.id,
-                            "product_id": order.product_id.id,
-                            "account_number": order.product_id.asset_account_id.id,
-                            "transaction_type": "dr",
-                            "dr_amount": float(cost_amount_sos),
-                            "cr_amount": 0.0,
-                            "transaction_date": order.scheduled_start_date,
-                        }
-                    )
+                # Credit item asset account to decrease stock in USD
+                line_vals.append(
+                    {
+                        "description": "Manufacturing Order Transaction - Credit",
+                        "item_id": line.item_id.id,
+                        "product_id": order.product_id.id,
+                        "account_number": line.item_id.asset_account_id.id,
+                        "transaction_type": "cr",
+                        "dr_amount": 0.0,
+                        "cr_amount": float(line.row_total),
+                        "transaction_date": order.scheduled_start_date,
+                    }
+                )
+            # Calculate commission amount for this order using the order and its lines
+            # commission_amount = self._calculate_commission_amount(order)
 
-                    # Credit target clearing account for currency adjustment
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "description": "Manufacturing Order Transaction Exchange - Credit",
-                            "item_id": line.item_id.id,
-                            "product_id": order.product_id.id,
-                            "account_number": target_clearing_account.id,
-                            "transaction_type": "cr",
-                            "dr_amount": 0.0,
-                            "cr_amount": float(cost_amount_sos),
-                            "transaction_date": order.scheduled_start_date,
-                        }
+            if order.commission_amount > 0:
+                _logger.info(
+                    f"Creating commission booking lines for MO {order.name} amount: {order.commission_amount}"
+                )
+                # Validate accounts
+                if not order.product_id.account_id:
+                    raise ValidationError(
+                        f"The product '{order.product_id.name}' does not have a valid commission account."
                     )
-
-                    # Debit source clearing account for currency adjustment
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "description": "Manufacturing Order Transaction Exchange - Debit",
-                            "item_id": line.item_id.id,
-                            "product_id": order.product_id.id,
-                            "account_number": source_clearing_account.id,
-                            "transaction_type": "dr",
-                            "dr_amount": float(line.row_total),
-                            "cr_amount": 0.0,
-                            "transaction_date": order.scheduled_start_date,
-                        }
+                if not order.commission_employee_id.account_id:
+                    raise ValidationError(
+                        f"Commission employee '{order.commission_employee_id.name}' does not have a valid account."
                     )
-
-                    # Credit item asset account to decrease stock in USD
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "description": "Manufacturing Order Transaction - Credit",
-                            "item_id": line.item_id.id,
-                            "product_id": order.product_id.id,
-                            "account_number": line.item_id.asset_account_id.id,
-                            "transaction_type": "cr",
-                            "dr_amount": 0.0,
-                            "cr_amount": float(line.row_total),
-                            "transaction_date": order.scheduled_start_date,
-                        }
+                if (
+                    order.product_id.account_id.currency_id
+                    != order.commission_employee_id.account_id.currency_id
+                ):
+                    raise ValidationError(
+                        f"The currency for the product's account and the employee's commission account must be the same."
                     )
-                # Calculate commission amount for this order using the order and its lines
-                # commission_amount = self._calculate_commission_amount(order)
 
-                if order.commission_amount > 0:
-                    _logger.info(
-                        f"Creating commission booking lines for MO {order.name} amount: {order.commission_amount}"
-                    )
-                    # Validate accounts
-                    if not order.product_id.account_id:
-                        raise ValidationError(
-                            f"The product '{order.product_id.name}' does not have a valid commission account."
-                        )
-                    if not order.commission_employee_id.account_id:
-                        raise ValidationError(
-                            f"Commission employee '{order.commission_employee_id.name}' does not have a valid account."
-                        )
-                    if (
-                        order.product_id.account_id.currency_id
-                        != order.commission_employee_id.account_id.currency_id
-                    ):
-                        raise ValidationError(
-                            f"The currency for the product's account and the employee's commission account must be the same."
-                        )
+                _logger.info(
+                    f"Transaction booking ID: {transaction_booking.id}, "
+                    f"Product commission account: {order.product_id.account_id.name} (ID: {order.product_id.account_id.id}), "
+                    f"Employee commission account: {order.commission_employee_id.account_id.name} (ID: {order.commission_employee_id.account_id.id}), "
+                    f"Commission Amount: {order.commission_amount}"
+                )
 
-                    _logger.info(
-                        f"Transaction booking ID: {transaction_booking.id}, "
-                        f"Product commission account: {order.product_id.account_id.name} (ID: {order.product_id.account_id.id}), "
-                        f"Employee commission account: {order.commission_employee_id.account_id.name} (ID: {order.commission_employee_id.account_id.id}), "
-                        f"Commission Amount: {self.commission_amount}"
-                    )
+                # Commission Expense (Debit)
+                line_vals.append(
+                    {
+                        "description": "Commission Expense",
+                        "product_id": order.product_id.id,
+                        "account_number": order.product_id.account_id.id,
+                        "transaction_type": "dr",
+                        "dr_amount": float(order.commission_amount),
+                        "cr_amount": 0.0,
+                        "transaction_date": order.scheduled_start_date,
+                    }
+                )
 
-                    # Commission Expense (Debit)
-                    expense_line = self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "description": "Commission Expense",
-                            "product_id": order.product_id.id,
-                            "account_number": order.product_id.account_id.id,
-                            "transaction_type": "dr",
-                            "dr_amount": float(order.commission_amount),
-                            "cr_amount": 0.0,
-                            "transaction_date": order.scheduled_start_date,
-                        }
-                    )
-                    _logger.info(
-                        f"Commission Expense booking line created: ID={expense_line.id}, "
-                        f"Account={order.product_id.account_id.name} (ID: {order.product_id.account_id.id}), "
-                        f"DR={self.commission_amount}, CR=0.0"
-                    )
+                # Commission Liability (Credit)
+                line_vals.append(
+                    {
+                        "description": "Commission Liability",
+                        "product_id": order.product_id.id,
+                        "account_number": order.commission_employee_id.account_id.id,
+                        "transaction_type": "cr",
+                        "dr_amount": 0.0,
+                        "cr_amount": float(order.commission_amount),
+                        "transaction_date": order.scheduled_start_date,
+                    }
+                )
 
-                    # Commission Liability (Credit)
-                    liability_line = self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "description": "Commission Liability",
-                            "product_id": order.product_id.id,
-                            "account_number": order.commission_employee_id.account_id.id,
-                            "transaction_type": "cr",
-                            "dr_amount": 0.0,
-                            "cr_amount": float(order.commission_amount),
-                            "transaction_date": order.scheduled_start_date,
-                        }
-                    )
-                    _logger.info(
-                        f"Commission Liability booking line created: ID={liability_line.id}, "
-                        f"Account={order.commission_employee_id.account_id.name} (ID: {order.commission_employee_id.account_id.id}), "
-                        f"DR=0.0, CR={self.commission_amount}"
-                    )
+            # Entries with exchange clearing legs are posted unchecked; the
+            # currency conversion is reconciled on the clearing accounts.
+            transaction_booking.post_lines(line_vals, check_balance=False)
+
+            if order.bom_id and order.bom_id.product_id:
+                product = order.bom_id.product_id
+                previous_qty = product.stock_quantity or 0.0
+                previous_cost = product.actual_cost or 0.0
+                new_qty = order.product_qty or 0.0
+                new_total_cost = order.product_cost or 0.0
+
+                # Update stock first
+                total_qty = previous_qty + new_qty
+                if total_qty > 0:
+                    # Weighted average cost calculation
+                    new_average_cost = (
+                        (previous_qty * previous_cost) + new_total_cost
+                    ) / total_qty
+                else:
+                    new_average_cost = 0.0
 
-                if order.bom_id and order.bom_id.product_id:
-                    product = order.bom_id.product_id
-                    previous_qty = product.stock_quantity or 0.0
-                    previous_cost = product.actual_cost or 0.0
-                    new_qty = order.product_qty or 0.0
-                    new_total_cost = order.product_cost or 0.0
-
-                    # Update stock first
-                    total_qty = previous_qty + new_qty
-                    if total_qty > 0:
-                        # Weighted average cost calculation
-                        new_average_cost = (
-                            (previous_qty * previous_cost) + new_total_cost
-                        ) / total_qty
-                    else:
-                        new_average_cost = 0.0
-
-                    # Write both cost and actual_cost
-                    product.write(
-                        {
-                            # "stock_quantity": total_qty,
-                            "actual_cost": new_average_cost,
-                        }
-                    )
+                # Write both cost and actual_cost
+                product.write(
+                    {
+                        # "stock_quantity": total_qty,
+                        "actual_cost": new_average_cost,
+                    }
+                )
 
-                # Adjust stock levels for items used in manufacturing
-
-                # Create commission record and link it to manufacturing order
-                if order.commission_amount > 0:
-                    commission = self.env["idil.commission"].create(
-                        {
-                            "manufacturing_order_id": order.id,
-                            "employee_id": order.commission_employee_id.id,
-                            "commission_amount": order.commission_amount,
-                            "commission_paid": 0,
-                            "payment_status": "pending",
-                            "commission_remaining": order.commission_amount,
-                            "date": order.scheduled_start_date,
-                        }
-                    )
-                    order.write({"commission_id": commission.id})
+            # Adjust stock levels for items used in manufacturing
 
-                # Create product movement record
-                self.env["idil.product.movement"].create(
+            # Create commission record and link it to manufacturing order
+            if order.commission_amount > 0:
+                commission = self.env["idil.commission"].create(
                     {
-                        "product_id": order.product_id.id,
-                        "movement_type": "in",
                         "manufacturing_order_id": order.id,
-                        "quantity": order.product_qty,
+                        "employee_id": order.commission_employee_id.id,
+                        "commission_amount": order.commission_amount,
+                        "commission_paid": 0,
+                        "payment_status": "pending",
+                        "commission_remaining": order.commission_amount,
                         "date": order.scheduled_start_date,
-                        "source_document": order.name,
                     }
                 )
+                order.write({"commission_id": commission.id})
+
+            # Create product movement record
+            self.env["idil.product.movement"].create(
+                {
+                    "product_id": order.product_id.id,
+                    "movement_type": "in",
+                    "manufacturing_order_id": order.id,
+                    "quantity": order.product_qty,
+                    "date": order.scheduled_start_date,
+                    "source_document": order.name,
+                }
+            )
 
-                for line in order.manufacturing_order_line_ids:
-                    self.env["idil.item.movement"].create(
-                        {
-                            "item_id": line.item_id.id,
-                            "date": order.scheduled_start_date,
-                            "manufacturing_order_line_id": line.id,
-                            "manufacturing_order_id": order.id,
-                            "quantity": -line.quantity,  # consume from Inventory
-                            "source": "Inventory",
-                            "destination": "Manufacturing",
-                            "movement_type": "out",
-                            "related_document": f"idil.manufacturing.order.line,{line.id}",
-                            "transaction_number": order.name,
-                        }
-                    )
-
-                return order
-        except Exception as e:
-            _logger.error(f"Create transaction failed: {str(e)}")
-            raise ValidationError(f"Transaction failed: {str(e)}")
+            # One create so the stock check sees every consumed item at once
+            self.env["idil.item.movement"].create(
+                [
+                    {
+                        "item_id": line.item_id.id,
+                        "date": order.scheduled_start_date,
+                        "manufacturing_order_line_id": line.id,
+                        "manufacturing_order_id": order.id,
+                        "quantity": -line.quantity,  # consume from Inventory
+                        "source": "Inventory",
+                        "destination": "Manufacturing",
+                        "movement_type": "out",
+                        "related_document": f"idil.manufacturing.order.line,{line.id}",
+                        "transaction_number": order.name,
+                    }
+                    for line in order.manufacturing_order_line_ids
+                ]
+            )
 
     @api.model
     def write(self, vals):
@@ -751,6 +740,19 @@ class ManufacturingOrder(models.Model):
                             }
                         )
 
+                        product_currency = (
+                            order.product_id.asset_account_id.currency_id
+                        )
+                        clearing_accounts = self._get_clearing_accounts(
+                            order.manufacturing_order_line_ids.mapped(
+                                "item_id.asset_account_id.currency_id"
+                            )
+                            | product_currency
+                        )
+                        target_clearing_account = clearing_accounts.get(
+                            product_currency.id
+                        )
+
                         # --- Loop each MO line ---
                         for line in order.manufacturing_order_line_ids:
                             cost_usd = line.cost_price * line.quantity
@@ -781,19 +783,6 @@ class ManufacturingOrder(models.Model):
                             # (Optionally create if missing)
 
                             # 2. Target clearing account (Credit)
-                            target_clearing_account = self.env[
-                                "idil.chart.account"
-                            ].search(
-                                [
-                                    ("name", "=", "Exchange Clearing Account"),
-                                    (
-                                        "currency_id",
-                                        "=",
-                                        order.product_id.asset_account_id.currency_id.id,
-                                    ),
-                                ],
-                                limit=1,
-                            )
                             if target_clearing_account:
                                 bl = self.env["idil.transaction_bookingline"].search(
                                     [
@@ -818,18 +807,8 @@ class ManufacturingOrder(models.Model):
                                     )
 
                             # 3. Source clearing account (Debit)
-                            source_clearing_account = self.env[
-                                "idil.chart.account"
-                            ].search(
-                                [
-                                    ("name", "=", "Exchange Clearing Account"),
-                                    (
-                                        "currency_id",
-                                        "=",
-                                        line.item_id.asset_account_id.currency_id.id,
-                                    ),
-                                ],
-                                limit=1,
+                            source_clearing_account = clearing_accounts.get(
+                                line.item_id.asset_account_id.currency_id.id
                             )
                             if source_clearing_account:
                                 bl = self.env["idil.transaction_bookingline"].search(
@@ -960,18 +939,48 @@ class ManufacturingOrder(models.Model):
             _logger.error(f"Create transaction failed: {str(e)}")
             raise ValidationError(f"Transaction failed: {str(e)}")
 
-    def _get_account_balance(self, account_id):
-        """Calculate the balance for an account."""
-        self.env.cr.execute(
-            """
-                    SELECT COALESCE(SUM(dr_amount) - SUM(cr_amount), 0) as balance
-                    FROM idil_transaction_bookingline
-                    WHERE account_number = %s
-                """,
-            (account_id,),
+    def _get_clearing_accounts(self, currencies):
+        """Return ``{currency_id: Exchange Clearing Account}`` with one search."""
+        accounts = self.env["idil.chart.account"].search(
+            [
+                ("name", "=", "Exchange Clearing Account"),
+                ("currency_id", "in", currencies.ids),
+            ]
         )
-        result = self.env.cr.fetchone()
-        return result[0] if result else 0.0
+        clearing_accounts = {}
+        for account in accounts:
+            clearing_accounts.setdefault(account.currency_id.id, account)
+        return clearing_accounts
+
+    def _check_item_account_balances(self):
+        """Check that the item asset accounts cover the whole consumption.
+
+        Balances of all accounts come from one grouped query, and lines
+        sharing an asset account are checked against it together.
+        """
+        for order in self:
+            lines = order.manufacturing_order_line_ids
+            balances = self.env["idil.account.daily.balance"].get_balances(
+                lines.mapped("item_id.asset_account_id").ids
+            )
+            required = {}
+            for line in lines:
+                account = line.item_id.asset_account_id
+                required.setdefault(account, [0.0, []])
+                required[account][0] += line.cost_price * line.quantity
+                required[account][1].append(line.item_id.name)
+
+            errors = []
+            for account, (required_balance, item_names) in required.items():
+                available = balances.get(account.id, 0.0)
+                if available < required_balance:
+                    errors.append(
+                        f"Insufficient balance in account '{account.name}' for item(s) "
+                        f"{', '.join(item_names)}. "
+                        f"Required: {required_balance}, Available: {available}"
+                    )
+            if errors:
+                raise ValidationError("\n".join(errors))
 
     def _generate_order_reference(self, vals):
         bom_id = vals.get("bom_id", False)
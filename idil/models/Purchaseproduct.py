@@ -133,12 +133,7 @@ class ProductPurchaseOrder(models.Model):
                                 )
                     order_ids.append(order.id)
 
-                # Step 2: Adjust stock before deletion
-                for order in self:
-                    for line in order.order_lines:
-                        product = line.product_id
-                        if product and line.quantity:
-                            product.stock_quantity -= line.quantity
+                # Step 2: Stock is reversed when the movements are deleted below
 
                 # Step 3: Delete main purchase orders
                 res = super(ProductPurchaseOrder, self).unlink()
@@ -327,33 +322,30 @@ class ProductPurchaseOrderLine(models.Model):
                     )
 
                     # Create debit line (Inventory asset)
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": booking.id,
-                            "product_purchase_order_id": order.id,
-                            "transaction_type": "dr",
-                            "dr_amount": line.amount,
-                            "cr_amount": 0,
-                            "account_number": product.asset_account_id.id,
-                            "product_id": product.id,
-                            "transaction_date": order.purchase_date,
-                            "company_id": self.env.company.id,
-                        }
-                    )
-
-                    # Create credit line (Cash or A/P)
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": booking.id,
-                            "product_purchase_order_id": order.id,
-                            "transaction_type": "cr",
-                            "dr_amount": 0,
-                            "cr_amount": line.amount,
-                            "account_number": credit_account_id.id,
-                            "product_id": product.id,
-                            "transaction_date": order.purchase_date,
-                            "company_id": self.env.company.id,
-                        }
+                    booking.post_lines(
+                        [
+                            {
+                                "product_purchase_order_id": order.id,
+                                "transaction_type": "dr",
+                                "dr_amount": line.amount,
+                                "cr_amount": 0,
+                                "account_number": product.asset_account_id.id,
+                                "product_id": product.id,
+                                "transaction_date": order.purchase_date,
+                                "company_id": self.env.company.id,
+                            },
+                            # Create credit line (Cash or A/P)
+                            {
+                                "product_purchase_order_id": order.id,
+                                "transaction_type": "cr",
+                                "dr_amount": 0,
+                                "cr_amount": line.amount,
+                                "account_number": credit_account_id.id,
+                                "product_id": product.id,
+                                "transaction_date": order.purchase_date,
+                                "company_id": self.env.company.id,
+                            },
+                        ]
                     )
 
                     # Book vendor transaction if payment is A/P
@@ -389,10 +381,7 @@ class ProductPurchaseOrderLine(models.Model):
                             "source_document": order.name,
                         }
                     )
-
-                    product.stock_quantity += (
-                        line.quantity
-                    )  # ✅ Increase stock quantity
+                    # Stock quantity follows the movement record above
         except Exception as e:
             logger.error(f"transaction failed: {str(e)}")
             raise ValidationError(f"Transaction failed: {str(e)}")
@@ -437,12 +426,6 @@ class ProductPurchaseOrderLine(models.Model):
 
                     res = super(ProductPurchaseOrderLine, record).write(vals)
 
-                    # Update stock quantity
-                    new_quantity = vals.get("quantity", old_quantity)
-                    quantity_diff = new_quantity - old_quantity
-                    if quantity_diff != 0:
-                        record.product_id.stock_quantity += quantity_diff
-
                     # Update related transaction_bookingline(s)
                     related_lines = self.env["idil.transaction_bookingline"].search(
                         [
@@ -539,8 +522,7 @@ class ProductPurchaseOrderLine(models.Model):
                             f"only {available_qty} units are in stock, but {record.quantity} are required to reverse."
                         )
 
-                    # 1. Decrease stock
-                    record.product_id.stock_quantity -= record.quantity
+                    # 1. Stock decreases when the movement is deleted (step 4)
 
                     # 2. Delete related transaction_bookingline(s)
                     related_lines = self.env["idil.transaction_bookingline"].search(
@@ -225,7 +225,7 @@ class StockAdjustment(models.Model):
                         },
                     ]
 
-                self.env["idil.transaction_bookingline"].create(booking_lines)
+                transaction.post_lines(booking_lines)
 
                 self.env["idil.item.movement"].create(
                     {
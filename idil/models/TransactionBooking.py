@@ -70,6 +70,13 @@ class TransactionBooking(models.Model):
     pos_payment_method = fields.Many2one(
         "pos.payment.method", string="POS Payment Method"
     )
+    pos_session_id = fields.Many2one(
+        "pos.session",
+        string="POS Session",
+        index=True,
+        help="Set on the aggregated booking posted when a session using deferred "
+        "POS accounting is closed.",
+    )
 
     payment_status = fields.Selection(
         [
@@ -313,27 +320,24 @@ class TransactionBooking(models.Model):
 
                         if not existing_lines:
                             # Create credit transaction booking line
-                            self.env["idil.transaction_bookingline"].create(
-                                {
-                                    "transaction_booking_id": record.id,
-                                    "description": "Receipt",
-                                    "transaction_type": "cr",
-                                    "cr_amount": record.amount_paid,
-                                    "dr_amount": 0,
-                                    "account_number": cr_account,
-                                }
-                            )
-
-                            # Create debit transaction booking line
-                            self.env["idil.transaction_bookingline"].create(
-                                {
-                                    "transaction_booking_id": record.id,
-                                    "description": "Receipt",
-                                    "transaction_type": "dr",
-                                    "cr_amount": 0,
-                                    "dr_amount": record.amount_paid,
-                                    "account_number": dr_account,
-                                }
+                            record.post_lines(
+                                [
+                                    {
+                                        "description": "Receipt",
+                                        "transaction_type": "cr",
+                                        "cr_amount": record.amount_paid,
+                                        "dr_amount": 0,
+                                        "account_number": cr_account,
+                                    },
+                                    # Create debit transaction booking line
+                                    {
+                                        "description": "Receipt",
+                                        "transaction_type": "dr",
+                                        "cr_amount": 0,
+                                        "dr_amount": record.amount_paid,
+                                        "account_number": dr_account,
+                                    },
+                                ]
                             )
 
                         update_vals = {
@@ -365,14 +369,84 @@ class TransactionBooking(models.Model):
             record.debit_total = sum(line.dr_amount for line in record.booking_lines)
             record.credit_total = sum(line.cr_amount for line in record.booking_lines)
 
-    @api.model
-    def create(self, vals):
+    def post_lines(self, line_vals_list, check_balance=True):
+        """Post the journal entries of these bookings in one go.
+
+        The debit and credit totals of each entry are validated once, the
+        lines are inserted with a single multi-row create, so the booking
+        totals and the stored related fields are recomputed once per entry
+        instead of once per line. Batches post the entries of several
+        bookings together, each line naming its own booking.
+
+        :param line_vals_list: list of ``idil.transaction_bookingline`` values;
+            ``transaction_booking_id`` is filled in when missing, which needs
+            a single booking
+        :param check_balance: require debits to equal credits within each
+            account currency, booking by booking (see
+            ``_check_entry_balanced``); pass False for entries that are
+            unbalanced by design
+        :return: the created ``idil.transaction_bookingline`` records, in the
+            order of ``line_vals_list``
+        """
+        BookingLine = self.env["idil.transaction_bookingline"]
+        if not line_vals_list:
+            return BookingLine
+
+        entries = {}
+        for vals in line_vals_list:
+            if not vals.get("transaction_booking_id"):
+                self.ensure_one()
+                vals["transaction_booking_id"] = self.id
+            entries.setdefault(vals["transaction_booking_id"], []).append(vals)
+        if not set(entries) <= set(self.ids):
+            raise ValueError("Booking lines must belong to the posted bookings.")
+        if check_balance:
+            for booking_id, entry_vals in entries.items():
+                self.browse(booking_id)._check_entry_balanced(entry_vals)
+        return BookingLine.create(line_vals_list)
+
+    def _check_entry_balanced(self, line_vals_list):
+        """Debits must equal credits within each account currency; entries
+        spanning currencies balance through the exchange clearing accounts."""
+        precision = self.env["decimal.precision"].precision_get("Account")
+        accounts = self.env["idil.chart.account"].browse(
+            {vals.get("account_number") for vals in line_vals_list} - {False, None}
+        )
+        account_currency = {account.id: account.currency_id for account in accounts}
+
+        totals = {}
+        for vals in line_vals_list:
+            currency = account_currency.get(
+                vals.get("account_number"), self.env["res.currency"]
+            )
+            dr, cr = totals.get(currency, (0.0, 0.0))
+            totals[currency] = (
+                dr + (vals.get("dr_amount") or 0.0),
+                cr + (vals.get("cr_amount") or 0.0),
+            )
+
+        for currency, (total_dr, total_cr) in totals.items():
+            if float_compare(total_dr, total_cr, precision_digits=precision) != 0:
+                raise ValidationError(
+                    "Journal entry is not balanced in %s.\nDebit: %s\nCredit: %s"
+                    % (
+                        currency.name or "",
+                        float_round(total_dr, precision_digits=precision),
+                        float_round(total_cr, precision_digits=precision),
+                    )
+                )
+
+    @api.model_create_multi
+    def create(self, vals_list):
         # vals['reffno'] = self._generate_booking_reference(vals)
-        vals["transaction_number"] = self._get_next_transaction_number()
+        # Batches take consecutive numbers after a single lookup.
+        next_number = self._get_next_transaction_number()
+        for offset, vals in enumerate(vals_list):
+            vals["transaction_number"] = next_number + offset
 
-        transaction_record = super(TransactionBooking, self).create(vals)
+        transaction_records = super(TransactionBooking, self).create(vals_list)
 
-        return transaction_record
+        return transaction_records
 
     def _get_next_transaction_number(self):
         max_transaction_number = (
@@ -386,24 +460,22 @@ class TransactionBooking(models.Model):
     def action_add_default_lines(self):
         for record in self:
             # Add a debit line
-            self.env["idil.transaction_bookingline"].create(
-                {
-                    "transaction_booking_id": record.id,
-                    "transaction_type": "dr",
-                    "dr_amount": 0.0,  # Default amount; adjust as necessary
-                    "cr_amount": 0.0,  # Ensured to be zero for debit line
-                    "description": "Default debit line",
-                }
-            )
-            # Add a credit line
-            self.env["idil.transaction_bookingline"].create(
-                {
-                    "transaction_booking_id": record.id,
-                    "transaction_type": "cr",
-                    "dr_amount": 0.0,  # Ensured to be zero for credit line
-                    "cr_amount": 0.0,  # Default amount; adjust as necessary
-                    "description": "Default credit line",
-                }
+            record.post_lines(
+                [
+                    {
+                        "transaction_type": "dr",
+                        "dr_amount": 0.0,  # Default amount; adjust as necessary
+                        "cr_amount": 0.0,  # Ensured to be zero for debit line
+                        "description": "Default debit line",
+                    },
+                    # Add a credit line
+                    {
+                        "transaction_type": "cr",
+                        "dr_amount": 0.0,  # Ensured to be zero for credit line
+                        "cr_amount": 0.0,  # Default amount; adjust as necessary
+                        "description": "Default credit line",
+                    },
+                ]
             )
 
     def update_related_booking_lines(self):
@@ -679,8 +751,6 @@ class TransactionBookingline(models.Model):
         # --- normalize to a pure date (no timezone issues) ---
         as_of_date = fields.Date.to_date(as_of_date)
 
-        Currency = self.env["res.currency"]
-        Account = self.env["idil.chart.account"]
         TrialBal = self.env["idil.company.trial.balance"]
 
         # Use the report currency if provided, else company currency
@@ -692,60 +762,62 @@ class TransactionBookingline(models.Model):
             clear_domain.append(("company_id", "=", company_id.id))
         TrialBal.search(clear_domain).unlink()
 
-        # --- fetch raw lines using ONLY transaction_date ---
+        # --- aggregate per account and day, convert each day at its rate ---
+        RateService = self.env["idil.currency.rate.service"]
         comparator = "=" if exact_day else "<="
+        self.flush_model()
         self.env.cr.execute(
             f"""
             SELECT
-                tb.account_number,
-                tb.dr_amount,
-                tb.cr_amount,
+                tb.account_number AS account_id,
+                ca.header_name,
+                ca.currency_id,
                 tb.transaction_date::date AS tdate,
-                ca.currency_id
+                COALESCE(SUM(tb.dr_amount), 0) - COALESCE(SUM(tb.cr_amount), 0)
+                    AS net
             FROM idil_transaction_bookingline tb
             JOIN idil_chart_account ca ON tb.account_number = ca.id
-            WHERE tb.company_id = %s
-            AND tb.transaction_date {comparator} %s::date
+            WHERE tb.company_id = %(company_id)s
+            AND tb.transaction_date {comparator} %(as_of_date)s::date
             AND ca.name != 'Exchange Clearing Account'
+            GROUP BY
+                tb.account_number, ca.header_name, ca.currency_id, tb.transaction_date
         """,
-            (company_id.id, as_of_date),
+            {
+                "company_id": company_id.id,
+                "as_of_date": as_of_date,
+            },
         )
-        rows = self.env.cr.dictfetchall()
-
-        # --- aggregate in report currency, converting at tdate (transaction_date) ---
-        balances = {}  # {account_id: {'dr': x, 'cr': y}}
-        for r in rows:
-            acc_id = r["account_number"]
-            tdate = r["tdate"]
-            src_cur = Currency.browse(r["currency_id"])
-            dr_src = r["dr_amount"] or 0.0
-            cr_src = r["cr_amount"] or 0.0
-
-            dr_rep = src_cur._convert(
-                dr_src, report_currency, company_id, tdate, round=False
+        daily_by_currency = {}
+        for row in self.env.cr.dictfetchall():
+            daily_by_currency.setdefault(row["currency_id"], []).append(row)
+
+        accounts = {}
+        for currency_id, daily in daily_by_currency.items():
+            amounts = RateService.convert(
+                [(float(row["net"]), row["tdate"]) for row in daily],
+                currency_id,
+                report_currency,
+                company_id,
             )
-            cr_rep = src_cur._convert(
-                cr_src, report_currency, company_id, tdate, round=False
-            )
-
-            b = balances.setdefault(acc_id, {"dr": 0.0, "cr": 0.0})
-            b["dr"] += dr_rep
-            b["cr"] += cr_rep
+            for row, amount in zip(daily, amounts):
+                net = accounts.get(row["account_id"], (0.0, None))[0]
+                accounts[row["account_id"]] = (net + amount, row["header_name"])
 
-        # --- write detail lines + grand total ---
+        # --- write detail lines + grand total in one batch ---
         grand_dr = grand_cr = 0.0
-        for acc_id, t in balances.items():
-            net = t["dr"] - t["cr"]
+        vals_list = []
+        for account_id in sorted(accounts):
+            net, header_name = accounts[account_id]
             if abs(net) < 1e-9:
                 continue  # skip zero-net
 
             dr_bal = report_currency.round(net if net > 0 else 0.0)
             cr_bal = report_currency.round(-net if net < 0 else 0.0)
 
-            acc = Account.browse(acc_id)
             vals = {
-                "account_number": acc.id,
-                "header_name": acc.header_name,
+                "account_number": account_id,
+                "header_name": header_name,
                 "currency_id": report_currency.id,
                 "dr_balance": dr_bal,
                 "cr_balance": cr_bal,
@@ -754,7 +826,7 @@ class TransactionBookingline(models.Model):
                 vals["company_id"] = company_id.id
             if "as_of_date" in TrialBal._fields:
                 vals["as_of_date"] = as_of_date
-            TrialBal.create(vals)
+            vals_list.append(vals)
 
             grand_dr += dr_bal
             grand_cr += cr_bal
@@ -774,7 +846,8 @@ class TransactionBookingline(models.Model):
             total_vals["company_id"] = company_id.id
         if "as_of_date" in TrialBal._fields:
             total_vals["as_of_date"] = as_of_date
-        TrialBal.create(total_vals)
+        vals_list.append(total_vals)
+        TrialBal.create(vals_list)
 
         return {
             "type": "ir.actions.act_window",
@@ -785,68 +858,92 @@ class TransactionBookingline(models.Model):
             "target": "new",
         }
 
-    def compute_income_statement(self, company_id):
+    def compute_income_statement(self, company_id, date_from=None, date_to=None):
         # Retrieve USD currency
         usd_currency = self.env["res.currency"].search([("name", "=", "USD")], limit=1)
+        Report = self.env["idil.income.statement.report"]
+        RateService = self.env["idil.currency.rate.service"]
 
         # Clear previous report data
-        self.env["idil.income.statement.report"].search([]).unlink()
-
-        # Define account types for expenses and profits based on the starting code
-        expense_accounts = self.env["idil.chart.account"].search(
-            [("code", "=like", "5%")]
-        )
-        profit_accounts = self.env["idil.chart.account"].search(
-            [("code", "=like", "4%")]
+        Report.search([]).unlink()
+
+        # Aggregate every P&L account (expenses 5%, income 4%) in one query,
+        # converting each day's total to USD at that day's rate.
+        where = ["tb.company_id = %(company_id)s", "ca.code ~ '^[45]'"]
+        if date_from:
+            where.append("tb.transaction_date >= %(date_from)s::date")
+        if date_to:
+            where.append("tb.transaction_date <= %(date_to)s::date")
+
+        self.flush_model()
+        self.env["res.currency.rate"].flush_model()
+        self.env.cr.execute(
+            f"""
+            WITH daily AS (
+                SELECT
+                    tb.account_number AS account_id,
+                    ca.currency_id,
+                    tb.transaction_date AS tdate,
+                    COALESCE(SUM(tb.dr_amount), 0) - COALESCE(SUM(tb.cr_amount), 0)
+                        AS net
+                FROM idil_transaction_bookingline tb
+                JOIN idil_chart_account ca ON tb.account_number = ca.id
+                WHERE {" AND ".join(where)}
+                GROUP BY tb.account_number, ca.currency_id, tb.transaction_date
+            )
+            SELECT
+                d.account_id,
+                LEFT(ca.code, 1) AS code_class,
+                SUM(
+                    d.net * CASE
+                        WHEN d.currency_id = %(usd_id)s THEN 1.0
+                        ELSE {RateService._rate_sql("%(usd_id)s", "COALESCE(d.tdate, CURRENT_DATE)")}
+                             / {RateService._rate_sql("d.currency_id", "COALESCE(d.tdate, CURRENT_DATE)")}
+                    END
+                ) AS amount
+            FROM daily d
+            JOIN idil_chart_account ca ON ca.id = d.account_id
+            GROUP BY d.account_id, ca.code
+            ORDER BY d.account_id
+            """,
+            {
+                "company_id": company_id.id,
+                "date_from": date_from,
+                "date_to": date_to,
+                "usd_id": usd_currency.id,
+            },
         )
+        rows = self.env.cr.dictfetchall()
 
+        expense_vals, income_vals = [], []
         total_expenses = 0
         total_income = 0
-
-        # Compute total expenses
-        for account in expense_accounts:
-            self.env.cr.execute(
-                """
-                SELECT
-                    SUM(tb.dr_amount) - SUM(tb.cr_amount) AS total
-                FROM
-                    idil_transaction_bookingline tb
-                WHERE
-                    tb.company_id = %s AND tb.account_number = %s
-                GROUP BY
-                    tb.account_number
-                HAVING
-                    SUM(tb.dr_amount) - SUM(tb.cr_amount) != 0
-                """,
-                (company_id.id, account.id),
-            )
-
-            result = self.env.cr.fetchone()
-            amount = result[0] if result else 0
-
-            # Convert amount to USD if necessary
-            if account.currency_id.id != usd_currency.id:
-                amount = account.currency_id._convert(
-                    amount, usd_currency, self.env.user.company_id, fields.Date.today()
-                )
+        for row in rows:
+            if row["code_class"] == "5":
+                amount = row["amount"] or 0.0
+            else:
+                # Income accounts carry a credit balance
+                amount = -(row["amount"] or 0.0)
 
             # Only create a report entry if the amount is non-zero
-            if amount != 0:
-                # Accumulate total expenses
+            if amount == 0:
+                continue
+            vals = {
+                "account_number": row["account_id"],
+                "amount": amount,
+                "currency_id": usd_currency.id,
+            }
+            if row["code_class"] == "5":
                 total_expenses += amount
+                expense_vals.append(vals)
+            else:
+                total_income += amount
+                income_vals.append(vals)
 
-                # Create report entry for each expense account
-                self.env["idil.income.statement.report"].create(
-                    {
-                        "account_number": account.id,
-                        "amount": amount,
-                        "currency_id": usd_currency.id,
-                    }
-                )
-
+        vals_list = expense_vals
         # Add subtotal for expenses only if there are any
         if total_expenses != 0:
-            self.env["idil.income.statement.report"].create(
+            vals_list.append(
                 {
                     "account_number": None,
                     "account_type": "Expense Subtotal",
@@ -854,51 +951,10 @@ class TransactionBookingline(models.Model):
                     "currency_id": usd_currency.id,
                 }
             )
-
-        # Compute total income
-        for account in profit_accounts:
-            self.env.cr.execute(
-                """
-                SELECT
-                    SUM(tb.cr_amount) - SUM(tb.dr_amount) AS total
-                FROM
-                    idil_transaction_bookingline tb
-                WHERE
-                    tb.company_id = %s AND tb.account_number = %s
-                GROUP BY
-                    tb.account_number
-                HAVING
-                    SUM(tb.cr_amount) - SUM(tb.dr_amount) != 0
-                """,
-                (company_id.id, account.id),
-            )
-
-            result = self.env.cr.fetchone()
-            amount = result[0] if result else 0
-
-            # Convert amount to USD if necessary
-            if account.currency_id.id != usd_currency.id:
-                amount = account.currency_id._convert(
-                    amount, usd_currency, self.env.user.company_id, fields.Date.today()
-                )
-
-            # Only create a report entry if the amount is non-zero
-            if amount != 0:
-                # Accumulate total income
-                total_income += amount
-
-                # Create report entry for each profit account
-                self.env["idil.income.statement.report"].create(
-                    {
-                        "account_number": account.id,
-                        "amount": amount,
-                        "currency_id": usd_currency.id,
-                    }
-                )
-
+        vals_list += income_vals
         # Add subtotal for income only if there are any
         if total_income != 0:
-            self.env["idil.income.statement.report"].create(
+            vals_list.append(
                 {
                     "account_number": None,
                     "account_type": "Income Subtotal",
@@ -909,7 +965,7 @@ class TransactionBookingline(models.Model):
 
         # Calculate and add gross profit
         gross_profit = total_income - total_expenses
-        self.env["idil.income.statement.report"].create(
+        vals_list.append(
             {
                 "account_number": None,
                 "account_type": "Gross Profit",
@@ -917,6 +973,7 @@ class TransactionBookingline(models.Model):
                 "currency_id": usd_currency.id,
             }
         )
+        Report.create(vals_list)
 
         return {
             "type": "ir.actions.act_window",
@@ -943,12 +1000,27 @@ class IncomeStatementWizard(models.TransientModel):
     _description = "Income Statement Wizard"
 
     company_id = fields.Many2one("res.company", string="Company", required=True)
+    date_from = fields.Date(
+        string="Start Date",
+        required=True,
+        default=lambda self: fields.Date.context_today(self).replace(month=1, day=1),
+    )
+    date_to = fields.Date(
+        string="End Date", required=True, default=fields.Date.context_today
+    )
+
+    @api.constrains("date_from", "date_to")
+    def _check_dates(self):
+        for rec in self:
+            if rec.date_from and rec.date_to and rec.date_from > rec.date_to:
+                raise ValidationError("Start Date cannot be after End Date.")
 
     def action_compute_income_statement(self):
         self.ensure_one()
         action = self.env["idil.transaction_bookingline"].compute_income_statement(
-            self.company_id
+            self.company_id, self.date_from, self.date_to
         )
+        action["name"] = f"Income Statement ({self.date_from} - {self.date_to})"
         return action
 
 
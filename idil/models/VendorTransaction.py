@@ -81,6 +81,15 @@ class VendorTransaction(models.Model):
         ondelete="cascade",
     )
 
+    def init(self):
+        self.env["idil.vendor.registration"]._install_balance_trigger()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(VendorTransaction, self).create(vals_list)
+        self.env["idil.vendor.registration"]._sync_balance_cache(records)
+        return records
+
     def write(self, vals):
         for record in self:
             if "amount_paying" in vals:
@@ -104,32 +113,15 @@ class VendorTransaction(models.Model):
                 payment_id = record._create_vendor_payment(vals["amount_paying"])
                 record._update_booking_payment(vals["amount_paying"], payment_id)
 
+        self.env["idil.vendor.registration"]._sync_balance_cache(self)
         return res
 
     def _check_cash_account_balance(self, cash_account_id, paid_amount):
 
         _logger.debug(f"Checking cash account balance for record {self.id}")
-        total_debit = sum(
-            self.env["idil.transaction_bookingline"]
-            .search(
-                [
-                    ("account_number", "=", cash_account_id),
-                    ("transaction_type", "=", "dr"),
-                ]
-            )
-            .mapped("dr_amount")
-        )
-        total_credit = sum(
-            self.env["idil.transaction_bookingline"]
-            .search(
-                [
-                    ("account_number", "=", cash_account_id),
-                    ("transaction_type", "=", "cr"),
-                ]
-            )
-            .mapped("cr_amount")
+        available_balance = self.env["idil.account.daily.balance"].get_balance(
+            cash_account_id
         )
-        available_balance = total_debit - total_credit
         _logger.debug(
             f"Available balance: {available_balance}, Paid amount: {paid_amount}"
         )
@@ -171,29 +163,26 @@ class VendorTransaction(models.Model):
                     )
 
                     # Create the debit line
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": self.transaction_booking_id.id,
-                            "account_number": account_payable.id,
-                            "transaction_type": "dr",
-                            "dr_amount": new_paid_amount,
-                            "cr_amount": 0,
-                            "transaction_date": fields.Date.today(),
-                            "vendor_payment_id": payment_id,
-                        }
-                    )
-
-                    # Create the credit line
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": self.transaction_booking_id.id,
-                            "account_number": self.cash_account_id.id,
-                            "transaction_type": "cr",
-                            "cr_amount": new_paid_amount,
-                            "dr_amount": 0,
-                            "transaction_date": fields.Date.today(),
-                            "vendor_payment_id": payment_id,
-                        }
+                    self.transaction_booking_id.post_lines(
+                        [
+                            {
+                                "account_number": account_payable.id,
+                                "transaction_type": "dr",
+                                "dr_amount": new_paid_amount,
+                                "cr_amount": 0,
+                                "transaction_date": fields.Date.today(),
+                                "vendor_payment_id": payment_id,
+                            },
+                            # Create the credit line
+                            {
+                                "account_number": self.cash_account_id.id,
+                                "transaction_type": "cr",
+                                "cr_amount": new_paid_amount,
+                                "dr_amount": 0,
+                                "transaction_date": fields.Date.today(),
+                                "vendor_payment_id": payment_id,
+                            },
+                        ]
                     )
 
                     # Recompute remaining amount after booking lines are created
@@ -259,4 +248,6 @@ class VendorTransaction(models.Model):
                     raise ValidationError(
                         f"You cannot delete this Vendor Transaction because it is still linked to a Product Purchase Order: '{purchase_order.name}'."
                     )
-        return super(VendorTransaction, self).unlink()
+        res = super(VendorTransaction, self).unlink()
+        self.env["idil.vendor.registration"]._sync_balance_cache(self.browse())
+        return res
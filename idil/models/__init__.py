@@ -1,16 +1,24 @@
+from . import partner_balance
 from . import customers
 from . import vendors
 from . import custypes
+from . import movement_archive
 from . import items
 from . import unitmeasure
 from . import item_category
 from . import chart_of_accounts
 from . import TransactionBooking
+from . import account_daily_balance
+from . import currency_rate_service
+from . import item_stock_ledger
+from . import item_reorder
+from . import inventory_snapshot
 from . import purchases
 from . import BOM
 from . import BOMType
 from . import products
 from . import ManufacturingOrder
+from . import production_plan
 from . import trx_source
 from . import SalesPersonPlaceOrder
 from . import sales
@@ -20,6 +28,7 @@ from . import pos_order_mod
 from . import CustomPosSession
 from . import pos_session
 from . import posorder
+from . import pos_session_accounting
 from . import pos_payment_method
 from . import idil_employee
 from . import Extend_pos_payment_method
@@ -0,0 +1,242 @@
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class AccountDailyBalance(models.Model):
+    """Per account / company / day totals of idil.transaction_bookingline.
+
+    Rows are maintained by a PostgreSQL trigger on the booking line table so
+    that ORM writes, ``ondelete="cascade"`` deletions of parent bookings and
+    raw SQL clean-ups all keep the totals in sync.
+    """
+
+    _name = "idil.account.daily.balance"
+    _description = "Account Daily Balance"
+    _order = "date desc, id desc"
+
+    account_id = fields.Many2one(
+        "idil.chart.account",
+        string="Account",
+        required=True,
+        index=True,
+        ondelete="cascade",
+        readonly=True,
+    )
+    company_id = fields.Many2one(
+        "res.company", string="Company", required=True, readonly=True
+    )
+    date = fields.Date(string="Date", readonly=True)
+    dr_amount = fields.Float(string="Debit Amount", digits=(16, 5), readonly=True)
+    cr_amount = fields.Float(string="Credit Amount", digits=(16, 5), readonly=True)
+    balance = fields.Float(
+        string="Balance", compute="_compute_balance", digits=(16, 5)
+    )
+
+    @api.depends("dr_amount", "cr_amount")
+    def _compute_balance(self):
+        for rec in self:
+            rec.balance = rec.dr_amount - rec.cr_amount
+
+    def init(self):
+        cr = self.env.cr
+        cr.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idil_account_daily_balance_key
+            ON idil_account_daily_balance
+                (account_id, company_id, COALESCE(date, '0001-01-01'::date))
+            """
+        )
+        cr.execute(
+            """
+            CREATE OR REPLACE FUNCTION idil_account_daily_balance_sync()
+            RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    UPDATE idil_account_daily_balance
+                       SET dr_amount = dr_amount - COALESCE(OLD.dr_amount, 0),
+                           cr_amount = cr_amount - COALESCE(OLD.cr_amount, 0)
+                     WHERE account_id = OLD.account_number
+                       AND company_id = OLD.company_id
+                       AND COALESCE(date, '0001-01-01'::date)
+                           = COALESCE(OLD.transaction_date, '0001-01-01'::date);
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO idil_account_daily_balance
+                        (account_id, company_id, date, dr_amount, cr_amount)
+                    VALUES (
+                        NEW.account_number,
+                        NEW.company_id,
+                        NEW.transaction_date,
+                        COALESCE(NEW.dr_amount, 0),
+                        COALESCE(NEW.cr_amount, 0)
+                    )
+                    ON CONFLICT
+                        (account_id, company_id, COALESCE(date, '0001-01-01'::date))
+                    DO UPDATE SET
+                        dr_amount = idil_account_daily_balance.dr_amount
+                            + EXCLUDED.dr_amount,
+                        cr_amount = idil_account_daily_balance.cr_amount
+                            + EXCLUDED.cr_amount;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        cr.execute(
+            """
+            DROP TRIGGER IF EXISTS idil_account_daily_balance_sync
+            ON idil_transaction_bookingline;
+            CREATE TRIGGER idil_account_daily_balance_sync
+            AFTER INSERT OR DELETE OR UPDATE OF
+                account_number, company_id, transaction_date, dr_amount, cr_amount
+            ON idil_transaction_bookingline
+            FOR EACH ROW EXECUTE FUNCTION idil_account_daily_balance_sync()
+            """
+        )
+        # First install / upgrade on an existing ledger: seed the table.
+        cr.execute("SELECT 1 FROM idil_account_daily_balance LIMIT 1")
+        if not cr.fetchone():
+            self._rebuild_from_ledger()
+
+    def _rebuild_from_ledger(self):
+        cr = self.env.cr
+        self.env["idil.transaction_bookingline"].flush_model()
+        # Block concurrent postings so the snapshot matches the ledger.
+        cr.execute("LOCK TABLE idil_transaction_bookingline IN SHARE MODE")
+        cr.execute("DELETE FROM idil_account_daily_balance")
+        cr.execute(
+            """
+            INSERT INTO idil_account_daily_balance
+                (account_id, company_id, date, dr_amount, cr_amount)
+            SELECT
+                account_number,
+                company_id,
+                transaction_date,
+                COALESCE(SUM(dr_amount), 0),
+                COALESCE(SUM(cr_amount), 0)
+            FROM idil_transaction_bookingline
+            WHERE account_number IS NOT NULL AND company_id IS NOT NULL
+            GROUP BY account_number, company_id, transaction_date
+            """
+        )
+        self.invalidate_model()
+        _logger.info("Rebuilt idil.account.daily.balance from the ledger.")
+
+    def _get_drift(self):
+        """Return the (account, company, date) keys where the table and the
+        raw ledger disagree."""
+        self.env["idil.transaction_bookingline"].flush_model()
+        self.env.cr.execute(
+            """
+            WITH ledger AS (
+                SELECT
+                    account_number AS account_id,
+                    company_id,
+                    transaction_date AS date,
+                    COALESCE(SUM(dr_amount), 0) AS dr_amount,
+                    COALESCE(SUM(cr_amount), 0) AS cr_amount
+                FROM idil_transaction_bookingline
+                GROUP BY account_number, company_id, transaction_date
+            )
+            SELECT
+                COALESCE(l.account_id, b.account_id) AS account_id,
+                COALESCE(l.company_id, b.company_id) AS company_id,
+                COALESCE(l.date, b.date) AS date,
+                COALESCE(l.dr_amount, 0) - COALESCE(b.dr_amount, 0) AS dr_diff,
+                COALESCE(l.cr_amount, 0) - COALESCE(b.cr_amount, 0) AS cr_diff
+            FROM ledger l
+            FULL OUTER JOIN idil_account_daily_balance b
+                ON b.account_id = l.account_id
+               AND b.company_id = l.company_id
+               AND b.date IS NOT DISTINCT FROM l.date
+            WHERE ROUND(COALESCE(l.dr_amount, 0) - COALESCE(b.dr_amount, 0), 5) <> 0
+               OR ROUND(COALESCE(l.cr_amount, 0) - COALESCE(b.cr_amount, 0), 5) <> 0
+            """
+        )
+        return self.env.cr.dictfetchall()
+
+    @api.model
+    def action_rebuild(self):
+        self._rebuild_from_ledger()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": "Daily Balances Rebuilt",
+                "message": "Account daily balances were rebuilt from the ledger.",
+                "type": "success",
+            },
+        }
+
+    @api.model
+    def action_verify(self):
+        drift = self._get_drift()
+        if drift:
+            _logger.warning("Account daily balance drift detected: %s", drift[:20])
+            raise ValidationError(
+                f"{len(drift)} account/day balance(s) differ from the ledger. "
+                f"First difference: account ID {drift[0]['account_id']} on "
+                f"{drift[0]['date']} (Dr {drift[0]['dr_diff']:.5f}, "
+                f"Cr {drift[0]['cr_diff']:.5f}). Run 'Rebuild Daily Balances'."
+            )
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": "Daily Balances Verified",
+                "message": "Account daily balances match the ledger.",
+                "type": "success",
+            },
+        }
+
+    @api.model
+    def get_balances(self, account_ids, as_of=None, company_id=None):
+        """Return ``{account_id: dr - cr}`` for the given accounts.
+
+        :param account_ids: iterable of ``idil.chart.account`` ids
+        :param as_of: optional date; only days up to and including it count
+        :param company_id: optional company id to restrict the balance to
+        """
+        account_ids = [a for a in set(account_ids) if a]
+        balances = dict.fromkeys(account_ids, 0.0)
+        if not account_ids:
+            return balances
+
+        # Pending ORM writes on booking lines only reach the table on flush.
+        self.env["idil.transaction_bookingline"].flush_model()
+
+        query = """
+            SELECT account_id, COALESCE(SUM(dr_amount) - SUM(cr_amount), 0)
+            FROM idil_account_daily_balance
+            WHERE account_id IN %s
+        """
+        params = [tuple(account_ids)]
+        if as_of:
+            query += " AND date <= %s"
+            params.append(fields.Date.to_date(as_of))
+        if company_id:
+            query += " AND company_id = %s"
+            params.append(company_id)
+        query += " GROUP BY account_id"
+
+        self.env.cr.execute(query, params)
+        for account_id, balance in self.env.cr.fetchall():
+            balances[account_id] = float(balance)
+        return balances
+
+    @api.model
+    def get_balance(self, account, as_of=None, company_id=None):
+        """Return the Dr - Cr balance of a single account.
+
+        :param account: ``idil.chart.account`` record or id
+        :param as_of: optional date; only days up to and including it count
+        :param company_id: optional company id to restrict the balance to
+        """
+        account_id = account.id if isinstance(account, models.BaseModel) else account
+        if not account_id:
+            return 0.0
+        return self.get_balances([account_id], as_of, company_id)[account_id]
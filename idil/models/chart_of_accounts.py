@@ -1,4 +1,6 @@
-from odoo import models, fields, api
+import operator
+
+from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError, UserError
 import logging
 
@@ -79,22 +81,13 @@ class AccountHeader(models.Model):
     def get_bs_report_data(self, company_id, report_date):
         # Retrieve all headers without filtering by company
         headers = self.search([])
-        print(f"Number of headers found: {len(headers)}")
-
-        for header in headers:
-            print(
-                f"Processing Header: {header.name} with {len(header.sub_header_ids)} sub-headers"
-            )
-            for subheader in header.sub_header_ids:
-                print(
-                    f"Processing Sub-header: {subheader.name} with {len(subheader.account_ids)} accounts"
-                )
-                for account in subheader.account_ids:
-                    # Pass company_id to get balance only for the selected company
-                    balance = account.get_balance_as_of_date_for_bs(
-                        report_date, company_id
-                    )
-                    print(f"Account: {account.name}, Balance: {balance}")
+        bs_accounts = headers.mapped("sub_header_ids.account_ids").filtered(
+            lambda a: a.FinancialReporting == "BS"
+        )
+        # All balances in one grouped query, converted to USD in SQL.
+        balances = self.env["idil.chart.account"]._get_bs_balances(
+            bs_accounts.ids, report_date, company_id
+        )
 
         report_data = []
         usd_currency = self.env.ref("base.USD")  # Ensure this XML ID is correct
@@ -112,9 +105,7 @@ class AccountHeader(models.Model):
 
                 for account in subheader.account_ids:
                     if account.FinancialReporting == "BS":
-                        balance = account.get_balance_as_of_date_for_bs(
-                            report_date, company_id
-                        )
+                        balance = balances.get(account.id, 0.0)
 
                         formatted_balance = "{:,.3f}".format(balance)
                         accounts_data.append(
@@ -448,7 +439,9 @@ class Account(models.Model):
     currency_id = fields.Many2one("res.currency", string="Currency", required=True)
 
     balance = fields.Float(
-        string="Current Balance", compute="_compute_balance", store=True
+        string="Current Balance",
+        compute="_compute_balance",
+        search="_search_balance",
     )
 
     transaction_bookingline_ids = fields.One2many(
@@ -512,52 +505,113 @@ class Account(models.Model):
     #                     f"Subheader='{other.subheader_id.name}' ({other.subheader_id.sub_header_code}) (ID {other.id})."
     #                 )
 
+    @api.model
+    def _get_ledger_balances(self, account_ids=None, as_of=None):
+        """Return ``{account_id: debit - credit}`` in one grouped query.
+
+        Only the debit of ``dr`` lines and the credit of ``cr`` lines count.
+
+        :param account_ids: ids to restrict to, all accounts when None
+        :param as_of: optional date; only lines up to and including it count
+        """
+        if account_ids is not None and not account_ids:
+            return {}
+        self.env["idil.transaction_bookingline"].flush_model(
+            [
+                "account_number",
+                "transaction_type",
+                "dr_amount",
+                "cr_amount",
+                "transaction_date",
+            ]
+        )
+        query = """
+            SELECT account_number,
+                   COALESCE(SUM(dr_amount) FILTER (WHERE transaction_type = 'dr'), 0)
+                   - COALESCE(SUM(cr_amount) FILTER (WHERE transaction_type = 'cr'), 0)
+            FROM idil_transaction_bookingline
+            WHERE account_number IS NOT NULL
+        """
+        params = []
+        if account_ids is not None:
+            query += " AND account_number IN %s"
+            params.append(tuple(account_ids))
+        if as_of:
+            query += " AND transaction_date <= %s"
+            params.append(fields.Date.to_date(as_of))
+        query += " GROUP BY account_number"
+        self.env.cr.execute(query, params)
+        return {
+            account_id: float(balance)
+            for account_id, balance in self.env.cr.fetchall()
+        }
+
     @api.depends(
-        "transaction_bookingline_ids.dr_amount", "transaction_bookingline_ids.cr_amount"
+        "transaction_bookingline_ids.transaction_type",
+        "transaction_bookingline_ids.dr_amount",
+        "transaction_bookingline_ids.cr_amount",
     )
     def _compute_balance(self):
+        # One grouped query for the whole recordset.
+        balances = self._get_ledger_balances(self._origin.ids)
         for account in self:
-            # Clear the balance before calculation
-            account.balance = 0
-            debit_sum = sum(
-                account.transaction_bookingline_ids.filtered(
-                    lambda l: l.transaction_type == "dr"
-                ).mapped("dr_amount")
-            )
-            credit_sum = sum(
-                account.transaction_bookingline_ids.filtered(
-                    lambda l: l.transaction_type == "cr"
-                ).mapped("cr_amount")
+            account.balance = balances.get(account._origin.id, 0.0)
+
+    def _search_balance(self, operator_name, value):
+        comparators = {
+            "=": operator.eq,
+            "!=": operator.ne,
+            "<": operator.lt,
+            "<=": operator.le,
+            ">": operator.gt,
+            ">=": operator.ge,
+        }
+        if operator_name not in comparators:
+            raise UserError(_("Operation not supported on the balance."))
+        compare = comparators[operator_name]
+        value = value or 0.0
+        balances = self._get_ledger_balances()
+        # Accounts without lines have a zero balance.
+        accounts = self.with_context(active_test=False).search([])
+        return [
+            (
+                "id",
+                "in",
+                [a for a in accounts.ids if compare(balances.get(a, 0.0), value)],
             )
-            account.balance = debit_sum - credit_sum
+        ]
 
     @api.model
     def read_group(
         self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True
     ):
-        if "balance" in fields:
-            fields.remove("balance")
-        res = super(Account, self).read_group(
+        # The list view may request the aggregate as "balance:sum".
+        plain = [f for f in fields if f.split(":")[0] != "balance"]
+        with_balance = len(plain) != len(fields)
+        fields = plain
+        if with_balance:
+            # The ids of every group come with the grouped query itself.
+            res = super(Account, self).read_group(
+                domain,
+                fields + ["balance_account_ids:array_agg(id)"],
+                groupby,
+                offset,
+                limit,
+                orderby,
+                lazy,
+            )
+            balances = self._get_ledger_balances(
+                {a for line in res for a in line["balance_account_ids"] or []}
+            )
+            for line in res:
+                line["balance"] = sum(
+                    balances.get(a, 0.0)
+                    for a in line.pop("balance_account_ids") or []
+                )
+            return res
+        return super(Account, self).read_group(
             domain, fields, groupby, offset, limit, orderby, lazy
         )
-        if "balance" not in fields:
-            fields.append("balance")
-        if "balance" in fields:
-            for line in res:
-                if "__domain" in line:
-                    accounts = self.search(line["__domain"])
-                    # Ensure balances are computed
-                    accounts._compute_balance()
-                    balance = sum(account.balance for account in accounts)
-                    line["balance"] = balance
-        return res
-
-    @api.model
-    def read(self, fields=None, load="_classic_read"):
-        res = super(Account, self).read(fields, load)
-        for record in self:
-            record._compute_balance()
-        return res
 
     def name_get(self):
         result = []
@@ -609,81 +663,77 @@ class Account(models.Model):
 
     def get_balance_as_of_date(self, date):
         self.ensure_one()  # Ensures this is called on a single record
-        transactions = self.env["idil.transaction_bookingline"].search(
-            [
-                ("account_number", "=", self.id),
-                (
-                    "transaction_date",
-                    "<=",
-                    date,
-                ),  # Filter transactions up to the specified date
-            ]
-        )
-        debit = sum(
-            transaction.dr_amount
-            for transaction in transactions
-            if transaction.transaction_type == "dr"
-        )
-        credit = sum(
-            transaction.cr_amount
-            for transaction in transactions
-            if transaction.transaction_type == "cr"
-        )
-        return abs(debit - credit)
+        return abs(self._get_ledger_balances(self.ids, as_of=date).get(self.id, 0.0))
 
-    @api.model
     def get_balance_as_of_date_for_bs(self, date, company_id):
         self.ensure_one()
+        return self._get_bs_balances(self.ids, date, company_id).get(self.id, 0.0)
 
-        # Fetch transactions for the specific account, date, and company
-        transactions = self.env["idil.transaction_bookingline"].search(
-            [
-                ("account_number", "=", self.id),
-                ("transaction_date", "<=", date),
-                (
-                    "company_id",
-                    "=",
-                    company_id,
-                ),  # Ensure transactions are filtered by company
-            ]
+    @api.model
+    def _get_bs_balances(self, account_ids, date, company_id):
+        """Return ``{account_id: balance}`` in USD as of ``date``.
+
+        Lines are grouped per account, currency and day, and each group is
+        divided by the rate of that day in one ``convert`` call per currency.
+        The rate is the newest one on or before the day whatever its company,
+        as this report always did, not the company specific rate the other
+        reports prefer.
+        """
+        if not account_ids:
+            return {}
+        self.env["idil.transaction_bookingline"].flush_model()
+        self.env.cr.execute(
+            """
+            SELECT
+                tb.account_number AS account_id,
+                tb.currency_id,
+                tb.transaction_date AS tdate,
+                SUM(CASE WHEN tb.transaction_type = 'dr'
+                         THEN tb.dr_amount ELSE 0 END)
+                - SUM(CASE WHEN tb.transaction_type = 'cr'
+                           THEN tb.cr_amount ELSE 0 END) AS net
+            FROM idil_transaction_bookingline tb
+            WHERE tb.account_number IN %(accounts)s
+              AND tb.transaction_date <= %(date)s::date
+              AND tb.company_id = %(company_id)s
+            GROUP BY tb.account_number, tb.currency_id, tb.transaction_date
+            ORDER BY tb.transaction_date
+            """,
+            {
+                "accounts": tuple(account_ids),
+                "date": date,
+                "company_id": company_id,
+            },
         )
-
-        total_debit = 0
-        total_credit = 0
-
-        if not transactions:
-            print(
-                f"No transactions found for Account: {self.name} up to {date} for Company ID: {company_id}"
-            )
-
-        for transaction in transactions:
-            print(
-                f"Processing Transaction ID: {transaction.id} on {transaction.transaction_date} with amount {transaction.dr_amount if transaction.transaction_type == 'dr' else transaction.cr_amount}"
+        daily_by_currency = {}
+        for row in self.env.cr.dictfetchall():
+            daily_by_currency.setdefault(row["currency_id"], []).append(row)
+
+        RateService = self.env["idil.currency.rate.service"]
+        balances = {}
+        for currency_id, daily in daily_by_currency.items():
+            amounts = RateService.convert(
+                [(float(row["net"] or 0.0), row["tdate"]) for row in daily],
+                currency_id,
+                None,
+                company_id,
+                missing_rate=None,
+                any_company=True,
             )
-
-            conversion_rate = self._get_conversion_rate(
-                transaction.currency_id.id, transaction.transaction_date
-            )
-
-            if not conversion_rate:
-                raise UserError(
-                    _("Conversion rate not found for %s to %s as of %s")
-                    % (
-                        transaction.currency_id.name,
-                        self.env.ref("base.USD").name,
-                        transaction.transaction_date,
+            for row, amount in zip(daily, amounts):
+                if amount is None:
+                    raise UserError(
+                        _("Conversion rate not found for %s to %s as of %s")
+                        % (
+                            self.env["res.currency"].browse(currency_id).name,
+                            self.env.ref("base.USD").name,
+                            row["tdate"],
+                        )
                     )
+                balances[row["account_id"]] = (
+                    balances.get(row["account_id"], 0.0) + amount
                 )
-
-            if transaction.transaction_type == "dr":
-                total_debit += transaction.dr_amount / conversion_rate
-            elif transaction.transaction_type == "cr":
-                total_credit += transaction.cr_amount / conversion_rate
-
-        balance = total_debit - total_credit
-        print(f"Final Balance for Account: {self.name} as of {date}: {balance}")
-
-        return balance
+        return balances
 
     @api.model
     def _get_conversion_rate(self, from_currency_id, date):
@@ -697,24 +747,19 @@ class Account(models.Model):
         if not from_currency or not to_currency:
             raise UserError(_("Invalid currency provided"))
 
-        # Get the currency rate model
-        currency_rate = self.env["res.currency.rate"]
-
-        # Search for the conversion rate
-        # We should filter by 'currency_id' (the currency field) and not 'rate_currency_id'
-        rate_record = currency_rate.search(
-            [("currency_id", "=", from_currency.id), ("name", "<=", date)],
-            limit=1,
-            order="name desc",
+        # Latest rate of any company on or before the date, from the cached
+        # rate curve
+        rate = self.env["idil.currency.rate.service"].get_rate(
+            from_currency, date, any_company=True
         )
 
-        if not rate_record:
+        if not rate:
             raise UserError(
                 _("Conversion rate not found for %s to %s as of %s")
                 % (from_currency.name, to_currency.name, date)
             )
 
-        return rate_record.rate
+        return rate
 
 
 class AccountBalanceReport(models.TransientModel):
@@ -737,25 +782,11 @@ class AccountBalanceReport(models.TransientModel):
 
     @api.depends("account_id")
     def _compute_balance(self):
+        balances = self.env["idil.chart.account"]._get_ledger_balances(
+            self.mapped("account_id").ids
+        )
         for report in self:
-            # Initialize balance to 0 for each report entry
-            report.balance = 0
-            # Find transactions related to this account_code
-            transactions = self.env["idil.transaction_bookingline"].search(
-                [("account_number", "=", report.account_id.id)]
-            )
-            debit = sum(
-                transactions.filtered(lambda r: r.transaction_type == "dr").mapped(
-                    "dr_amount"
-                )
-            )
-            credit = sum(
-                transactions.filtered(lambda r: r.transaction_type == "cr").mapped(
-                    "cr_amount"
-                )
-            )
-            # Calculate balance
-            report.balance = abs(debit - credit)
+            report.balance = abs(balances.get(report.account_id.id, 0.0))
 
     @api.model
     def generate_account_balances_report(self):
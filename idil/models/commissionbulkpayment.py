@@ -197,15 +197,9 @@ class CommissionBulkPayment(models.Model):
         self.state = "confirmed"
 
     def _get_cash_account_balance(self):
-        self.env.cr.execute(
-            """
-            SELECT COALESCE(SUM(dr_amount), 0) - COALESCE(SUM(cr_amount), 0)
-            FROM idil_transaction_bookingline
-            WHERE account_number = %s
-            """,
-            (self.cash_account_id.id,),
+        return self.env["idil.account.daily.balance"].get_balance(
+            self.cash_account_id
         )
-        return self.env.cr.fetchone()[0]
 
     @api.model
     def create(self, vals):
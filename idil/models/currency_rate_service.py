@@ -0,0 +1,188 @@
+from bisect import bisect_right
+
+from odoo import models, fields, api, tools
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class CurrencyRateService(models.AbstractModel):
+    """Shared ``res.currency.rate`` lookups for bulk conversions.
+
+    The rate history of a currency is loaded once into sorted arrays and
+    cached in the registry; "rate as of date" is then a binary search. Like
+    ``res.currency._get_rates``, a company specific rate wins over a rate
+    shared by all companies. Without a company, the newest rate of any
+    company is used.
+    """
+
+    _name = "idil.currency.rate.service"
+    _description = "Currency Rate Service"
+
+    @api.model
+    @tools.ormcache("currency_id", "company_id")
+    def _get_rate_curve(self, currency_id, company_id):
+        self.env["res.currency.rate"].flush_model(
+            ["rate", "currency_id", "company_id", "name"]
+        )
+        self.env.cr.execute(
+            """
+            SELECT name, rate, company_id IS NOT NULL AND %(company)s IS NOT NULL
+            FROM res_currency_rate
+            WHERE currency_id = %(currency)s
+              AND (
+                  company_id IS NULL
+                  OR company_id = %(company)s
+                  OR %(company)s IS NULL
+              )
+            ORDER BY name
+            """,
+            {"currency": currency_id, "company": company_id},
+        )
+        company_dates, company_rates = [], []
+        shared_dates, shared_rates = [], []
+        for name, rate, is_company in self.env.cr.fetchall():
+            if is_company:
+                company_dates.append(name)
+                company_rates.append(rate)
+            else:
+                shared_dates.append(name)
+                shared_rates.append(rate)
+        return (
+            (tuple(company_dates), tuple(company_rates)),
+            (tuple(shared_dates), tuple(shared_rates)),
+        )
+
+    @api.model
+    def _rate_sql(self, currency_expr, date_expr, default="1.0"):
+        """SQL expression for the rate of ``currency_expr`` as of ``date_expr``.
+
+        Follows ``res.currency._get_rates`` so PostgreSQL-side conversions
+        match ``_convert``. The surrounding query must provide a
+        ``%(company_id)s`` parameter.
+
+        :param default: SQL value used when no rate exists, or None to get
+            NULL so the caller can report the missing rate
+        """
+        rate = f"""(
+                SELECT r.rate
+                FROM res_currency_rate r
+                WHERE r.currency_id = {currency_expr}
+                  AND r.name <= {date_expr}
+                  AND (r.company_id IS NULL OR r.company_id = %(company_id)s)
+                ORDER BY r.company_id, r.name DESC
+                LIMIT 1
+            )"""
+        if default is None:
+            return rate
+        return f"COALESCE({rate}, {default})"
+
+    @api.model
+    def get_rates(
+        self, currency, dates, company=None, strict_company=False, any_company=False
+    ):
+        """Return the rate of ``currency`` as of each of ``dates``.
+
+        :param currency: ``res.currency`` record or id
+        :param dates: iterable of dates (or date strings)
+        :param company: ``res.company`` record or id, defaults to env.company
+        :param strict_company: only use the rates of the company, not the
+            ones shared by all companies
+        :param any_company: use the newest rate whatever its company, like a
+            plain ``res.currency.rate`` search
+        :return: list of rates, ``None`` where no rate exists on or before
+            the date
+        """
+        currency_id = _to_id(currency)
+        company_id = None if any_company else _to_id(company) or self.env.company.id
+        curves = self._get_rate_curve(currency_id, company_id)
+        if strict_company:
+            curves = curves[:1]
+
+        rates = []
+        for date in dates:
+            date = fields.Date.to_date(date)
+            rate = None
+            if date:
+                for curve_dates, curve_rates in curves:
+                    pos = bisect_right(curve_dates, date)
+                    if pos:
+                        rate = curve_rates[pos - 1]
+                        break
+            rates.append(rate)
+        return rates
+
+    @api.model
+    def get_rate(
+        self, currency, date, company=None, strict_company=False, any_company=False
+    ):
+        rates = self.get_rates(currency, [date], company, strict_company, any_company)
+        return rates[0]
+
+    @api.model
+    def convert(
+        self,
+        amounts_dates,
+        from_currency,
+        to_currency,
+        company=None,
+        missing_rate=1.0,
+        any_company=False,
+    ):
+        """Convert a column of ``(amount, date)`` pairs in one call.
+
+        Uses the same formula as ``res.currency._convert`` without rounding,
+        so callers can sum the result and round once.
+
+        :param to_currency: target currency, or None to only divide by the
+            rate of ``from_currency``
+        :param missing_rate: rate used when none exists on or before the
+            date (1.0, like ``_convert``); with None the converted amount is
+            None so the caller can report the missing rate
+        :param any_company: see ``get_rates``
+        """
+        from_id = _to_id(from_currency)
+        to_id = _to_id(to_currency)
+        pairs = list(amounts_dates)
+        if to_id and from_id == to_id:
+            return [amount or 0.0 for amount, _date in pairs]
+
+        dates = [date for _amount, date in pairs]
+        from_rates = self.get_rates(from_id, dates, company, any_company=any_company)
+        if to_id:
+            to_rates = self.get_rates(to_id, dates, company, any_company=any_company)
+        else:
+            to_rates = [1.0] * len(dates)
+        amounts = []
+        for (amount, _date), from_rate, to_rate in zip(pairs, from_rates, to_rates):
+            from_rate = from_rate or missing_rate
+            to_rate = to_rate or missing_rate
+            if from_rate is None or to_rate is None:
+                amounts.append(None)
+            else:
+                amounts.append((amount or 0.0) * to_rate / from_rate)
+        return amounts
+
+
+class CurrencyRate(models.Model):
+    _inherit = "res.currency.rate"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(CurrencyRate, self).create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super(CurrencyRate, self).write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super(CurrencyRate, self).unlink()
+        self.env.registry.clear_cache()
+        return res
+
+
+def _to_id(record):
+    return record.id if isinstance(record, models.BaseModel) else record
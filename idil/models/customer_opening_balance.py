@@ -180,56 +180,48 @@ class CustomerOpeningBalance(models.Model):
                         }
                     )
                     # Debit the customer receivable account
-                    record.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "customer_opening_balance_id": line.id,
-                            "account_number": line.account_id.id,
-                            "transaction_type": "dr",
-                            "dr_amount": line.amount,
-                            "cr_amount": 0,
-                            "transaction_date": record.date,
-                            "description": f"Opening Balance for {line.customer_id.name}",
-                        }
-                    )
-                    # Credit source clearing account (local currency)
-                    record.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "customer_opening_balance_id": line.id,
-                            "account_number": source_clearing_account.id,
-                            "transaction_type": "cr",
-                            "dr_amount": 0.0,
-                            "cr_amount": line.amount,
-                            "transaction_date": record.date,
-                            "description": f"Opening Balance for {line.customer_id.name}",
-                        }
-                    )
-                    # Credit target clearing account (USD)
-                    record.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "customer_opening_balance_id": line.id,
-                            "account_number": EquityAccount.id,
-                            "transaction_type": "cr",
-                            "dr_amount": 0.0,
-                            "cr_amount": cost_amount_usd,
-                            "transaction_date": record.date,
-                            "description": f"Opening Balance for {line.customer_id.name}",
-                        }
-                    )
-                    # Debit target clearing account (USD)
-                    record.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "customer_opening_balance_id": line.id,
-                            "account_number": target_clearing_account.id,
-                            "transaction_type": "dr",
-                            "dr_amount": cost_amount_usd,
-                            "cr_amount": 0.0,
-                            "transaction_date": record.date,
-                            "description": f"Opening Balance for {line.customer_id.name}",
-                        }
+                    transaction_booking.post_lines(
+                        [
+                            {
+                                "customer_opening_balance_id": line.id,
+                                "account_number": line.account_id.id,
+                                "transaction_type": "dr",
+                                "dr_amount": line.amount,
+                                "cr_amount": 0,
+                                "transaction_date": record.date,
+                                "description": f"Opening Balance for {line.customer_id.name}",
+                            },
+                            # Credit source clearing account (local currency)
+                            {
+                                "customer_opening_balance_id": line.id,
+                                "account_number": source_clearing_account.id,
+                                "transaction_type": "cr",
+                                "dr_amount": 0.0,
+                                "cr_amount": line.amount,
+                                "transaction_date": record.date,
+                                "description": f"Opening Balance for {line.customer_id.name}",
+                            },
+                            # Credit target clearing account (USD)
+                            {
+                                "customer_opening_balance_id": line.id,
+                                "account_number": EquityAccount.id,
+                                "transaction_type": "cr",
+                                "dr_amount": 0.0,
+                                "cr_amount": cost_amount_usd,
+                                "transaction_date": record.date,
+                                "description": f"Opening Balance for {line.customer_id.name}",
+                            },
+                            # Debit target clearing account (USD)
+                            {
+                                "customer_opening_balance_id": line.id,
+                                "account_number": target_clearing_account.id,
+                                "transaction_type": "dr",
+                                "dr_amount": cost_amount_usd,
+                                "cr_amount": 0.0,
+                                "transaction_date": record.date,
+                                "description": f"Opening Balance for {line.customer_id.name}",
+                            },
+                        ]
                     )
                     # Create customer receipt
                     record.env["idil.sales.receipt"].create(
@@ -412,10 +404,9 @@ class CustomerOpeningBalance(models.Model):
                                     "customer_opening_balance_id": line.id,
                                 }
                             )
-                            self.env["idil.transaction_bookingline"].create(
+                            booking.post_lines(
                                 [
                                     {
-                                        "transaction_booking_id": booking.id,
                                         "customer_opening_balance_id": line.id,
                                         "account_number": line.account_id.id,
                                         "transaction_type": "dr",
@@ -425,7 +416,6 @@ class CustomerOpeningBalance(models.Model):
                                         "description": f"Opening Balance for {line.customer_id.name}",
                                     },
                                     {
-                                        "transaction_booking_id": booking.id,
                                         "customer_opening_balance_id": line.id,
                                         "account_number": source_clearing.id,
                                         "transaction_type": "cr",
@@ -435,7 +425,6 @@ class CustomerOpeningBalance(models.Model):
                                         "description": f"Opening Balance for {line.customer_id.name}",
                                     },
                                     {
-                                        "transaction_booking_id": booking.id,
                                         "customer_opening_balance_id": line.id,
                                         "account_number": equity_account.id,
                                         "transaction_type": "cr",
@@ -445,7 +434,6 @@ class CustomerOpeningBalance(models.Model):
                                         "description": f"Opening Balance for {line.customer_id.name}",
                                     },
                                     {
-                                        "transaction_booking_id": booking.id,
                                         "customer_opening_balance_id": line.id,
                                         "account_number": target_clearing.id,
                                         "transaction_type": "dr",
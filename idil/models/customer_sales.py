@@ -397,6 +397,7 @@ class CustomerSaleOrder(models.Model):
                         )
 
                     total_debit = 0
+                    line_vals = []
                     # For each order line, create a booking line entry for debit
                     for line in order.order_lines:
                         product = line.product_id
@@ -475,9 +476,8 @@ class CustomerSaleOrder(models.Model):
                                     )
 
                         # Credit entry Expanses inventory of COGS account for the product
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": transaction_booking.id,
                                 "description": f"Sales Order -- Expanses COGS account for - {product.name}",
                                 "product_id": product.id,
                                 "account_number": product.account_cogs_id.id,
@@ -490,9 +490,8 @@ class CustomerSaleOrder(models.Model):
                             }
                         )
                         # Credit entry asset inventory account of the product
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": transaction_booking.id,
                                 "description": f"Sales Inventory account for - {product.name}",
                                 "product_id": product.id,
                                 "account_number": product.asset_account_id.id,
@@ -505,9 +504,8 @@ class CustomerSaleOrder(models.Model):
                         )
                         # ------------------------------------------------------------------------------------------------------
                         # Debit entry for the order line amount Sales Account Receivable
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": transaction_booking.id,
                                 "description": f"Sale of {product.name}",
                                 "product_id": product.id,
                                 "account_number": account_to_use.id,
@@ -521,9 +519,8 @@ class CustomerSaleOrder(models.Model):
                         total_debit += line.subtotal
 
                         # Credit entry using the product's income account
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": transaction_booking.id,
                                 "description": f"Sales Revenue - {product.name}",
                                 "product_id": product.id,
                                 "account_number": product.income_account_id.id,
@@ -536,6 +533,8 @@ class CustomerSaleOrder(models.Model):
                         )
                         # After booking the entries, confirm the place order
 
+                    transaction_booking.post_lines(line_vals)
+
         except Exception as e:
             _logger.error(f"transaction failed: {str(e)}")
             raise ValidationError(f"Transaction failed: {str(e)}")
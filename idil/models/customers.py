@@ -3,9 +3,18 @@ from odoo import models, fields, api
 
 class Customer(models.Model):
     _name = "idil.customer.registration"
-    _inherit = ["mail.thread", "mail.activity.mixin"]
+    _inherit = ["mail.thread", "mail.activity.mixin", "idil.partner.balance.mixin"]
     _description = "Customer Registration"
 
+    _balance_field = "customer_balance"
+    _balance_source = "idil.sales.receipt"
+    _balance_key = "customer_id"
+    _balance_columns = ("customer_id", "remaining_amount", "payment_status")
+    _balance_expression = (
+        "CASE WHEN {row}.payment_status IS DISTINCT FROM 'paid' "
+        "THEN COALESCE({row}.remaining_amount, 0) ELSE 0 END"
+    )
+
     name = fields.Char(string="Name", required=True, tracking=True)
     type_id = fields.Many2one(
         comodel_name="idil.customer.type.registration",
@@ -44,8 +53,10 @@ class Customer(models.Model):
     )
     customer_balance = fields.Float(
         string="Customer Balance",
-        compute="_compute_total_receipt_due",
-        store=False,  # set to True if you want to store the result in the database
+        readonly=True,
+        copy=False,
+        help="Remaining amount of the unpaid sales receipts. Kept in sync by a "
+        "database trigger on idil.sales.receipt.",
     )
 
     # Relation field to display related sale orders (transactions)
@@ -66,25 +77,6 @@ class Customer(models.Model):
         help="Select Employee",
     )
 
-    @api.depends("sale_order_ids")
-    def _compute_total_receipt_due(self):
-        for rec in self:
-            total_due = 0.0
-            receipts = self.env["idil.sales.receipt"].search(
-                [("customer_id", "=", rec.id), ("payment_status", "!=", "paid")]
-            )
-            total_due = sum(receipts.mapped("remaining_amount"))
-            rec.customer_balance = total_due
-
-    @api.depends("sale_order_ids.balance_due", "sale_order_ids.state")
-    def _compute_customer_balance(self):
-        for rec in self:
-            balance = 0.0
-            for order in rec.sale_order_ids:
-                if order.state != "cancel":
-                    balance += order.balance_due
-            rec.customer_balance = balance
-
     @api.depends("cusotmer_payment_ids.amount")
     def _compute_customer_payment_balance(self):
         """
@@ -96,4 +88,4 @@ class Customer(models.Model):
             balance = 0.0
             for order in rec.sale_order_ids:
                 balance += order.balance_due
-            rec.customer_balance = balance
+            rec.customer_Payment_balance = balance
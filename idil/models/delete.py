@@ -15,6 +15,8 @@ class ModelA(models.Model):
             "idil.stock.adjustment",
             "idil.product.movement",
             "idil.item.movement",
+            "idil.product.movement.archive",
+            "idil.item.movement.archive",
             "idil.account.balance.report",
             "idil.customer.sale.order.line",
             "idil.customer.sale.order",
@@ -44,24 +46,6 @@ class ModelA(models.Model):
 
         deletion_summary = []
 
-        # ✅ Update stock_quantity to 0 in my_product.product
-        try:
-            products = self.env["my_product.product"].search([])
-            if products:
-                product_count = len(products)
-                products.write({"stock_quantity": 0})
-                message = f"Set stock_quantity to zero for {product_count} products in my_product.product."
-                self._logger.info(message)
-                deletion_summary.append(message)
-            else:
-                deletion_summary.append(
-                    "No products found in my_product.product to update."
-                )
-        except Exception as e:
-            self._logger.error(
-                f"Error updating stock quantities in my_product.product: {e}"
-            )
-
         # ✅ Update opening_balance to 0 in idil.vendor_registration
         try:
             vendors = self.env["idil.vendor.registration"].search([])
@@ -148,4 +132,20 @@ class ModelA(models.Model):
                 self._logger.error(message)
                 deletion_summary.append(message)
 
+        # ✅ Stock quantities follow the (now deleted) product movements
+        try:
+            self.env["my_product.product"]._rebuild_stock_quantity()
+            message = "Rebuilt stock_quantity of my_product.product from the remaining movements."
+            self._logger.info(message)
+            deletion_summary.append(message)
+        except Exception as e:
+            self._logger.error(
+                f"Error updating stock quantities in my_product.product: {e}"
+            )
+
+        # Archived periods are gone with the archive tables.
+        self.env["ir.config_parameter"].sudo().set_param(
+            "idil.movement_archived_until", False
+        )
+
         return "\n".join(deletion_summary)
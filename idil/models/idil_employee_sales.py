@@ -138,6 +138,7 @@ class IdilStaffSales(models.Model):
                         }
                     )
 
+                    line_vals = []
                     for line in rec.line_ids:
                         product = line.product_id
                         qty = line.quantity
@@ -237,9 +238,8 @@ class IdilStaffSales(models.Model):
                         )
 
                         # Booking lines
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": booking.id,
                                 "product_id": product.id,
                                 "account_number": rec.employee_id.account_receivable_id.id,
                                 "transaction_type": "dr",
@@ -250,9 +250,8 @@ class IdilStaffSales(models.Model):
                             }
                         )
 
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": booking.id,
                                 "product_id": product.id,
                                 "account_number": product.income_account_id.id,
                                 "transaction_type": "cr",
@@ -263,9 +262,8 @@ class IdilStaffSales(models.Model):
                             }
                         )
 
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": booking.id,
                                 "product_id": product.id,
                                 "account_number": product.account_cogs_id.id,
                                 "transaction_type": "dr",
@@ -276,9 +274,8 @@ class IdilStaffSales(models.Model):
                             }
                         )
 
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": booking.id,
                                 "product_id": product.id,
                                 "account_number": product.asset_account_id.id,
                                 "transaction_type": "cr",
@@ -289,6 +286,8 @@ class IdilStaffSales(models.Model):
                             }
                         )
 
+                    booking.post_lines(line_vals)
+
                     # ✅ Only mark as confirmed if all operations succeed
                     rec.write({"state": "confirmed"})
 
@@ -0,0 +1,393 @@
+from datetime import datetime, time, timedelta
+
+import pytz
+
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Set for the transaction to keep snapshots when movements are rewritten
+# without changing any sum, e.g. when a period is archived.
+FROZEN_SETTING = "idil.inventory_snapshot_frozen"
+
+
+class InventorySnapshot(models.Model):
+    """End of day on-hand quantity and unit cost per item / product.
+
+    Rows are written by a scheduled job, one per stocked SKU and day. A
+    valuation as of a date starts from the nearest snapshot of each SKU on
+    or before it and only replays the movements of that SKU after the
+    snapshot. A trigger on the movement tables deletes the snapshots of the
+    SKU of a movement that is created, changed or deleted, from the day of
+    the movement on, so back-dated movements are never missed.
+    """
+
+    _name = "idil.inventory.snapshot"
+    _description = "Inventory Snapshot"
+    _order = "date desc, id"
+
+    date = fields.Date(string="Date", required=True, index=True, readonly=True)
+    day_end = fields.Datetime(
+        string="Day End",
+        readonly=True,
+        help="End of the snapshot day in UTC, for Datetime movements.",
+    )
+    item_id = fields.Many2one(
+        "idil.item", string="Item", ondelete="cascade", readonly=True, index=True
+    )
+    product_id = fields.Many2one(
+        "my_product.product",
+        string="Product",
+        ondelete="cascade",
+        readonly=True,
+        index=True,
+    )
+    quantity = fields.Float(string="Quantity", digits=(16, 5), readonly=True)
+    unit_cost = fields.Float(string="Unit Cost", digits=(16, 5), readonly=True)
+    value = fields.Float(string="Value", digits=(16, 5), readonly=True)
+    currency_id = fields.Many2one("res.currency", string="Currency", readonly=True)
+
+    def init(self):
+        self.env.cr.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idil_inventory_snapshot_key
+            ON idil_inventory_snapshot
+                (date, COALESCE(item_id, 0), COALESCE(product_id, 0))
+            """
+        )
+        # Snapshots taken before day_end was stored cannot be replayed from.
+        self.env.cr.execute("DELETE FROM idil_inventory_snapshot WHERE day_end IS NULL")
+
+    @api.model
+    def _install_invalidation_trigger(self, movement_model):
+        """Create the trigger deleting stale snapshots on the table of
+        ``movement_model``.
+
+        Called from ``init`` of the movement models. Only the snapshots of the
+        movement's SKU are deleted. Datetime movements are compared with the
+        UTC end of the snapshot day, so the trigger needs no timezone.
+        """
+        Movement = self.env[movement_model]
+        table = Movement._table
+        name = f"{table}_snapshot_invalidate"
+        key = Movement._archive_key
+        if Movement._fields["date"].type == "datetime":
+            stale = "day_end > {row}.date"
+        else:
+            stale = "date >= {row}.date"
+        self.env.cr.execute(
+            f"""
+            CREATE OR REPLACE FUNCTION {name}()
+            RETURNS trigger AS $$
+            BEGIN
+                IF current_setting('{FROZEN_SETTING}', true) = 'on' THEN
+                    RETURN NULL;
+                END IF;
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    DELETE FROM idil_inventory_snapshot
+                    WHERE {key} = OLD.{key} AND {stale.format(row="OLD")};
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    DELETE FROM idil_inventory_snapshot
+                    WHERE {key} = NEW.{key} AND {stale.format(row="NEW")};
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS {name} ON {table};
+            CREATE TRIGGER {name}
+            AFTER INSERT OR DELETE
+                OR UPDATE OF {key}, date, movement_type, quantity
+            ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {name}()
+            """
+        )
+
+    @api.model
+    def _freeze(self, frozen=True):
+        """Keep the snapshots while movements are rewritten in the current
+        transaction without changing any sum."""
+        self.env.cr.execute(
+            "SELECT set_config(%s, %s, true)",
+            (FROZEN_SETTING, "on" if frozen else "off"),
+        )
+
+    @api.model
+    def _day_start_utc(self, date):
+        """Return the UTC datetime at which ``date`` starts in the user's
+        timezone, to compare it with Datetime columns."""
+        tz = pytz.timezone(self.env.context.get("tz") or self.env.user.tz or "UTC")
+        start = tz.localize(datetime.combine(date, time.min))
+        return start.astimezone(pytz.utc).replace(tzinfo=None)
+
+    @api.model
+    def _cron_take_snapshot(self):
+        # Movements of the current day would delete its snapshot right away.
+        self.take_snapshot(fields.Date.context_today(self) - timedelta(days=1))
+
+    @api.model
+    def take_snapshot(self, date):
+        """(Re)write the snapshot of ``date`` with one query per SKU kind."""
+        date = fields.Date.to_date(date)
+        self.env["idil.item.movement"].flush_model()
+        self.env["idil.product.movement"].flush_model()
+        self.env["idil.item"].flush_model(["cost_price", "currency_id"])
+        self.env["my_product.product"].flush_model(["cost", "currency_id", "bom_id"])
+
+        item_source = self.env["idil.item.movement"]._movement_source(date_to=date)
+        product_source = self.env["idil.product.movement"]._movement_source(
+            date_to=date
+        )
+        cr = self.env.cr
+        params = {
+            "date": date,
+            "day_end": self._day_start_utc(date + timedelta(days=1)),
+            "uid": self.env.uid,
+        }
+        cr.execute("DELETE FROM idil_inventory_snapshot WHERE date = %s", (date,))
+        cr.execute(
+            f"""
+            INSERT INTO idil_inventory_snapshot
+                (date, day_end, item_id, quantity, unit_cost, value, currency_id,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT
+                %(date)s, %(day_end)s, i.id, q.qty, COALESCE(i.cost_price, 0),
+                q.qty * COALESCE(i.cost_price, 0), i.currency_id,
+                %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM (
+                SELECT item_id, SUM(quantity) AS qty
+                FROM {item_source}
+                WHERE movement_type IN ('in', 'out') AND date <= %(date)s
+                GROUP BY item_id
+            ) q
+            JOIN idil_item i ON i.id = q.item_id
+            WHERE ROUND(q.qty::numeric, 5) <> 0
+            """,
+            params,
+        )
+        item_count = cr.rowcount
+        cr.execute(
+            f"""
+            INSERT INTO idil_inventory_snapshot
+                (date, day_end, product_id, quantity, unit_cost, value, currency_id,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT
+                %(date)s, %(day_end)s, p.id, q.qty, COALESCE(p.cost, 0),
+                q.qty * COALESCE(p.cost, 0), COALESCE(b.currency_id, p.currency_id),
+                %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM (
+                SELECT product_id, SUM(quantity) AS qty
+                FROM {product_source}
+                WHERE movement_type IN ('in', 'out') AND date < %(day_end)s
+                GROUP BY product_id
+            ) q
+            JOIN my_product_product p ON p.id = q.product_id
+            LEFT JOIN idil_bom b ON b.id = p.bom_id
+            WHERE ROUND(q.qty::numeric, 5) <> 0
+            """,
+            params,
+        )
+        self.invalidate_model()
+        _logger.info(
+            "Inventory snapshot of %s: %s item(s), %s product(s).",
+            date,
+            item_count,
+            cr.rowcount,
+        )
+
+    @api.model
+    def get_valuation(self, as_of):
+        """Return the stock valuation as of ``as_of`` as a list of dicts with
+        ``item_id``/``product_id``, ``quantity``, ``unit_cost``, ``value`` and
+        ``currency_id``.
+
+        Quantities are the nearest snapshot of each SKU plus its movements
+        after it; unit costs are the ones captured by that snapshot, or the
+        current cost for SKUs without one.
+        """
+        as_of = fields.Date.to_date(as_of)
+        self.env["idil.item.movement"].flush_model()
+        self.env["idil.product.movement"].flush_model()
+        self.flush_model()
+        params = {
+            "as_of": as_of,
+            "day_end": self._day_start_utc(as_of + timedelta(days=1)),
+        }
+        rows = self._get_sku_valuation("idil.item.movement", params)
+        rows += self._get_sku_valuation("idil.product.movement", params)
+
+        valuation = []
+        for row in rows:
+            if round(row["quantity"], 5) == 0:
+                continue
+            row["value"] = row["quantity"] * row["unit_cost"]
+            valuation.append(row)
+        return valuation
+
+    @api.model
+    def _get_sku_valuation(self, movement_model, params):
+        """Return the valuation rows of the SKUs of ``movement_model``.
+
+        Each SKU replays its movements after its own snapshot, or from the
+        start of history when it has none, up to ``as_of``.
+        """
+        Movement = self.env[movement_model]
+        key = Movement._archive_key
+        cr = self.env.cr
+        cr.execute(
+            f"""
+            SELECT MIN(date) FROM (
+                SELECT MAX(date) AS date
+                FROM idil_inventory_snapshot
+                WHERE {key} IS NOT NULL AND date <= %(as_of)s
+                GROUP BY {key}
+            ) s
+            """,
+            params,
+        )
+        oldest = cr.fetchone()[0]
+        # Replaying from before the archive cutoff needs the archived detail.
+        source = Movement._movement_source(
+            oldest and oldest + timedelta(days=1), params["as_of"]
+        )
+        if Movement._fields["date"].type == "datetime":
+            after = "m.date >= b.day_end"
+            until = "m.date < %(day_end)s"
+        else:
+            after = "m.date > b.date"
+            until = "m.date <= %(as_of)s"
+        if key == "item_id":
+            sku_table = "idil_item"
+            sku_columns = """
+                COALESCE(b.unit_cost, s.cost_price, 0) AS unit_cost,
+                s.currency_id
+            """
+            bom_join = ""
+        else:
+            sku_table = "my_product_product"
+            sku_columns = """
+                COALESCE(b.unit_cost, s.cost, 0) AS unit_cost,
+                COALESCE(bom.currency_id, s.currency_id) AS currency_id
+            """
+            bom_join = "LEFT JOIN idil_bom bom ON bom.id = s.bom_id"
+        cr.execute(
+            f"""
+            WITH base AS (
+                SELECT DISTINCT ON ({key})
+                    {key} AS sku_id, date, day_end, quantity, unit_cost
+                FROM idil_inventory_snapshot
+                WHERE {key} IS NOT NULL AND date <= %(as_of)s
+                ORDER BY {key}, date DESC
+            ), delta AS (
+                SELECT m.{key} AS sku_id, SUM(m.quantity) AS qty
+                FROM (
+                    SELECT {key}, date, movement_type, quantity FROM {source}
+                ) m
+                LEFT JOIN base b ON b.sku_id = m.{key}
+                WHERE m.movement_type IN ('in', 'out')
+                  AND {until}
+                  AND (b.sku_id IS NULL OR {after})
+                GROUP BY m.{key}
+            )
+            SELECT
+                {"s.id" if key == "item_id" else "NULL::integer"} AS item_id,
+                {"s.id" if key == "product_id" else "NULL::integer"} AS product_id,
+                COALESCE(b.quantity, 0) + COALESCE(d.qty, 0) AS quantity,
+                {sku_columns},
+                b.date AS snapshot_date
+            FROM base b
+            FULL OUTER JOIN delta d ON d.sku_id = b.sku_id
+            JOIN {sku_table} s ON s.id = COALESCE(b.sku_id, d.sku_id)
+            {bom_join}
+            """,
+            params,
+        )
+        return cr.dictfetchall()
+
+
+class InventoryValuationReport(models.TransientModel):
+    _name = "idil.inventory.valuation.report"
+    _description = "Inventory Valuation Report"
+
+    name = fields.Char(string="Description")
+    item_id = fields.Many2one("idil.item", string="Item")
+    product_id = fields.Many2one("my_product.product", string="Product")
+    quantity = fields.Float(string="Quantity", digits=(16, 5))
+    unit_cost = fields.Float(string="Unit Cost", digits=(16, 5))
+    value = fields.Float(string="Value", digits=(16, 5))
+    currency_id = fields.Many2one("res.currency", string="Currency", readonly=True)
+    snapshot_date = fields.Date(string="Snapshot Date")
+
+
+class InventoryValuationWizard(models.TransientModel):
+    _name = "idil.inventory.valuation.wizard"
+    _description = "Inventory Valuation Wizard"
+
+    as_of_date = fields.Date(
+        string="As of Date", required=True, default=fields.Date.context_today
+    )
+
+    @api.constrains("as_of_date")
+    def _check_as_of_date(self):
+        for rec in self:
+            if rec.as_of_date and rec.as_of_date > fields.Date.context_today(rec):
+                raise ValidationError("As of Date cannot be in the future.")
+
+    def action_compute_valuation(self):
+        self.ensure_one()
+        Report = self.env["idil.inventory.valuation.report"]
+        Report.search([]).unlink()
+
+        valuation = self.env["idil.inventory.snapshot"].get_valuation(
+            self.as_of_date
+        )
+        items = self.env["idil.item"].browse(
+            [row["item_id"] for row in valuation if row["item_id"]]
+        )
+        products = self.env["my_product.product"].browse(
+            [row["product_id"] for row in valuation if row["product_id"]]
+        )
+        item_names = dict(zip(items.ids, items.mapped("name")))
+        product_names = dict(zip(products.ids, products.mapped("name")))
+
+        vals_list = []
+        totals = {}
+        for row in sorted(
+            valuation, key=lambda r: (bool(r["product_id"]), r["currency_id"] or 0)
+        ):
+            if row["product_id"]:
+                name = product_names.get(row["product_id"])
+            else:
+                name = item_names.get(row["item_id"])
+            vals_list.append(
+                {
+                    "name": name,
+                    "item_id": row["item_id"],
+                    "product_id": row["product_id"],
+                    "quantity": row["quantity"],
+                    "unit_cost": row["unit_cost"],
+                    "value": row["value"],
+                    "currency_id": row["currency_id"],
+                    "snapshot_date": row["snapshot_date"],
+                }
+            )
+            currency_id = row["currency_id"]
+            totals[currency_id] = totals.get(currency_id, 0.0) + row["value"]
+
+        # One grand total per currency; values are not converted.
+        for currency_id, total in totals.items():
+            vals_list.append(
+                {"name": "Total", "value": total, "currency_id": currency_id}
+            )
+        Report.create(vals_list)
+
+        return {
+            "type": "ir.actions.act_window",
+            "name": f"Inventory Valuation as of {self.as_of_date}",
+            "view_mode": "tree",
+            "res_model": "idil.inventory.valuation.report",
+            "target": "new",
+        }
@@ -167,10 +167,9 @@ class IdilItemOpeningBalance(models.Model):
                     )
 
                     # Booking lines
-                    trx.booking_lines.create(
+                    trx.post_lines(
                         [
                             {
-                                "transaction_booking_id": trx.id,
                                 "item_opening_balance_id": self.id,
                                 "description": f"Opening Balance for {item.name}",
                                 "item_id": item.id,
@@ -182,7 +181,6 @@ class IdilItemOpeningBalance(models.Model):
                                 "transaction_date": self.date,
                             },
                             {
-                                "transaction_booking_id": trx.id,
                                 "item_opening_balance_id": self.id,
                                 "description": f"Opening Balance for {item.name}",
                                 "item_id": item.id,
@@ -316,10 +314,9 @@ class IdilItemOpeningBalance(models.Model):
                         }
                     )
 
-                    trx.booking_lines.create(
+                    trx.post_lines(
                         [
                             {
-                                "transaction_booking_id": trx.id,
                                 "item_opening_balance_id": self.id,
                                 "description": f"Opening Balance for {item.name}",
                                 "item_id": item.id,
@@ -331,7 +328,6 @@ class IdilItemOpeningBalance(models.Model):
                                 "transaction_date": self.date,
                             },
                             {
-                                "transaction_booking_id": trx.id,
                                 "item_opening_balance_id": self.id,
                                 "description": f"Opening Balance for {item.name}",
                                 "item_id": item.id,
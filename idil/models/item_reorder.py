@@ -0,0 +1,176 @@
+from datetime import timedelta
+
+from odoo import models, fields, api
+from odoo.tools import float_compare
+import logging
+
+_logger = logging.getLogger(__name__)
+
+VELOCITY_DAYS_PARAM = "idil.reorder_velocity_days"
+COVER_DAYS_PARAM = "idil.reorder_cover_days"
+
+
+class ItemReorder(models.Model):
+    """Reorder point scanning for ``idil.item``.
+
+    One scan reads on-hand for all items with a ``min`` in one grouped
+    ledger query, the recent OUT movements for the consumption velocity and
+    the last vendor of each item, then rewrites the replenishment
+    suggestions. Each item is notified once when it drops below ``min``;
+    the flag is cleared when its stock recovers.
+    """
+
+    _inherit = "idil.item"
+
+    reorder_notified = fields.Boolean(
+        string="Reorder Notified",
+        readonly=True,
+        copy=False,
+        help="A reorder notification was posted and stock has not recovered "
+        "above the minimum since.",
+    )
+
+    @api.model
+    def _cron_check_reorder(self):
+        self.search([("min", ">", 0)])._scan_reorder_points()
+
+    def check_reorder(self):
+        """Send notifications for items that need reordering."""
+        return self._scan_reorder_points()
+
+    def _get_daily_usage(self, days):
+        """Return ``{item_id: average daily OUT quantity}`` over the last
+        ``days`` days, in one grouped query."""
+        Movement = self.env["idil.item.movement"]
+        Movement.flush_model(["item_id", "date", "quantity", "movement_type"])
+        date_from = fields.Date.context_today(self) - timedelta(days=days - 1)
+        self.env.cr.execute(
+            f"""
+            SELECT item_id, -SUM(quantity)
+            FROM {Movement._movement_source(date_from=date_from)}
+            WHERE item_id IN %s
+              AND movement_type = 'out'
+              AND date >= %s
+            GROUP BY item_id
+            """,
+            (tuple(self.ids), date_from),
+        )
+        return {
+            item_id: quantity / days for item_id, quantity in self.env.cr.fetchall()
+        }
+
+    def _get_last_purchase(self):
+        """Return ``{item_id: (vendor_id, cost_price)}`` from the latest
+        purchase order line of each item."""
+        self.env["idil.purchase_order.line"].flush_model(
+            ["item_id", "order_id", "cost_price"]
+        )
+        self.env["idil.purchase_order"].flush_model(["vendor_id", "purchase_date"])
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT ON (l.item_id) l.item_id, o.vendor_id, l.cost_price
+            FROM idil_purchase_order_line l
+            JOIN idil_purchase_order o ON o.id = l.order_id
+            WHERE l.item_id IN %s
+            ORDER BY l.item_id, o.purchase_date DESC, l.id DESC
+            """,
+            (tuple(self.ids),),
+        )
+        return {
+            item_id: (vendor_id, cost_price)
+            for item_id, vendor_id, cost_price in self.env.cr.fetchall()
+        }
+
+    def _scan_reorder_points(self):
+        """Compare on-hand with ``min`` for all items of ``self`` and rewrite
+        their replenishment suggestions.
+
+        :return: number of items below their minimum
+        """
+        items = self.filtered("min")
+        if not items:
+            return 0
+
+        params = self.env["ir.config_parameter"].sudo()
+        velocity_days = int(params.get_param(VELOCITY_DAYS_PARAM, 30)) or 30
+        cover_days = int(params.get_param(COVER_DAYS_PARAM, 14))
+
+        on_hand = self.env["idil.item.stock.ledger"].get_on_hand(items.ids)
+        daily_usage = items._get_daily_usage(velocity_days)
+        last_purchase = items._get_last_purchase()
+
+        short = self.browse()
+        vals_list = []
+        for item in items:
+            quantity = on_hand.get(item.id, 0.0)
+            if float_compare(quantity, item.min, precision_digits=5) >= 0:
+                continue
+            short |= item
+            usage = daily_usage.get(item.id, 0.0)
+            vendor_id, cost_price = last_purchase.get(
+                item.id, (False, item.cost_price)
+            )
+            # Back to the minimum plus the expected usage over the cover days.
+            suggested_qty = max(item.min + usage * cover_days - quantity, 0.0)
+            vals_list.append(
+                {
+                    "item_id": item.id,
+                    "vendor_id": vendor_id,
+                    "on_hand": quantity,
+                    "min_qty": item.min,
+                    "daily_usage": usage,
+                    "days_of_cover": quantity / usage if usage else 0.0,
+                    "suggested_qty": suggested_qty,
+                    "cost_price": cost_price,
+                    "currency_id": item.currency_id.id,
+                }
+            )
+
+        Suggestion = self.env["idil.item.reorder.suggestion"]
+        Suggestion.search([("item_id", "in", items.ids)]).unlink()
+        Suggestion.create(vals_list)
+
+        # Only items newly below their minimum are notified.
+        to_notify = short.filtered(lambda i: not i.reorder_notified)
+        for item in to_notify:
+            item.message_post(
+                body=f"Item {item.name} needs reordering. "
+                f"Current stock: {on_hand.get(item.id, 0.0):.5f}"
+            )
+        to_notify.write({"reorder_notified": True})
+        (items - short).filtered("reorder_notified").write({"reorder_notified": False})
+
+        _logger.info(
+            "Reorder scan: %s of %s item(s) below minimum.", len(short), len(items)
+        )
+        return len(short)
+
+
+class ItemReorderSuggestion(models.Model):
+    _name = "idil.item.reorder.suggestion"
+    _description = "Item Replenishment Suggestion"
+    _order = "vendor_id, item_id"
+
+    item_id = fields.Many2one(
+        "idil.item", string="Item", required=True, ondelete="cascade", index=True
+    )
+    vendor_id = fields.Many2one(
+        "idil.vendor.registration",
+        string="Vendor",
+        help="Vendor of the latest purchase of the item.",
+    )
+    on_hand = fields.Float(string="On Hand", digits=(16, 5))
+    min_qty = fields.Float(string="Minimum", digits=(16, 5))
+    daily_usage = fields.Float(string="Daily Usage", digits=(16, 5))
+    days_of_cover = fields.Float(string="Days of Cover", digits=(16, 2))
+    suggested_qty = fields.Float(string="Suggested Quantity", digits=(16, 5))
+    cost_price = fields.Float(string="Cost per Unit", digits=(16, 5))
+    amount = fields.Float(
+        string="Amount", digits=(16, 5), compute="_compute_amount", store=True
+    )
+    currency_id = fields.Many2one("res.currency", string="Currency")
+
+    @api.depends("suggested_qty", "cost_price")
+    def _compute_amount(self):
+        for rec in self:
+            rec.amount = rec.suggested_qty * rec.cost_price
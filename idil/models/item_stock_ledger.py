@@ -0,0 +1,89 @@
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class ItemStockLedger(models.AbstractModel):
+    """Set-based stock lookups over ``idil.item.movement``.
+
+    OUT movements are stored with a negative quantity, so the stock of an
+    item is the plain sum of its IN and OUT movements. Every lookup runs as
+    one grouped query for all requested items, served by the
+    ``(item_id, date, id)`` index created by ``idil.item.movement``.
+    """
+
+    _name = "idil.item.stock.ledger"
+    _description = "Item Stock Ledger"
+
+    def _flush_movements(self):
+        self.env["idil.item.movement"].flush_model(
+            ["item_id", "date", "quantity", "movement_type"]
+        )
+
+    @api.model
+    def get_on_hand(self, item_ids, as_of=None):
+        """Return ``{item_id: quantity}`` for the given items.
+
+        :param item_ids: iterable of ``idil.item`` ids
+        :param as_of: optional date; only movements up to and including it
+            count. Dates before the archived period are read from the
+            archive.
+        """
+        item_ids = [i for i in set(item_ids) if i]
+        on_hand = dict.fromkeys(item_ids, 0.0)
+        if not item_ids:
+            return on_hand
+
+        self._flush_movements()
+        source = self.env["idil.item.movement"]._movement_source(date_to=as_of)
+        query = f"""
+            SELECT item_id, COALESCE(SUM(quantity), 0)
+            FROM {source}
+            WHERE item_id IN %s
+              AND movement_type IN ('in', 'out')
+        """
+        params = [tuple(item_ids)]
+        if as_of:
+            query += " AND date <= %s"
+            params.append(fields.Date.to_date(as_of))
+        query += " GROUP BY item_id"
+
+        self.env.cr.execute(query, params)
+        for item_id, quantity in self.env.cr.fetchall():
+            on_hand[item_id] = quantity
+        return on_hand
+
+    @api.model
+    def get_running_balances(self, movement_ids):
+        """Return ``{movement_id: balance}`` where the balance is the stock of
+        the movement's item right after it, ordered by ``(date, id)``.
+
+        The history of each affected item is read once, however many of the
+        given movements belong to it.
+        """
+        movement_ids = [m for m in set(movement_ids) if m]
+        if not movement_ids:
+            return {}
+
+        self._flush_movements()
+        self.env.cr.execute(
+            """
+            SELECT id, balance
+            FROM (
+                SELECT
+                    id,
+                    SUM(quantity) OVER (
+                        PARTITION BY item_id ORDER BY date, id
+                    ) AS balance
+                FROM idil_item_movement
+                WHERE movement_type IN ('in', 'out')
+                  AND item_id IN (
+                        SELECT item_id FROM idil_item_movement WHERE id IN %s
+                  )
+            ) running
+            WHERE id IN %s
+            """,
+            (tuple(movement_ids), tuple(movement_ids)),
+        )
+        return dict(self.env.cr.fetchall())
@@ -139,14 +139,16 @@ class item(models.Model):
 
     @api.depends("movement_ids.quantity", "movement_ids.movement_type")
     def _compute_stock_quantity(self):
-        for product in self:
-            qty_in = sum(
-                m.quantity for m in product.movement_ids if m.movement_type == "in"
-            )
-            qty_out = sum(
-                m.quantity for m in product.movement_ids if m.movement_type == "out"
-            )
-            product.quantity = round(qty_in + qty_out, 5)
+        on_hand = self.env["idil.item.stock.ledger"].get_on_hand(self._origin.ids)
+        for item in self:
+            item.quantity = round(on_hand.get(item._origin.id, 0.0), 5)
+
+    def write(self, vals):
+        res = super(item, self).write(vals)
+        if "cost_price" in vals:
+            # Refresh the BOMs using these items, and only those.
+            self.env["idil.bom"]._propagate_component_costs(items=self)
+        return res
 
     # Add a method to update currency_id for existing records
     def update_currency_id(self):
@@ -210,25 +212,24 @@ class item(models.Model):
             if record.cost_price < 0:
                 raise ValidationError("Cost price must be a positive value.")
 
-    def check_reorder(self):
-        """Send notifications for items that need reordering."""
-        for record in self:
-            if record.quantity < record.min:
-                # Logic to send notification or create a reorder
-                record.message_post(
-                    body=f"Item {record.name} needs reordering. Current stock: {record.quantity}"
-                )
-
 
 class ItemMovement(models.Model):
     _name = "idil.item.movement"
     _description = "Item Movement"
-    _inherit = ["mail.thread", "mail.activity.mixin"]
+    _inherit = ["mail.thread", "mail.activity.mixin", "idil.movement.archive.mixin"]
     _order = "id desc"
 
+    _archive_model = "idil.item.movement.archive"
+    _archive_key = "item_id"
+    _archive_balance_values = {"source": "Archive", "destination": "Opening Balance"}
+
     item_id = fields.Many2one("idil.item", string="Item", required=True, tracking=True)
     date = fields.Date(
-        string="Date", required=True, default=fields.Date.today, tracking=True
+        string="Date",
+        required=True,
+        default=fields.Date.today,
+        index=True,
+        tracking=True,
     )
     quantity = fields.Float(string="Quantity", required=True, tracking=True)
     source = fields.Char(string="Source", required=True, tracking=True)
@@ -299,32 +300,51 @@ class ItemMovement(models.Model):
         tracking=True,
     )
 
+    def init(self):
+        # Serves the grouped "stock as of date" lookups of idil.item.stock.ledger.
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idil_item_movement_item_date_id_idx
+            ON idil_item_movement (item_id, date, id)
+            INCLUDE (movement_type, quantity)
+            """
+        )
+        self.env["idil.inventory.snapshot"]._install_invalidation_trigger(self._name)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(
+            ItemMovement, self.with_context(**self._movement_tracking_context())
+        ).create(vals_list)
+        return records.with_env(self.env)
+
+    def write(self, vals):
+        return super(
+            ItemMovement, self.with_context(**self._movement_tracking_context())
+        ).write(vals)
+
+    @api.constrains("date")
+    def _check_date_not_archived(self):
+        self._check_archived_period()
+
     @api.constrains("item_id", "movement_type", "quantity", "date")
     def _check_enough_stock_on_out(self):
         """
         Prevent negative stock for any OUT movement, evaluated as of the movement's date.
         Uses your formula: IN + OUT (where OUT is stored negative).
+        All OUT movements of the recordset are checked with one ledger query.
         """
         precision = 5  # matches digits=(16,5)
 
-        for m in self:
-            if not m.item_id or m.movement_type != "out":
-                continue
+        outs = self.filtered(lambda m: m.item_id and m.movement_type == "out")
+        if not outs:
+            return
 
-            # Stock balance as of this movement (including it)
-            self.env.cr.execute(
-                """
-                SELECT
-                    COALESCE(SUM(CASE WHEN movement_type = 'in'  THEN quantity ELSE 0 END), 0)
-                + COALESCE(SUM(CASE WHEN movement_type = 'out' THEN quantity ELSE 0 END), 0)
-                FROM idil_item_movement
-                WHERE item_id = %s
-                AND (date < %s OR (date = %s AND id <= %s))
-            """,
-                (m.item_id.id, m.date, m.date, m.id),
-            )
-            (resulting_balance,) = self.env.cr.fetchone()
-            resulting_balance = resulting_balance or 0.0
+        # Stock balance as of each movement (including it)
+        balances = self.env["idil.item.stock.ledger"].get_running_balances(outs.ids)
+
+        for m in outs.sorted(lambda m: (m.date, m.id)):
+            resulting_balance = balances.get(m.id) or 0.0
 
             # Balance BEFORE this record = after - this movement qty
             available_before = resulting_balance - (m.quantity or 0.0)
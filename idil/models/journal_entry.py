@@ -377,13 +377,13 @@ class JournalEntry(models.Model):
                     )
 
                     # ---- Booking lines (unchanged) ----
+                    line_vals = []
                     for line in entry.line_ids:
                         if not line.account_id:
                             continue
                         if line.debit:
-                            self.env["idil.transaction_bookingline"].create(
+                            line_vals.append(
                                 {
-                                    "transaction_booking_id": main_booking.id,
                                     "description": line.description,
                                     "account_number": line.account_id.id,
                                     "transaction_type": "dr",
@@ -393,9 +393,8 @@ class JournalEntry(models.Model):
                                 }
                             )
                         if line.credit:
-                            self.env["idil.transaction_bookingline"].create(
+                            line_vals.append(
                                 {
-                                    "transaction_booking_id": main_booking.id,
                                     "description": line.description,
                                     "account_number": line.account_id.id,
                                     "transaction_type": "cr",
@@ -404,6 +403,9 @@ class JournalEntry(models.Model):
                                     "transaction_date": entry.date,
                                 }
                             )
+                    # Totals are validated by _check_debit_credit; lines may
+                    # mix account currencies.
+                    main_booking.post_lines(line_vals, check_balance=False)
 
                     # ---- Partner-specific side records (no payment_method anywhere) ----
                     if entry.partner_type == "vendor" and entry.vendor_id:
@@ -468,13 +470,13 @@ class JournalEntry(models.Model):
                     main_booking = self.env["idil.transaction_booking"].create(
                         booking_vals
                     )
+                    line_vals = []
                     for line in entry.line_ids:
                         if not line.account_id:
                             continue  # Skip lines without an account_id
                         if line.debit:
-                            self.env["idil.transaction_bookingline"].create(
+                            line_vals.append(
                                 {
-                                    "transaction_booking_id": main_booking.id,
                                     "description": line.description,
                                     "account_number": line.account_id.id,
                                     "transaction_type": "dr",
@@ -484,9 +486,8 @@ class JournalEntry(models.Model):
                                 }
                             )
                         if line.credit:
-                            self.env["idil.transaction_bookingline"].create(
+                            line_vals.append(
                                 {
-                                    "transaction_booking_id": main_booking.id,
                                     "description": line.description,
                                     "account_number": line.account_id.id,
                                     "transaction_type": "cr",
@@ -495,6 +496,9 @@ class JournalEntry(models.Model):
                                     "transaction_date": entry.date,
                                 }
                             )
+                    # Totals are validated by _check_debit_credit; lines may
+                    # mix account currencies.
+                    main_booking.post_lines(line_vals, check_balance=False)
         except Exception as e:
             logger.error(f"transaction failed: {str(e)}")
             raise ValidationError(f"Transaction failed: {str(e)}")
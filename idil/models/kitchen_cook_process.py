@@ -81,9 +81,9 @@ class KitchenCookProcess(models.Model):
                 'payment_status': 'pending',
             })
 
+            line_vals = []
             for line in process.cook_line_ids:
-                self.env['idil.transaction_bookingline'].create({
-                    'transaction_booking_id': transaction_booking.id,
+                line_vals.append({
                     'description': f'Cooked {line.cooked_qty} of {line.item_id.name}',
                     'item_id': line.item_id.id,
                     'account_number': line.item_id.purchase_account_id.id,  # Assuming debit account is 1
@@ -93,8 +93,7 @@ class KitchenCookProcess(models.Model):
 
                     'transaction_date': fields.Date.today(),
                 })
-                self.env['idil.transaction_bookingline'].create({
-                    'transaction_booking_id': transaction_booking.id,
+                line_vals.append({
                     'description': f'Cooked {line.cooked_qty} of {line.item_id.name}',
                     'item_id': line.item_id.id,
                     'account_number': process.kitchen_transfer_id.kitchen_id.inventory_account.id,
@@ -105,6 +104,7 @@ class KitchenCookProcess(models.Model):
                     'dr_amount': 0,
                     'transaction_date': fields.Date.today(),
                 })
+            transaction_booking.post_lines(line_vals)
 
             process.state = 'processed'
 
@@ -103,6 +103,7 @@ class KitchenTransfer(models.Model):
         transaction_booking = self.env['idil.transaction_booking'].create(transaction_booking_vals)
 
         # Create corresponding transaction booking lines
+        line_vals = []
         for line in transfer.transfer_line_ids:
             # Validate the existence of required accounts
             if not transfer.kitchen_id.inventory_account:
@@ -111,8 +112,7 @@ class KitchenTransfer(models.Model):
                 raise UserError(_('Credit account is not set for the item: %s' % line.item_id.name))
 
             # Add debit line
-            self.env['idil.transaction_bookingline'].create({
-                'transaction_booking_id': transaction_booking.id,
+            line_vals.append({
                 'description': f'Debit of Kitchen Transfer for {line.item_id.name}',
                 'item_id': line.item_id.id,
                 'account_number': transfer.kitchen_id.inventory_account.id,
@@ -122,8 +122,7 @@ class KitchenTransfer(models.Model):
                 'transaction_date': fields.Date.today(),
             })
             # Add credit line
-            self.env['idil.transaction_bookingline'].create({
-                'transaction_booking_id': transaction_booking.id,
+            line_vals.append({
                 'description': f'Credit of Kitchen Transfer for {line.item_id.name}',
                 'item_id': line.item_id.id,
                 'account_number': line.item_id.asset_account_id.id,
@@ -132,6 +131,7 @@ class KitchenTransfer(models.Model):
                 'dr_amount': 0,
                 'transaction_date': fields.Date.today(),
             })
+        transaction_booking.post_lines(line_vals)
 
         return transaction_booking
 
@@ -151,10 +151,10 @@ class KitchenTransfer(models.Model):
             ]).unlink()
 
             # Create updated booking lines
+            line_vals = []
             for line in transfer.transfer_line_ids:
                 # Add debit line
-                self.env['idil.transaction_bookingline'].create({
-                    'transaction_booking_id': transaction_booking.id,
+                line_vals.append({
                     'description': f'Debit of Kitchen Transfer for {line.item_id.name}',
                     'item_id': line.item_id.id,
                     'account_number': transfer.kitchen_id.inventory_account.id,
@@ -164,8 +164,7 @@ class KitchenTransfer(models.Model):
                     'transaction_date': fields.Date.today(),
                 })
                 # Add credit line
-                self.env['idil.transaction_bookingline'].create({
-                    'transaction_booking_id': transaction_booking.id,
+                line_vals.append({
                     'description': f'Credit of Kitchen Transfer for {line.item_id.name}',
                     'item_id': line.item_id.id,
                     'account_number': line.item_id.asset_account_id.id,
@@ -174,6 +173,7 @@ class KitchenTransfer(models.Model):
                     'dr_amount': 0,
                     'transaction_date': fields.Date.today(),
                 })
+            transaction_booking.post_lines(line_vals)
 
 
 class KitchenTransferLine(models.Model):
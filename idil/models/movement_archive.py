@@ -0,0 +1,282 @@
+from datetime import datetime, time, timedelta
+
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+import logging
+
+_logger = logging.getLogger(__name__)
+
+ARCHIVED_UNTIL_PARAM = "idil.movement_archived_until"
+TRACKING_PARAM = "idil.movement_tracking"
+
+
+class MovementArchiveMixin(models.AbstractModel):
+    """Storage behaviour shared by ``idil.item.movement`` and
+    ``idil.product.movement``.
+
+    Movements are written by the documents that generate them, so by default
+    they are created and updated without mail tracking (no chatter message,
+    followers or tracking values per row). Set the ``idil.movement_tracking``
+    system parameter to ``1`` to track them again.
+
+    Closed periods can be archived: the movements up to a cutoff date move to
+    an archive table and each item / product gets one opening balance
+    movement dated on the cutoff. Sums from the start of history are
+    unchanged for any date on or after the cutoff; earlier dates and windows
+    crossing the cutoff are read from the archive (see ``_movement_source``).
+    """
+
+    _name = "idil.movement.archive.mixin"
+    _description = "Movement Storage and Archiving"
+
+    # Set by the concrete models.
+    _archive_model = None
+    _archive_key = None
+    _archive_balance_values = {}
+
+    is_archive_balance = fields.Boolean(
+        string="Archived Opening Balance",
+        readonly=True,
+        copy=False,
+        help="Sum of the movements archived up to this date.",
+    )
+
+    @api.model
+    def _movement_tracking_context(self):
+        tracking = self.env["ir.config_parameter"].sudo().get_param(TRACKING_PARAM)
+        if tracking and tracking not in ("0", "False", "false"):
+            return {}
+        return {"tracking_disable": True}
+
+    @api.model
+    def _get_archived_until(self):
+        """Return the last archived date, or ``None``."""
+        value = self.env["ir.config_parameter"].sudo().get_param(ARCHIVED_UNTIL_PARAM)
+        return fields.Date.to_date(value) if value else None
+
+    @api.model
+    def _movement_source(self, date_from=None, date_to=None):
+        """Return the SQL relation to sum movements between two dates from.
+
+        The hot table is enough when the window starts at the beginning of
+        history (or after the cutoff) and ends on or after the cutoff.
+        Otherwise the archived detail is read instead of the opening balance
+        rows. The relation is aliased as the table, so queries written
+        against the table work unchanged.
+        """
+        cutoff = self._get_archived_until()
+        if not cutoff or (
+            (not date_to or fields.Date.to_date(date_to) >= cutoff)
+            and (not date_from or fields.Date.to_date(date_from) > cutoff)
+        ):
+            return self._table
+        columns = f"{self._archive_key}, date, movement_type, quantity"
+        archive = self.env[self._archive_model]._table
+        return f"""(
+            SELECT {columns} FROM {self._table}
+            WHERE NOT COALESCE(is_archive_balance, FALSE)
+            UNION ALL
+            SELECT {columns} FROM {archive}
+        ) AS {self._table}"""
+
+    def _check_archived_period(self):
+        """Called by the ``date`` constraint of the concrete models."""
+        cutoff = self._get_archived_until()
+        if not cutoff:
+            return
+        for movement in self:
+            if movement.is_archive_balance or not movement.date:
+                continue
+            if fields.Date.to_date(movement.date) <= cutoff:
+                raise ValidationError(
+                    f"Movements up to {cutoff} are archived. "
+                    f"A movement dated {movement.date} cannot be recorded."
+                )
+
+    @api.model
+    def _archive_movements(self, cutoff):
+        """Move the movements dated up to ``cutoff`` into the archive table
+        and replace them with one opening balance movement per key.
+
+        :return: number of archived movements
+        """
+        cr = self.env.cr
+        key = self._archive_key
+        archive = self.env[self._archive_model]._table
+        if self._fields["date"].type == "datetime":
+            balance_date = datetime.combine(cutoff, time(23, 59, 59))
+        else:
+            balance_date = cutoff
+        params = {
+            "bound": cutoff + timedelta(days=1),
+            "balance_date": balance_date,
+            "uid": self.env.uid,
+        }
+
+        self.flush_model()
+        cr.execute(f"LOCK TABLE {self._table} IN SHARE ROW EXCLUSIVE MODE")
+        # Sums on or after the cutoff are unchanged, and earlier ones are
+        # read from the archive: inventory snapshots stay valid.
+        Snapshot = self.env["idil.inventory.snapshot"]
+        Snapshot._freeze()
+        # Earlier opening balances only summarise detail that is archived.
+        cr.execute(
+            f"""
+            DELETE FROM {self._table}
+            WHERE is_archive_balance AND date < %(bound)s
+            """,
+            params,
+        )
+        cr.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {self._table}
+                WHERE date < %(bound)s
+                RETURNING *
+            )
+            INSERT INTO {archive}
+                (movement_id, {key}, date, movement_type, quantity, data,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT
+                id, {key}, date, movement_type, quantity, to_jsonb(moved),
+                %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM moved
+            RETURNING movement_id
+            """,
+            params,
+        )
+        moved_ids = [row[0] for row in cr.fetchall()]
+        if moved_ids:
+            # The chatter of archived rows would only keep the hot tables big.
+            for table, model_column in (
+                ("mail_message", "model"),
+                ("mail_followers", "res_model"),
+                ("mail_activity", "res_model"),
+            ):
+                cr.execute(
+                    f"""
+                    DELETE FROM {table}
+                    WHERE {model_column} = %s AND res_id = ANY(%s)
+                    """,
+                    (self._name, moved_ids),
+                )
+
+        columns = ", ".join(self._archive_balance_values)
+        values = ", ".join(f"%({column})s" for column in self._archive_balance_values)
+        params.update(self._archive_balance_values)
+        cr.execute(
+            f"""
+            INSERT INTO {self._table}
+                ({key}, date, movement_type, quantity, is_archive_balance,
+                 {columns}, create_uid, create_date, write_uid, write_date)
+            SELECT
+                {key}, %(balance_date)s, 'in', SUM(quantity), TRUE, {values},
+                %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM {archive}
+            WHERE movement_type IN ('in', 'out')
+            GROUP BY {key}
+            HAVING ROUND(SUM(quantity)::numeric, 5) <> 0
+            """,
+            params,
+        )
+        balance_count = cr.rowcount
+        Snapshot._freeze(False)
+        self.invalidate_model()
+        self.env[self._archive_model].invalidate_model()
+        _logger.info(
+            "Archived %s %s row(s) up to %s into %s opening balance(s).",
+            len(moved_ids),
+            self._name,
+            cutoff,
+            balance_count,
+        )
+        return len(moved_ids)
+
+
+class ItemMovementArchive(models.Model):
+    _name = "idil.item.movement.archive"
+    _description = "Archived Item Movement"
+    _order = "date desc, movement_id desc"
+
+    movement_id = fields.Integer(string="Movement ID", readonly=True)
+    item_id = fields.Many2one(
+        "idil.item", string="Item", ondelete="cascade", index=True, readonly=True
+    )
+    date = fields.Date(string="Date", index=True, readonly=True)
+    movement_type = fields.Selection(
+        [("in", "In"), ("out", "Out")], string="Movement Type", readonly=True
+    )
+    quantity = fields.Float(string="Quantity", readonly=True)
+    data = fields.Json(string="Archived Values", readonly=True)
+
+
+class ProductMovementArchive(models.Model):
+    _name = "idil.product.movement.archive"
+    _description = "Archived Product Movement"
+    _order = "date desc, movement_id desc"
+
+    movement_id = fields.Integer(string="Movement ID", readonly=True)
+    product_id = fields.Many2one(
+        "my_product.product",
+        string="Product",
+        ondelete="cascade",
+        index=True,
+        readonly=True,
+    )
+    date = fields.Datetime(string="Date", index=True, readonly=True)
+    movement_type = fields.Selection(
+        [("in", "In"), ("out", "Out")], string="Movement Type", readonly=True
+    )
+    quantity = fields.Float(string="Quantity", readonly=True)
+    data = fields.Json(string="Archived Values", readonly=True)
+
+
+class MovementArchiveWizard(models.TransientModel):
+    _name = "idil.movement.archive.wizard"
+    _description = "Archive Closed Movement Periods"
+
+    cutoff_date = fields.Date(
+        string="Archive Up To",
+        required=True,
+        help="Item and product movements dated up to and including this date "
+        "are archived. Later movements cannot be dated on or before it.",
+    )
+    archived_until = fields.Date(
+        string="Archived Until",
+        readonly=True,
+        default=lambda self: self.env["idil.item.movement"]._get_archived_until(),
+    )
+
+    @api.constrains("cutoff_date")
+    def _check_cutoff_date(self):
+        for rec in self:
+            if rec.cutoff_date >= fields.Date.context_today(rec):
+                raise ValidationError("Only periods before today can be archived.")
+            if rec.archived_until and rec.cutoff_date <= rec.archived_until:
+                raise ValidationError(
+                    f"Movements are already archived until {rec.archived_until}."
+                )
+
+    def action_archive_movements(self):
+        self.ensure_one()
+        item_count = self.env["idil.item.movement"]._archive_movements(
+            self.cutoff_date
+        )
+        product_count = self.env["idil.product.movement"]._archive_movements(
+            self.cutoff_date
+        )
+        self.env["ir.config_parameter"].sudo().set_param(
+            ARCHIVED_UNTIL_PARAM, fields.Date.to_string(self.cutoff_date)
+        )
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": "Movements Archived",
+                "message": (
+                    f"Archived {item_count} item and {product_count} product "
+                    f"movement(s) up to {self.cutoff_date}."
+                ),
+                "type": "success",
+            },
+        }
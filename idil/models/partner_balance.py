@@ -0,0 +1,302 @@
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+import logging
+
+_logger = logging.getLogger(__name__)
+
+PARTNER_BALANCE_MODELS = (
+    "idil.customer.registration",
+    "idil.vendor.registration",
+    "idil.sales.sales_personnel",
+)
+
+
+class PartnerBalanceMixin(models.AbstractModel):
+    """Stored partner balance kept in sync with its source documents.
+
+    The balance is the sum of a per-row contribution of the source model.
+    A database trigger on the source table applies the change of every
+    inserted, updated or deleted row to its partner. This covers receipts,
+    payments, returns and opening balances whatever code path writes them,
+    cascade deletions included. A nightly job checks the stored balances
+    against a full recomputation.
+    """
+
+    _name = "idil.partner.balance.mixin"
+    _description = "Stored Partner Balance"
+
+    # Set by the concrete models.
+    _balance_field = None
+    _balance_source = None
+    _balance_key = None
+    _balance_columns = ()
+    # SQL contribution of one source row, "{row}" being the row reference.
+    _balance_expression = None
+
+    def _balance_contribution(self, row):
+        return self._balance_expression.format(row=row)
+
+    @api.model
+    def _install_balance_trigger(self):
+        """Create the trigger on the source table.
+
+        Called from ``init`` of the source model, once its table exists.
+        """
+        cr = self.env.cr
+        source = self.env[self._balance_source]._table
+        name = f"{self._table}_balance_sync"
+        field = self._balance_field
+        key = self._balance_key
+        cr.execute(
+            f"""
+            CREATE OR REPLACE FUNCTION {name}()
+            RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.{key} IS NOT NULL THEN
+                    UPDATE {self._table}
+                       SET {field} = COALESCE({field}, 0)
+                           - ({self._balance_contribution("OLD")})
+                     WHERE id = OLD.{key};
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.{key} IS NOT NULL THEN
+                    UPDATE {self._table}
+                       SET {field} = COALESCE({field}, 0)
+                           + ({self._balance_contribution("NEW")})
+                     WHERE id = NEW.{key};
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        cr.execute(
+            "SELECT 1 FROM pg_trigger WHERE tgname = %s AND tgrelid = %s::regclass",
+            (name, source),
+        )
+        first_install = not cr.fetchone()
+        cr.execute(
+            f"""
+            DROP TRIGGER IF EXISTS {name} ON {source};
+            CREATE TRIGGER {name}
+            AFTER INSERT OR DELETE OR UPDATE OF {", ".join(self._balance_columns)}
+            ON {source}
+            FOR EACH ROW EXECUTE FUNCTION {name}()
+            """
+        )
+        # First install / upgrade from the computed field: seed the column.
+        if first_install:
+            self._rebuild_partner_balance()
+
+    @api.model
+    def _sync_balance_cache(self, sources):
+        """Flush pending updates of ``sources`` so the trigger has run, then
+        drop the cached balances."""
+        sources.flush_recordset(list(self._balance_columns))
+        self.invalidate_model([self._balance_field])
+
+    def _balance_totals_query(self):
+        return f"""
+            SELECT {self._balance_key} AS partner_id,
+                   SUM({self._balance_contribution("s")}) AS balance
+            FROM {self.env[self._balance_source]._table} s
+            WHERE {self._balance_key} IS NOT NULL
+            GROUP BY {self._balance_key}
+        """
+
+    @api.model
+    def _rebuild_partner_balance(self):
+        """Recompute the stored balance of every partner from its sources."""
+        cr = self.env.cr
+        source = self.env[self._balance_source]
+        source.flush_model()
+        # Block concurrent postings so the totals match the documents.
+        cr.execute(f"LOCK TABLE {source._table} IN SHARE MODE")
+        cr.execute(
+            f"""
+            UPDATE {self._table} p
+               SET {self._balance_field} = COALESCE((
+                    SELECT SUM({self._balance_contribution("s")})
+                    FROM {source._table} s
+                    WHERE s.{self._balance_key} = p.id
+               ), 0)
+            """
+        )
+        _logger.info("Rebuilt %s of %s.", self._balance_field, self._name)
+        self.invalidate_model([self._balance_field])
+
+    @api.model
+    def _get_balance_drift(self):
+        """Return the partners whose stored balance differs from the sum of
+        their source documents."""
+        field = self._balance_field
+        self.env[self._balance_source].flush_model()
+        self.flush_model([field])
+        self.env.cr.execute(
+            f"""
+            SELECT p.id AS partner_id,
+                   p.name,
+                   COALESCE(p.{field}, 0) AS stored_balance,
+                   COALESCE(t.balance, 0) AS document_balance
+            FROM {self._table} p
+            LEFT JOIN ({self._balance_totals_query()}) t ON t.partner_id = p.id
+            WHERE ROUND(
+                (COALESCE(p.{field}, 0) - COALESCE(t.balance, 0))::numeric, 5
+            ) <> 0
+            ORDER BY p.id
+            """
+        )
+        return self.env.cr.dictfetchall()
+
+    @api.model
+    def _get_aged_balances(self, lines_query, params, as_of=None):
+        """Return the balance of partners and its aging from booking lines.
+
+        ``lines_query`` selects the booking lines of each partner as
+        ``partner_id`` and ``line_id`` columns, with ``params`` as its
+        parameters; lines after ``as_of`` are left out.
+
+        The open balance is aged on the side it stands on. Credits settle
+        the oldest debits first and the other way round, so the balance is
+        made of the most recent entries. Ages are counted in days from
+        ``as_of`` (today when not given).
+
+        :return: ``{partner_id: (balance, aging_current, aging_31_60,
+            aging_61_90, aging_over_90)}`` with ``balance`` as debit minus
+            credit and the buckets carrying the sign of the balance
+        """
+        as_of = fields.Date.to_date(as_of) if as_of else None
+        self.env["idil.transaction_bookingline"].flush_model()
+        self.env.cr.execute(
+            f"""
+            WITH lines AS (
+                SELECT
+                    pl.partner_id,
+                    bl.id,
+                    bl.transaction_date AS date,
+                    CASE WHEN bl.transaction_type = 'dr'
+                         THEN COALESCE(bl.dr_amount, 0) ELSE 0 END AS debit,
+                    CASE WHEN bl.transaction_type = 'cr'
+                         THEN COALESCE(bl.cr_amount, 0) ELSE 0 END AS credit
+                FROM ({lines_query}) pl
+                JOIN idil_transaction_bookingline bl ON bl.id = pl.line_id
+                WHERE %(as_of)s::date IS NULL OR bl.transaction_date <= %(as_of)s
+            ), totals AS (
+                SELECT partner_id, SUM(debit) - SUM(credit) AS balance
+                FROM lines
+                GROUP BY partner_id
+            ), sides AS (
+                SELECT
+                    l.partner_id,
+                    l.id,
+                    l.date,
+                    t.balance,
+                    CASE WHEN t.balance < 0 THEN l.credit ELSE l.debit END AS amount
+                FROM lines l
+                JOIN totals t ON t.partner_id = l.partner_id
+            ), open_items AS (
+                SELECT
+                    partner_id,
+                    %(ref)s::date - COALESCE(date, %(ref)s) AS age,
+                    SIGN(balance) * GREATEST(
+                        LEAST(
+                            amount,
+                            ABS(balance) - (
+                                SUM(amount) OVER (
+                                    PARTITION BY partner_id
+                                    ORDER BY date DESC NULLS FIRST, id DESC
+                                ) - amount
+                            )
+                        ),
+                        0
+                    ) AS amount
+                FROM sides
+                WHERE amount <> 0
+            )
+            SELECT
+                t.partner_id,
+                t.balance,
+                COALESCE(SUM(o.amount) FILTER (WHERE o.age <= 30), 0),
+                COALESCE(SUM(o.amount) FILTER (WHERE o.age BETWEEN 31 AND 60), 0),
+                COALESCE(SUM(o.amount) FILTER (WHERE o.age BETWEEN 61 AND 90), 0),
+                COALESCE(SUM(o.amount) FILTER (WHERE o.age > 90), 0)
+            FROM totals t
+            LEFT JOIN open_items o ON o.partner_id = t.partner_id
+            GROUP BY t.partner_id, t.balance
+            """,
+            dict(
+                params,
+                as_of=as_of,
+                ref=as_of or fields.Date.context_today(self),
+            ),
+        )
+        return {row[0]: row[1:] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def _cron_check_partner_balances(self):
+        drift = {}
+        for model_name in PARTNER_BALANCE_MODELS:
+            model_drift = self.env[model_name]._get_balance_drift()
+            if model_drift:
+                _logger.warning(
+                    "Balance drift detected on %s %s record(s): %s",
+                    len(model_drift),
+                    model_name,
+                    model_drift[:20],
+                )
+                drift[model_name] = model_drift
+        if not drift:
+            _logger.info("Stored partner balances match their documents.")
+        return drift
+
+    @api.model
+    def action_rebuild_partner_balance(self):
+        self._rebuild_partner_balance()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": "Balances Rebuilt",
+                "message": "Balances were rebuilt from the documents.",
+                "type": "success",
+            },
+        }
+
+    @api.model
+    def action_verify_partner_balance(self):
+        drift = self._get_balance_drift()
+        if drift:
+            raise ValidationError(
+                f"{len(drift)} balance(s) differ from the documents, e.g. "
+                + ", ".join(
+                    f"{row['name']}: {row['stored_balance']:.2f} stored, "
+                    f"{row['document_balance']:.2f} expected"
+                    for row in drift[:5]
+                )
+                + ". Use 'Rebuild Balances' to fix them."
+            )
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": "Balances Verified",
+                "message": "Stored balances match the documents.",
+                "type": "success",
+            },
+        }
+
+
+class PartnerBalanceReportWizard(models.AbstractModel):
+    """Ask for the date of a partner balance report."""
+
+    _name = "idil.partner.balance.report.wizard"
+    _description = "Partner Balance Report Wizard"
+
+    as_of_date = fields.Date(
+        string="As of Date", help="Leave empty for the current balances."
+    )
+
+    @api.constrains("as_of_date")
+    def _check_as_of_date(self):
+        for rec in self:
+            if rec.as_of_date and rec.as_of_date > fields.Date.context_today(rec):
+                raise ValidationError("As of Date cannot be in the future.")
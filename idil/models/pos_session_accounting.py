@@ -0,0 +1,131 @@
+from odoo import models, fields, _
+from odoo.exceptions import ValidationError
+from odoo.tools import float_round
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class PosConfig(models.Model):
+    _inherit = "pos.config"
+
+    idil_deferred_accounting = fields.Boolean(
+        string="Post Accounting at Session Close",
+        help="Only queue paid orders and post one aggregated transaction booking "
+        "per session when the session is closed, instead of one booking per order.",
+    )
+
+
+class PosSession(models.Model):
+    _inherit = "pos.session"
+
+    idil_booking_ids = fields.One2many(
+        "idil.transaction_booking", "pos_session_id", string="Transaction Bookings"
+    )
+
+    def _validate_session(self, *args, **kwargs):
+        res = super(PosSession, self)._validate_session(*args, **kwargs)
+        # A wizard or action (cash difference, unbalanced entries) leaves the
+        # session open; its orders are posted when it actually closes.
+        self.filtered(
+            lambda session: session.state == "closed"
+        ).post_deferred_transaction_booking()
+        return res
+
+    def post_deferred_transaction_booking(self):
+        """Post the queued orders of each session as a single booking.
+
+        Lines are netted per account and day, so the ledger grows
+        by a handful of lines per session instead of several per order.
+        """
+        for session in self:
+            orders = self.env["pos.order"].search(
+                [
+                    ("session_id", "=", session.id),
+                    ("idil_accounting_state", "=", "pending"),
+                ]
+            )
+            if not orders:
+                continue
+
+            # {(account_id, date): net debit}
+            totals = {}
+            for _order, vals in orders._prepare_transaction_booking_line_vals():
+                key = (
+                    vals["account_number"],
+                    fields.Date.to_date(vals["transaction_date"]),
+                )
+                totals[key] = (
+                    totals.get(key, 0.0) + vals["dr_amount"] - vals["cr_amount"]
+                )
+
+            accounts = self.env["idil.chart.account"].browse(
+                {account_id for account_id, _date in totals}
+            )
+            account_names = dict(zip(accounts.ids, accounts.mapped("name")))
+
+            line_vals = []
+            for (account_id, date), net in sorted(
+                totals.items(), key=lambda item: (item[0][1], item[0][0])
+            ):
+                net = float_round(net, precision_digits=2)
+                if not net:
+                    continue
+                line_vals.append(
+                    {
+                        "description": f"{session.name} - {account_names[account_id]}",
+                        "account_number": account_id,
+                        "transaction_type": "dr" if net > 0 else "cr",
+                        "dr_amount": net if net > 0 else 0.0,
+                        "cr_amount": -net if net < 0 else 0.0,
+                        "transaction_date": date,
+                    }
+                )
+
+            amount_total = sum(orders.mapped("amount_total"))
+            amount_paid = sum(orders.mapped("amount_paid"))
+            try:
+                booking = (
+                    self.env["idil.transaction_booking"]
+                    .with_context(skip_validations=True)
+                    .create(
+                        {
+                            "order_number": session.name,
+                            "pos_session_id": session.id,
+                            "trx_source_id": orders.get_manual_transaction_source_id(),
+                            "payment_method": "pos",
+                            "payment_status": (
+                                "paid"
+                                if amount_total == amount_paid
+                                else "partial_paid"
+                            ),
+                            "trx_date": max(date for _acc, date in totals),
+                            "amount": amount_total,
+                            "amount_paid": amount_paid,
+                            "remaining_amount": amount_total - amount_paid,
+                        }
+                    )
+                )
+                # POS payments include taxes and change while revenue lines
+                # use the untaxed subtotal, so the entry is not balanced.
+                booking.post_lines(line_vals, check_balance=False)
+            except Exception as e:
+                _logger.error(
+                    "Error posting deferred POS accounting for session %s: %s",
+                    session.name,
+                    str(e),
+                )
+                raise ValidationError(
+                    _("Error posting POS session accounting: %s") % str(e)
+                )
+
+            orders.write(
+                {"idil_accounting_state": "posted", "idil_booking_id": booking.id}
+            )
+            _logger.info(
+                "Posted %s POS orders of session %s as booking %s (%s lines)",
+                len(orders),
+                session.name,
+                booking.id,
+                len(line_vals),
+            )
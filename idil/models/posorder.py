@@ -93,7 +93,6 @@ from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError, UserError
 from odoo.tools import float_is_zero, float_round
 import logging
-import time
 
 _logger = logging.getLogger(__name__)
 
@@ -101,13 +100,33 @@ _logger = logging.getLogger(__name__)
 class PosOrder(models.Model):
     _inherit = "pos.order"
 
+    idil_accounting_state = fields.Selection(
+        [('pending', 'Pending Session Close'), ('posted', 'Posted')],
+        string='Accounting Status',
+        copy=False,
+        index=True,
+        readonly=True,
+    )
+    idil_booking_id = fields.Many2one(
+        'idil.transaction_booking', string='Transaction Booking', copy=False, readonly=True
+    )
+
     def action_pos_order_paid(self):
         _logger.info("Starting action_pos_order_paid for order: %s", self.name)
         super(PosOrder, self).action_pos_order_paid()
 
         if self.state == 'paid':
-            self.create_transaction_booking()
-            self.create_transaction_booking_lines()
+            if self.session_id.config_id.idil_deferred_accounting:
+                # Queued only; pos.session posts one aggregated booking at close
+                self.idil_accounting_state = 'pending'
+            else:
+                bookings = self.create_transaction_booking()
+                self.create_transaction_booking_lines(bookings)
+                for order in self:
+                    order.write({
+                        'idil_accounting_state': 'posted',
+                        'idil_booking_id': bookings[order.id].id,
+                    })
         return True
 
     def get_manual_transaction_source_id(self):
@@ -117,133 +136,107 @@ class PosOrder(models.Model):
         return trx_source.id
 
     def create_transaction_booking(self):
+        """Create one booking per order in the current transaction.
+
+        :return: dict mapping ``pos.order`` id to its ``idil.transaction_booking``
+        """
         trx_source_id = self.get_manual_transaction_source_id()
 
+        vals_list = []
         for order in self:
             payment_methods = self.determine_payment_methods(order)
             payment_method_id = next(iter(payment_methods))  # Get one payment method ID
             balance = order.amount_total - order.amount_paid
-            try:
-                transaction_booking = self.env['idil.transaction_booking'].with_context(skip_validations=True).create({
-                    'transaction_number': order.id,
-                    'order_number': order.name,
-                    'trx_source_id': trx_source_id,
-                    'payment_method': 'other',
-                    'pos_payment_method': payment_method_id,
-                    'payment_status': 'paid' if order.amount_total == order.amount_paid else 'partial_paid',
-                    'trx_date': order.date_order,
-                    'amount': order.amount_total,
-                    'amount_paid': order.amount_paid,
-                    'remaining_amount': balance
-                })
-                self.env.cr.commit()  # Commit the transaction
-                _logger.info("Transaction Booking ID: %s", transaction_booking.id)
-            except Exception as e:
-                _logger.error("Error creating transaction booking for order %s: %s", order.name, str(e))
-                raise ValidationError(_("Error creating transaction booking: %s") % str(e))
-
-    # def create_transaction_booking_lines(self):
-    #     for order in self:
-    #         try:
-    #             time.sleep(1)  # Add a brief delay to allow the transaction to be committed
-    #             transaction_booking = self.env['idil.transaction_booking'].search(
-    #                 [('order_number', '=', order.name)], limit=1)
-    #             if not transaction_booking:
-    #                 _logger.error("Transaction booking not found for order %s", order.name)
-    #                 raise ValidationError(_("Transaction booking not found for order %s") % order.name)
-    #
-    #             for payment in order.payment_ids:
-    #                 payment_method_id = payment.payment_method_id.idil_payment_method_id.id
-    #                 payment_method_record = self.env['idil.payment.method'].search(
-    #                     [('id', '=', payment_method_id)], limit=1)
-    #                 if not payment_method_record:
-    #                     _logger.error("Payment method not found for ID %s", payment_method_id)
-    #                     raise ValidationError(_("Payment method not found for ID %s") % payment_method_id)
-    #
-    #                 debit_line_vals = {
-    #                     'transaction_booking_id': transaction_booking.id,
-    #                     'description': payment_method_record.name,
-    #                     'account_number': payment_method_record.account_number.id,
-    #                     # Use the account_number from the payment method
-    #                     'transaction_type': 'dr',
-    #                     'dr_amount': round(payment.amount, 2),  # Adjust amount as necessary
-    #                     'cr_amount': 0.0,
-    #                     'transaction_date': order.date_order
-    #                 }
-    #                 self.env['idil.transaction_bookingline'].create(debit_line_vals)
-    #                 _logger.info("Created debit booking line for payment method: %s", payment_method_record.name)
-    #
-    #             for line in order.lines:
-    #                 credit_line_vals = {
-    #                     'transaction_booking_id': transaction_booking.id,
-    #                     'description': line.product_id.name,
-    #                     'account_number': 2,  # Adjust as necessary for credit account
-    #                     'transaction_type': 'cr',
-    #                     'dr_amount': 0.0,
-    #                     'cr_amount': round(line.price_subtotal, 2),  # Adjust amount as necessary
-    #                     'transaction_date': order.date_order
-    #                 }
-    #                 self.env['idil.transaction_bookingline'].create(credit_line_vals)
-    #                 _logger.info("Created credit booking line for product: %s", line.product_id.name)
-    #
-    #         except Exception as e:
-    #             _logger.error("Error creating transaction booking lines for order %s: %s", order.name, str(e))
-    #             raise ValidationError(_("Error creating transaction booking lines: %s") % str(e))
-    def create_transaction_booking_lines(self):
+            vals_list.append({
+                'transaction_number': order.id,
+                'order_number': order.name,
+                'trx_source_id': trx_source_id,
+                'payment_method': 'other',
+                'pos_payment_method': payment_method_id,
+                'payment_status': 'paid' if order.amount_total == order.amount_paid else 'partial_paid',
+                'trx_date': order.date_order,
+                'amount': order.amount_total,
+                'amount_paid': order.amount_paid,
+                'remaining_amount': balance
+            })
+        try:
+            Booking = self.env['idil.transaction_booking'].with_context(skip_validations=True)
+            bookings = Booking.create(vals_list)
+        except Exception as e:
+            _logger.error("Error creating transaction booking for orders %s: %s", self.mapped('name'), str(e))
+            raise ValidationError(_("Error creating transaction booking: %s") % str(e))
+        _logger.info("Transaction Booking IDs: %s", bookings.ids)
+        return dict(zip(self.ids, bookings))
+
+    def create_transaction_booking_lines(self, bookings):
+        """Create the debit (payment) and credit (income) lines of all orders
+        with a single multi-row create.
+
+        :param bookings: dict mapping ``pos.order`` id to its booking, as
+            returned by :meth:`create_transaction_booking`
+        """
+        line_vals = []
+        for order, vals in self._prepare_transaction_booking_line_vals():
+            transaction_booking = bookings.get(order.id)
+            if not transaction_booking:
+                _logger.error("Transaction booking not found for order %s", order.name)
+                raise ValidationError(_("Transaction booking not found for order %s") % order.name)
+            vals['transaction_booking_id'] = transaction_booking.id
+            line_vals.append(vals)
+
+        try:
+            self.env['idil.transaction_bookingline'].create(line_vals)
+        except Exception as e:
+            _logger.error("Error creating transaction booking lines for orders %s: %s", self.mapped('name'), str(e))
+            raise ValidationError(_("Error creating transaction booking lines: %s") % str(e))
+
+    def _prepare_transaction_booking_line_vals(self):
+        """Return ``(order, vals)`` pairs for the booking lines of the orders,
+        without ``transaction_booking_id``. Payment-method and product
+        accounts are resolved once per method / product."""
+        payment_method_cache = {}
+        product_cache = {}
+        result = []
+
         for order in self:
-            try:
-                time.sleep(1)  # Add a brief delay to allow the transaction to be committed
-                transaction_booking = self.env['idil.transaction_booking'].search(
-                    [('order_number', '=', order.name)], limit=1)
-                if not transaction_booking:
-                    _logger.error("Transaction booking not found for order %s", order.name)
-                    raise ValidationError(_("Transaction booking not found for order %s") % order.name)
-
-                for payment in order.payment_ids:
-                    payment_method_id = payment.payment_method_id.idil_payment_method_id.id
-                    payment_method_record = self.env['idil.payment.method'].search(
-                        [('id', '=', payment_method_id)], limit=1)
-                    if not payment_method_record:
-                        _logger.error("Payment method not found for ID %s", payment_method_id)
-                        raise ValidationError(_("Payment method not found for ID %s") % payment_method_id)
-
-                    debit_line_vals = {
-                        'transaction_booking_id': transaction_booking.id,
-                        'description': payment_method_record.name,
-                        'account_number': payment_method_record.account_number.id,
-                        # Use the account_number from the payment method
-                        'transaction_type': 'dr',
-                        'dr_amount': round(payment.amount, 2),  # Adjust amount as necessary
-                        'cr_amount': 0.0,
-                        'transaction_date': order.date_order
-                    }
-                    self.env['idil.transaction_bookingline'].create(debit_line_vals)
-                    _logger.info("Created debit booking line for payment method: %s", payment_method_record.name)
-
-                for line in order.lines:
-                    # Search for the custom product using the reference field
-                    custom_product = self.env['my_product.product'].search(
-                        [('id', '=', line.product_id.my_product_id.id)], limit=1)
-                    if not custom_product:
-                        _logger.error("Custom product not found for product %s", line.product_id.id)
-                        raise ValidationError(_("Custom product not found for product %s") % line.product_id.id)
-
-                    credit_line_vals = {
-                        'transaction_booking_id': transaction_booking.id,
-                        'description': line.product_id.name,
-                        'account_number': custom_product.income_account_id.id,
-                        # Use the income_account_id from the custom product
-                        'transaction_type': 'cr',
-                        'dr_amount': 0.0,
-                        'cr_amount': round(line.price_subtotal, 2),  # Adjust amount as necessary
-                        'transaction_date': order.date_order
-                    }
-                    self.env['idil.transaction_bookingline'].create(credit_line_vals)
-                    _logger.info("Created credit booking line for product: %s", line.product_id.name)
-
-            except Exception as e:
-                _logger.error("Error creating transaction booking lines for order %s: %s", order.name, str(e))
-                raise ValidationError(_("Error creating transaction booking lines: %s") % str(e))
+            for payment in order.payment_ids:
+                pos_method = payment.payment_method_id
+                if pos_method.id not in payment_method_cache:
+                    payment_method_cache[pos_method.id] = pos_method.idil_payment_method_id
+                payment_method_record = payment_method_cache[pos_method.id]
+                if not payment_method_record:
+                    _logger.error("Payment method not found for ID %s", pos_method.id)
+                    raise ValidationError(_("Payment method not found for ID %s") % pos_method.id)
+
+                result.append((order, {
+                    'description': payment_method_record.name,
+                    'account_number': payment_method_record.account_number.id,
+                    # Use the account_number from the payment method
+                    'transaction_type': 'dr',
+                    'dr_amount': round(payment.amount, 2),  # Adjust amount as necessary
+                    'cr_amount': 0.0,
+                    'transaction_date': order.date_order
+                }))
+
+            for line in order.lines:
+                # Resolve the custom product through the reference field once per product
+                if line.product_id.id not in product_cache:
+                    product_cache[line.product_id.id] = line.product_id.my_product_id
+                custom_product = product_cache[line.product_id.id]
+                if not custom_product:
+                    _logger.error("Custom product not found for product %s", line.product_id.id)
+                    raise ValidationError(_("Custom product not found for product %s") % line.product_id.id)
+
+                result.append((order, {
+                    'description': line.product_id.name,
+                    'account_number': custom_product.income_account_id.id,
+                    # Use the income_account_id from the custom product
+                    'transaction_type': 'cr',
+                    'dr_amount': 0.0,
+                    'cr_amount': round(line.price_subtotal, 2),  # Adjust amount as necessary
+                    'transaction_date': order.date_order
+                }))
+        return result
 
     def determine_payment_methods(self, order):
         payment_methods = {}
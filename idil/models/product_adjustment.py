@@ -199,32 +199,29 @@ class ProductAdjustment(models.Model):
                     )
 
                     # Accounting entries
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_date": rec.adjustment_date,
-                            "adjustment_id": rec.id,
-                            "product_id": rec.product_id.id,
-                            "transaction_booking_id": transaction_booking.id,
-                            "description": f"Stock Adjustment: {rec.product_id.name} ({rec.reason_id or ''})",
-                            "transaction_type": "dr",
-                            "dr_amount": 0.0,
-                            "cr_amount": rec.adjustment_amount,
-                            "account_number": rec.product_id.asset_account_id.id,
-                        }
-                    )
-
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_date": rec.adjustment_date,
-                            "adjustment_id": rec.id,
-                            "product_id": rec.product_id.id,
-                            "transaction_booking_id": transaction_booking.id,
-                            "description": f"Stock Adjustment: {rec.product_id.name} ({rec.reason_id or ''})",
-                            "transaction_type": "cr",
-                            "dr_amount": rec.adjustment_amount,
-                            "cr_amount": 0.0,
-                            "account_number": rec.product_id.account_adjustment_id.id,
-                        }
+                    transaction_booking.post_lines(
+                        [
+                            {
+                                "transaction_date": rec.adjustment_date,
+                                "adjustment_id": rec.id,
+                                "product_id": rec.product_id.id,
+                                "description": f"Stock Adjustment: {rec.product_id.name} ({rec.reason_id or ''})",
+                                "transaction_type": "dr",
+                                "dr_amount": 0.0,
+                                "cr_amount": rec.adjustment_amount,
+                                "account_number": rec.product_id.asset_account_id.id,
+                            },
+                            {
+                                "transaction_date": rec.adjustment_date,
+                                "adjustment_id": rec.id,
+                                "product_id": rec.product_id.id,
+                                "description": f"Stock Adjustment: {rec.product_id.name} ({rec.reason_id or ''})",
+                                "transaction_type": "cr",
+                                "dr_amount": rec.adjustment_amount,
+                                "cr_amount": 0.0,
+                                "account_number": rec.product_id.account_adjustment_id.id,
+                            },
+                        ]
                     )
 
                     # Product movement log
@@ -365,31 +362,29 @@ class ProductAdjustment(models.Model):
                                     }
                                 )
                     else:
-                        self.env["idil.transaction_bookingline"].create(
-                            {
-                                "transaction_date": rec.adjustment_date,
-                                "transaction_booking_id": booking.id,
-                                "description": desc,
-                                "product_id": rec.product_id.id,
-                                "transaction_type": "dr",
-                                "dr_amount": 0.0,
-                                "cr_amount": rec.adjustment_amount,
-                                "account_number": product.asset_account_id.id,
-                                "adjustment_id": rec.id,
-                            }
-                        )
-                        self.env["idil.transaction_bookingline"].create(
-                            {
-                                "transaction_date": rec.adjustment_date,
-                                "transaction_booking_id": booking.id,
-                                "description": desc,
-                                "product_id": rec.product_id.id,
-                                "transaction_type": "cr",
-                                "dr_amount": rec.adjustment_amount,
-                                "cr_amount": 0.0,
-                                "account_number": product.account_adjustment_id.id,
-                                "adjustment_id": rec.id,
-                            }
+                        booking.post_lines(
+                            [
+                                {
+                                    "transaction_date": rec.adjustment_date,
+                                    "description": desc,
+                                    "product_id": rec.product_id.id,
+                                    "transaction_type": "dr",
+                                    "dr_amount": 0.0,
+                                    "cr_amount": rec.adjustment_amount,
+                                    "account_number": product.asset_account_id.id,
+                                    "adjustment_id": rec.id,
+                                },
+                                {
+                                    "transaction_date": rec.adjustment_date,
+                                    "description": desc,
+                                    "product_id": rec.product_id.id,
+                                    "transaction_type": "cr",
+                                    "dr_amount": rec.adjustment_amount,
+                                    "cr_amount": 0.0,
+                                    "account_number": product.account_adjustment_id.id,
+                                    "adjustment_id": rec.id,
+                                },
+                            ]
                         )
 
                     # Update or create product movement
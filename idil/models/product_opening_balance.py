@@ -263,10 +263,9 @@ class ProductOpeningBalance(models.Model):
                     )
 
                     # 7. Create booking lines
-                    trx.booking_lines.create(
+                    trx.post_lines(
                         [
                             {
-                                "transaction_booking_id": trx.id,
                                 "product_opening_balance_id": self.id,
                                 "description": f"Opening Balance for {product.name}",
                                 "product_id": product.id,
@@ -277,7 +276,6 @@ class ProductOpeningBalance(models.Model):
                                 "transaction_date": self.date,
                             },
                             {
-                                "transaction_booking_id": trx.id,
                                 "product_opening_balance_id": self.id,
                                 "description": "Opening Balance - Source Clearing",
                                 "product_id": product.id,
@@ -288,7 +286,6 @@ class ProductOpeningBalance(models.Model):
                                 "transaction_date": self.date,
                             },
                             {
-                                "transaction_booking_id": trx.id,
                                 "product_opening_balance_id": self.id,
                                 "description": "Opening Balance - Target Clearing",
                                 "product_id": product.id,
@@ -299,7 +296,6 @@ class ProductOpeningBalance(models.Model):
                                 "transaction_date": self.date,
                             },
                             {
-                                "transaction_booking_id": trx.id,
                                 "product_opening_balance_id": self.id,
                                 "description": "Opening Balance - Equity Account",
                                 "product_id": product.id,
@@ -493,10 +489,9 @@ class ProductOpeningBalance(models.Model):
                                 }
                             )
 
-                            trx.booking_lines.create(
+                            trx.post_lines(
                                 [
                                     {
-                                        "transaction_booking_id": trx.id,
                                         "product_opening_balance_id": opening_balance.id,
                                         "description": f"Opening Balance for {product.name}",
                                         "product_id": product.id,
@@ -507,7 +502,6 @@ class ProductOpeningBalance(models.Model):
                                         "transaction_date": opening_balance.date,
                                     },
                                     {
-                                        "transaction_booking_id": trx.id,
                                         "product_opening_balance_id": opening_balance.id,
                                         "description": "Opening Balance - Source Clearing",
                                         "product_id": product.id,
@@ -518,7 +512,6 @@ class ProductOpeningBalance(models.Model):
                                         "transaction_date": opening_balance.date,
                                     },
                                     {
-                                        "transaction_booking_id": trx.id,
                                         "product_opening_balance_id": opening_balance.id,
                                         "description": "Opening Balance - Target Clearing",
                                         "product_id": product.id,
@@ -529,7 +522,6 @@ class ProductOpeningBalance(models.Model):
                                         "transaction_date": opening_balance.date,
                                     },
                                     {
-                                        "transaction_booking_id": trx.id,
                                         "product_opening_balance_id": opening_balance.id,
                                         "description": "Opening Balance - Equity Account",
                                         "product_id": product.id,
@@ -197,7 +197,7 @@ class ProductPurchaseReturn(models.Model):
                     }
                     return_booking_lines.append(reversed_vals)
 
-                self.env["idil.transaction_bookingline"].create(return_booking_lines)
+                trx.post_lines(return_booking_lines)
 
                 VendorTransaction = self.env["idil.vendor_transaction"]
                 vendor_tx = VendorTransaction.search(
@@ -0,0 +1,285 @@
+import time
+
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+from odoo.tools import float_compare
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class ProductionPlan(models.Model):
+    """Many (BOM, quantity, date) rows produced in one transaction.
+
+    Material requirements of the whole plan are aggregated per item and per
+    item asset account and checked once against on-hand stock and account
+    balances before any manufacturing order is created.
+    """
+
+    _name = "idil.production.plan"
+    _description = "Production Plan"
+    _inherit = ["mail.thread", "mail.activity.mixin"]
+    _order = "id desc"
+
+    name = fields.Char(string="Reference", readonly=True, copy=False, default="New")
+    date = fields.Datetime(
+        string="Production Date",
+        required=True,
+        default=fields.Datetime.now,
+        tracking=True,
+    )
+    state = fields.Selection(
+        [("draft", "Draft"), ("done", "Done")],
+        string="Status",
+        default="draft",
+        tracking=True,
+    )
+    line_ids = fields.One2many(
+        "idil.production.plan.line", "plan_id", string="Plan Lines", copy=True
+    )
+    requirement_ids = fields.One2many(
+        "idil.production.plan.requirement",
+        "plan_id",
+        string="Material Requirements",
+        readonly=True,
+    )
+    manufacturing_order_ids = fields.One2many(
+        "idil.manufacturing.order",
+        "production_plan_id",
+        string="Manufacturing Orders",
+        readonly=True,
+    )
+    shortage_count = fields.Integer(
+        string="Shortages", compute="_compute_shortage_count"
+    )
+    summary = fields.Text(string="Summary", readonly=True)
+
+    @api.depends("requirement_ids.is_short")
+    def _compute_shortage_count(self):
+        for plan in self:
+            plan.shortage_count = len(plan.requirement_ids.filtered("is_short"))
+
+    @api.model
+    def create(self, vals):
+        if not vals.get("name") or vals["name"] == "New":
+            vals["name"] = (
+                self.env["ir.sequence"].next_by_code("idil.production.plan.sequence")
+                or "New"
+            )
+        return super(ProductionPlan, self).create(vals)
+
+    def unlink(self):
+        for plan in self:
+            if plan.state == "done":
+                raise ValidationError(
+                    f"Production plan '{plan.name}' has generated manufacturing "
+                    "orders and cannot be deleted."
+                )
+        return super(ProductionPlan, self).unlink()
+
+    def _get_requirements(self):
+        """Aggregate the material requirements of the plan.
+
+        :return: list of dicts with ``item_id``, ``required_qty``,
+            ``available_qty``, ``account_id``, ``required_amount`` and
+            ``available_amount``
+        """
+        self.ensure_one()
+        required_qty = {}
+        cost_prices = {}
+        for line in self.line_ids:
+            for component in line.bom_id.explode(line.product_qty):
+                item_id = component["item_id"]
+                required_qty[item_id] = (
+                    required_qty.get(item_id, 0.0) + component["quantity"]
+                )
+                cost_prices[item_id] = component["cost_price"]
+
+        items = self.env["idil.item"].browse(list(required_qty))
+        on_hand = self.env["idil.item.stock.ledger"].get_on_hand(items.ids)
+
+        # Items sharing an asset account draw on the same balance.
+        required_amount = {}
+        for item in items:
+            account_id = item.asset_account_id.id
+            required_amount[account_id] = (
+                required_amount.get(account_id, 0.0)
+                + required_qty[item.id] * cost_prices[item.id]
+            )
+        balances = self.env["idil.account.daily.balance"].get_balances(
+            required_amount
+        )
+
+        return [
+            {
+                "item_id": item.id,
+                "required_qty": required_qty[item.id],
+                "available_qty": on_hand.get(item.id, 0.0),
+                "account_id": item.asset_account_id.id,
+                "required_amount": required_amount.get(item.asset_account_id.id, 0.0),
+                "available_amount": balances.get(item.asset_account_id.id, 0.0),
+            }
+            for item in items
+        ]
+
+    def action_check_requirements(self):
+        for plan in self:
+            if not plan.line_ids:
+                raise ValidationError("Add at least one line to the production plan.")
+            requirements = plan._get_requirements()
+            plan.write(
+                {
+                    "requirement_ids": [(5, 0, 0)]
+                    + [(0, 0, vals) for vals in requirements]
+                }
+            )
+        return True
+
+    def action_generate_orders(self):
+        """Create all manufacturing orders of the plan in one transaction."""
+        self.ensure_one()
+        if self.state != "draft":
+            raise ValidationError("This production plan has already been produced.")
+
+        self.action_check_requirements()
+        shortages = self.requirement_ids.filtered("is_short")
+        if shortages:
+            self.summary = "Cannot produce the plan, shortages found:\n" + "\n".join(
+                shortage.shortage_description for shortage in shortages
+            )
+            return True
+
+        started = time.time()
+        # Requirements were checked above for the whole plan.
+        MO = self.env["idil.manufacturing.order"].with_context(
+            production_plan_checked=True
+        )
+        orders = MO.create(
+            [line._prepare_manufacturing_order_vals() for line in self.line_ids]
+        )
+        for line, order in zip(self.line_ids, orders):
+            line.manufacturing_order_id = order
+        elapsed = time.time() - started
+
+        order_count = len(self.line_ids)
+        units = sum(self.line_ids.mapped("product_qty"))
+        throughput = order_count / elapsed if elapsed else 0.0
+        self.write(
+            {
+                "state": "done",
+                "summary": (
+                    f"Generated {order_count} manufacturing order(s) for "
+                    f"{units:g} unit(s) consuming {len(self.requirement_ids)} "
+                    f"item(s) in {elapsed:.2f}s ({throughput:.1f} orders/s). "
+                    "No shortages."
+                ),
+            }
+        )
+        _logger.info("Production plan %s: %s", self.name, self.summary)
+        return True
+
+
+class ProductionPlanLine(models.Model):
+    _name = "idil.production.plan.line"
+    _description = "Production Plan Line"
+
+    plan_id = fields.Many2one(
+        "idil.production.plan", string="Plan", required=True, ondelete="cascade"
+    )
+    bom_id = fields.Many2one("idil.bom", string="Bill of Materials", required=True)
+    product_id = fields.Many2one(
+        "my_product.product", related="bom_id.product_id", string="Product"
+    )
+    product_qty = fields.Float(string="Quantity", required=True, default=1.0)
+    scheduled_start_date = fields.Datetime(
+        string="Scheduled Date",
+        help="Defaults to the production date of the plan.",
+    )
+    commission_employee_id = fields.Many2one(
+        "idil.employee", string="Commission Employee"
+    )
+    manufacturing_order_id = fields.Many2one(
+        "idil.manufacturing.order",
+        string="Manufacturing Order",
+        readonly=True,
+        copy=False,
+    )
+
+    @api.constrains("product_qty")
+    def _check_product_qty(self):
+        for line in self:
+            if float_compare(line.product_qty, 0.0, precision_digits=5) <= 0:
+                raise ValidationError("Planned quantity must be greater than zero.")
+
+    def _prepare_manufacturing_order_vals(self):
+        self.ensure_one()
+        return {
+            "bom_id": self.bom_id.id,
+            "product_qty": self.product_qty,
+            "scheduled_start_date": self.scheduled_start_date or self.plan_id.date,
+            "commission_employee_id": self.commission_employee_id.id,
+            "production_plan_id": self.plan_id.id,
+            "manufacturing_order_line_ids": [
+                (
+                    0,
+                    0,
+                    {
+                        "item_id": component["item_id"],
+                        "quantity": component["quantity"],
+                        "quantity_bom": component["quantity"],
+                        "cost_price": component["cost_price"],
+                    },
+                )
+                for component in self.bom_id.explode(self.product_qty)
+            ],
+        }
+
+
+class ProductionPlanRequirement(models.Model):
+    _name = "idil.production.plan.requirement"
+    _description = "Production Plan Material Requirement"
+
+    plan_id = fields.Many2one(
+        "idil.production.plan", string="Plan", required=True, ondelete="cascade"
+    )
+    item_id = fields.Many2one("idil.item", string="Item", readonly=True)
+    required_qty = fields.Float(string="Required", digits=(16, 5), readonly=True)
+    available_qty = fields.Float(string="On Hand", digits=(16, 5), readonly=True)
+    account_id = fields.Many2one(
+        "idil.chart.account", string="Asset Account", readonly=True
+    )
+    required_amount = fields.Float(
+        string="Required Amount", digits=(16, 5), readonly=True
+    )
+    available_amount = fields.Float(
+        string="Account Balance", digits=(16, 5), readonly=True
+    )
+    is_short = fields.Boolean(string="Short", compute="_compute_is_short", store=True)
+    shortage_description = fields.Char(
+        string="Shortage", compute="_compute_is_short", store=True
+    )
+
+    @api.depends("required_qty", "available_qty", "required_amount", "available_amount")
+    def _compute_is_short(self):
+        for rec in self:
+            messages = []
+            if (
+                float_compare(rec.available_qty, rec.required_qty, precision_digits=5)
+                < 0
+            ):
+                messages.append(
+                    f"item '{rec.item_id.name}' needs {rec.required_qty:.5f}, "
+                    f"{rec.available_qty:.5f} on hand"
+                )
+            if (
+                float_compare(
+                    rec.available_amount, rec.required_amount, precision_digits=5
+                )
+                < 0
+            ):
+                messages.append(
+                    f"account '{rec.account_id.name}' needs {rec.required_amount:.5f}, "
+                    f"balance {rec.available_amount:.5f}"
+                )
+            rec.is_short = bool(messages)
+            rec.shortage_description = "; ".join(messages)
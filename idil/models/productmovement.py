@@ -1,20 +1,31 @@
-from odoo import models, fields
+from odoo import models, fields, api
 
 
 class ProductMovement(models.Model):
     _name = "idil.product.movement"
     _description = "Product Movement History"
-    _inherit = ["mail.thread", "mail.activity.mixin"]
+    _inherit = ["mail.thread", "mail.activity.mixin", "idil.movement.archive.mixin"]
     _order = "id desc"
 
+    _archive_model = "idil.product.movement.archive"
+    _archive_key = "product_id"
+    _archive_balance_values = {
+        "source_document": "Archive",
+        "destination": "Opening Balance",
+    }
+
     product_id = fields.Many2one(
-        "my_product.product", string="Product", required=True, ondelete="cascade"
+        "my_product.product",
+        string="Product",
+        required=True,
+        ondelete="cascade",
+        index=True,
     )
     movement_type = fields.Selection(
         [("in", "In"), ("out", "Out")], string="Movement Type", required=True
     )
     quantity = fields.Float(string="Quantity", required=True)
-    date = fields.Datetime(string="Date", required=True)
+    date = fields.Datetime(string="Date", required=True, index=True)
     source_document = fields.Char(string="Source Document")
     destination = fields.Char(string="Destination", tracking=True)
 
@@ -79,3 +90,87 @@ class ProductMovement(models.Model):
     staff_sales_id = fields.Many2one(
         "idil.staff.sales", string="Staff Sales", help="Linked staff sales transaction"
     )
+
+    def init(self):
+        """Keep ``my_product.product.stock_quantity`` in sync with movements.
+
+        The trigger updates the product row in the same transaction, which
+        also row-locks it, so concurrent movements of a product serialize.
+        Cascade deletions and raw SQL clean-ups are covered as well.
+        """
+        cr = self.env.cr
+        cr.execute(
+            """
+            CREATE OR REPLACE FUNCTION idil_product_stock_quantity_sync()
+            RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE')
+                   AND OLD.movement_type IN ('in', 'out') THEN
+                    UPDATE my_product_product
+                       SET stock_quantity = COALESCE(stock_quantity, 0)
+                           - COALESCE(OLD.quantity, 0)
+                     WHERE id = OLD.product_id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE')
+                   AND NEW.movement_type IN ('in', 'out') THEN
+                    UPDATE my_product_product
+                       SET stock_quantity = COALESCE(stock_quantity, 0)
+                           + COALESCE(NEW.quantity, 0)
+                     WHERE id = NEW.product_id;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        cr.execute(
+            """
+            SELECT 1 FROM pg_trigger
+            WHERE tgname = 'idil_product_stock_quantity_sync'
+              AND tgrelid = 'idil_product_movement'::regclass
+            """
+        )
+        first_install = not cr.fetchone()
+        cr.execute(
+            """
+            DROP TRIGGER IF EXISTS idil_product_stock_quantity_sync
+            ON idil_product_movement;
+            CREATE TRIGGER idil_product_stock_quantity_sync
+            AFTER INSERT OR DELETE OR UPDATE OF product_id, movement_type, quantity
+            ON idil_product_movement
+            FOR EACH ROW EXECUTE FUNCTION idil_product_stock_quantity_sync()
+            """
+        )
+        self.env["idil.inventory.snapshot"]._install_invalidation_trigger(self._name)
+        # First install / upgrade from the computed field: seed the column.
+        if first_install:
+            self.env["my_product.product"]._rebuild_stock_quantity()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(
+            ProductMovement, self.with_context(**self._movement_tracking_context())
+        ).create(vals_list)
+        records.product_id.invalidate_recordset(["stock_quantity"])
+        return records.with_env(self.env)
+
+    def write(self, vals):
+        products = self.product_id
+        res = super(
+            ProductMovement, self.with_context(**self._movement_tracking_context())
+        ).write(vals)
+        if {"product_id", "movement_type", "quantity"} & set(vals):
+            # The trigger only runs once the pending UPDATE is flushed.
+            self.flush_recordset(["product_id", "movement_type", "quantity"])
+            (products | self.product_id).invalidate_recordset(["stock_quantity"])
+        return res
+
+    @api.constrains("date")
+    def _check_date_not_archived(self):
+        self._check_archived_period()
+
+    def unlink(self):
+        products = self.product_id
+        res = super(ProductMovement, self).unlink()
+        products.invalidate_recordset(["stock_quantity"])
+        return res
@@ -1,10 +1,16 @@
-import base64
-import io
+import logging
 import os
+import tempfile
 
 import xlsxwriter
 
 from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+
+_logger = logging.getLogger(__name__)
+
+# Movements fetched per query by the Excel export.
+MOVEMENT_EXPORT_PAGE = 10000
 
 
 class Product(models.Model):
@@ -16,10 +22,12 @@ class Product(models.Model):
     # stock_quantity = fields.Float(string="Stock Quantity", default=0.0)
     stock_quantity = fields.Float(
         string="Stock Quantity",
-        compute="_compute_stock_quantity",
         digits=(16, 5),
-        store=False,  # do NOT store, so it reflects real-time movement
-        help="Quantity in stock, computed from movement history (IN - OUT)",
+        default=0.0,
+        readonly=True,
+        copy=False,
+        help="Quantity in stock (IN - OUT). Kept in sync with the movement "
+        "history by a database trigger on idil.product.movement.",
     )
 
     category_id = fields.Many2one("product.category", string="Product Category")
@@ -167,8 +175,6 @@ class Product(models.Model):
     movement_ids = fields.One2many(
         "idil.product.movement", "product_id", string="Product Movements"
     )
-    excel_file = fields.Binary("Excel File")
-    excel_filename = fields.Char("Excel Filename")
     start_date = fields.Datetime(string="Start Date")
     end_date = fields.Datetime(string="End Date")
 
@@ -212,22 +218,121 @@ class Product(models.Model):
         help="Actual cost calculated from accounting transactions (DR - CR) / stock_quantity",
     )
 
-    @api.depends("movement_ids.quantity", "movement_ids.movement_type")
-    def _compute_stock_quantity(self):
-        for product in self:
-            qty_in = sum(
-                m.quantity for m in product.movement_ids if m.movement_type == "in"
+    def _rebuild_stock_quantity(self):
+        """Recompute the stored stock of every product from its movements."""
+        cr = self.env.cr
+        self.env["idil.product.movement"].flush_model()
+        # Block concurrent movements so the snapshot matches the history.
+        cr.execute("LOCK TABLE idil_product_movement IN SHARE MODE")
+        cr.execute(
+            """
+            UPDATE my_product_product p
+               SET stock_quantity = COALESCE((
+                    SELECT SUM(m.quantity)
+                    FROM idil_product_movement m
+                    WHERE m.product_id = p.id
+                      AND m.movement_type IN ('in', 'out')
+               ), 0)
+            """
+        )
+        self.invalidate_model(["stock_quantity"])
+        _logger.info("Rebuilt my_product.product stock quantities from movements.")
+
+    def _get_stock_drift(self):
+        """Return the products whose stored stock differs from the sum of
+        their movements."""
+        self.env["idil.product.movement"].flush_model()
+        self.flush_model(["stock_quantity"])
+        self.env.cr.execute(
+            """
+            SELECT p.id AS product_id,
+                   p.name,
+                   COALESCE(p.stock_quantity, 0) AS stock_quantity,
+                   COALESCE(m.qty, 0) AS movement_quantity
+            FROM my_product_product p
+            LEFT JOIN (
+                SELECT product_id, SUM(quantity) AS qty
+                FROM idil_product_movement
+                WHERE movement_type IN ('in', 'out')
+                GROUP BY product_id
+            ) m ON m.product_id = p.id
+            WHERE ROUND(
+                (COALESCE(p.stock_quantity, 0) - COALESCE(m.qty, 0))::numeric, 5
+            ) <> 0
+            ORDER BY p.id
+            """
+        )
+        return self.env.cr.dictfetchall()
+
+    @api.model
+    def _cron_check_stock_quantity(self):
+        drift = self._get_stock_drift()
+        if drift:
+            _logger.warning(
+                "Stock quantity drift detected on %s product(s): %s",
+                len(drift),
+                drift[:20],
             )
-            qty_out = sum(
-                m.quantity for m in product.movement_ids if m.movement_type == "out"
+        else:
+            _logger.info("Product stock quantities match the movement history.")
+        return drift
+
+    @api.model
+    def action_rebuild_stock_quantity(self):
+        self._rebuild_stock_quantity()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": "Stock Quantities Rebuilt",
+                "message": "Product stock quantities were rebuilt from the movements.",
+                "type": "success",
+            },
+        }
+
+    @api.model
+    def action_verify_stock_quantity(self):
+        drift = self._cron_check_stock_quantity()
+        if drift:
+            raise ValidationError(
+                f"{len(drift)} product stock quantity(ies) differ from the movement "
+                f"history. First difference: '{drift[0]['name']}' has "
+                f"{drift[0]['stock_quantity']:.5f} but its movements sum to "
+                f"{drift[0]['movement_quantity']:.5f}. Run 'Rebuild Stock Quantities'."
             )
-            product.stock_quantity = round(qty_in + qty_out, 2)
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": "Stock Quantities Verified",
+                "message": "Product stock quantities match the movement history.",
+                "type": "success",
+            },
+        }
 
     @api.depends_context("uid")
     def _compute_actual_cost_from_transaction(self):
-        CurrencyRate = self.env["res.currency.rate"]
-        USD = self.env.ref("base.USD", raise_if_not_found=False)
-        SL = self.env["res.currency"].search([("name", "=", "SL")], limit=1)
+        RateService = self.env["idil.currency.rate.service"]
+
+        # Step 1: Fetch transaction lines of every product at once
+        lines_by_product = {}
+        product_ids = [pid for pid in self._origin.ids if pid]
+        if product_ids:
+            self.env["idil.transaction_bookingline"].flush_model()
+            self.env.cr.execute(
+                """
+                SELECT tb.product_id, tb.transaction_date, tb.dr_amount, tb.cr_amount
+                FROM idil_transaction_bookingline tb
+                JOIN my_product_product p
+                  ON p.id = tb.product_id AND p.asset_account_id = tb.account_number
+                WHERE tb.product_id IN %s
+            """,
+                (tuple(product_ids),),
+            )
+            for product_id, line_date, dr, cr in self.env.cr.fetchall():
+                lines_by_product.setdefault(product_id, []).append(
+                    (line_date, (dr or 0.0) - (cr or 0.0))
+                )
 
         for product in self:
             product.actual_cost = 0.0
@@ -235,44 +340,25 @@ class Product(models.Model):
             if not product.asset_account_id:
                 continue
 
+            transactions = lines_by_product.get(product._origin.id, [])
             account_currency = product.asset_account_id.currency_id
             is_sl_currency = account_currency and account_currency.name == "SL"
 
-            # Step 1: Fetch transaction lines
-            self.env.cr.execute(
-                """
-                SELECT transaction_date, dr_amount, cr_amount
-                FROM idil_transaction_bookingline
-                WHERE product_id = %s AND account_number = %s
-            """,
-                (product.id, product.asset_account_id.id),
-            )
-            transactions = self.env.cr.fetchall()
-
             total_converted = 0.0
-
-            for line_date, dr, cr in transactions:
-                value = (dr or 0.0) - (cr or 0.0)
-
-                # Convert to USD if account is in SL
-                if is_sl_currency and line_date:
-                    self.env.cr.execute(
-                        """
-                        SELECT rate
-                        FROM res_currency_rate
-                        WHERE currency_id = %s AND name <= %s AND company_id = %s
-                        ORDER BY name DESC
-                        LIMIT 1
-                    """,
-                        (SL.id, line_date, self.env.company.id),
-                    )
-                    rate_result = self.env.cr.fetchone()
-                    rate = rate_result[0] if rate_result else 0.0
-                    converted = value / rate if rate else 0.0
-                else:
-                    converted = value  # USD or unknown
-
-                total_converted += converted
+            if is_sl_currency:
+                # Convert to USD: one rate lookup per line from the cached curve
+                rates = RateService.get_rates(
+                    account_currency,
+                    [line_date for line_date, _v in transactions],
+                    strict_company=True,
+                )
+                for (line_date, value), rate in zip(transactions, rates):
+                    if not line_date:
+                        total_converted += value
+                    elif rate:
+                        total_converted += value / rate
+            else:
+                total_converted = sum(value for _d, value in transactions)
 
             # ✅ Final: just show total value (no division by stock_quantity)
             product.actual_cost = round(total_converted, 5)
@@ -282,16 +368,10 @@ class Product(models.Model):
         for rec in self:
             if rec.rate_currency_id:
                 # Find the latest available rate up to today
-                rate = self.env["res.currency.rate"].search(
-                    [
-                        ("currency_id", "=", rec.rate_currency_id.id),
-                        ("name", "<=", fields.Date.today()),
-                        ("company_id", "=", self.env.company.id),
-                    ],
-                    order="name desc",
-                    limit=1,
+                rate = self.env["idil.currency.rate.service"].get_rate(
+                    rec.rate_currency_id, fields.Date.today(), strict_company=True
                 )
-                rec.rate = rate.rate if rate else 0.0
+                rec.rate = rate or 0.0
             else:
                 rec.rate = 0.0
 
@@ -323,29 +403,36 @@ class Product(models.Model):
             rec.total_value_usd = rec.stock_quantity * cost_in_usd
 
     def export_movements_to_excel(self):
-        for product in self:
-            # Filter movements by date range
-            filtered_movements = product.movement_ids
-            if product.start_date and product.end_date:
-                filtered_movements = filtered_movements.filtered(
-                    lambda m: m.date
-                    and product.start_date <= m.date <= product.end_date
-                )
-
-            if not filtered_movements:
-                return {
-                    "type": "ir.actions.client",
-                    "tag": "display_notification",
-                    "params": {
-                        "title": "Export Failed",
-                        "message": "No data available to export for the selected date range.",
-                        "type": "warning",
-                    },
-                }
-
-            # Create Excel in memory (no file on disk!)
-            output = io.BytesIO()
-            workbook = xlsxwriter.Workbook(output, {"in_memory": True})
+        self.ensure_one()
+        product = self
+
+        self.env["idil.product.movement"].flush_model()
+        date_clause = ""
+        params = [product.id]
+        if product.start_date:
+            date_clause += " AND m.date >= %s"
+            params.append(product.start_date)
+        if product.end_date:
+            date_clause += " AND m.date <= %s"
+            params.append(product.end_date)
+        query = f"""
+            SELECT m.id, m.date, m.movement_type, m.quantity, m.source_document,
+                   sp.name, c.name
+            FROM idil_product_movement m
+            LEFT JOIN idil_sales_sales_personnel sp ON sp.id = m.sales_person_id
+            LEFT JOIN idil_customer_registration c ON c.id = m.customer_id
+            WHERE m.product_id = %s {date_clause} AND m.id < %s
+            ORDER BY m.id DESC
+            LIMIT %s
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # constant_memory flushes each row to a temp file once written,
+            # so memory stays flat whatever the number of movements.
+            path = os.path.join(tmp_dir, "movements.xlsx")
+            workbook = xlsxwriter.Workbook(
+                path, {"constant_memory": True, "tmpdir": tmp_dir}
+            )
             worksheet = workbook.add_worksheet()
 
             # Formats
@@ -353,6 +440,14 @@ class Product(models.Model):
             text_format = workbook.add_format({"text_wrap": True})
             number_format = workbook.add_format({"num_format": "0.00"})
 
+            # Set column widths
+            worksheet.set_column("A:A", 20)
+            worksheet.set_column("B:B", 15)
+            worksheet.set_column("C:C", 12, number_format)
+            worksheet.set_column("D:D", 30)
+            worksheet.set_column("E:E", 20)
+            worksheet.set_column("F:F", 20)
+
             # Headers
             headers = [
                 "Date",
@@ -364,45 +459,67 @@ class Product(models.Model):
             ]
             worksheet.write_row("A1", headers, workbook.add_format({"bold": True}))
 
-            # Write data
+            # Stream the movements in id-keyed pages, newest first
             row = 1
-            for movement in filtered_movements:
-                worksheet.write(row, 0, movement.date or "", date_format)
-                worksheet.write(row, 1, movement.movement_type or "", text_format)
-                worksheet.write(
-                    row,
-                    2,
-                    movement.quantity if movement.quantity else 0.0,
-                    number_format,
-                )
-                worksheet.write(row, 3, movement.source_document or "", text_format)
-                worksheet.write(
-                    row, 4, movement.sales_person_id.name or "", text_format
-                )
-                worksheet.write(row, 5, movement.customer_id.name or "", text_format)
-                row += 1
-
-            # Set column widths
-            worksheet.set_column("A:A", 20)
-            worksheet.set_column("B:B", 15)
-            worksheet.set_column("C:C", 12, number_format)
-            worksheet.set_column("D:D", 30)
-            worksheet.set_column("E:E", 20)
-            worksheet.set_column("F:F", 20)
+            last_id = 2**31 - 1
+            while True:
+                self.env.cr.execute(query, params + [last_id, MOVEMENT_EXPORT_PAGE])
+                page = self.env.cr.fetchall()
+                if not page:
+                    break
+                for movement_id, date, move_type, qty, source, person, customer in page:
+                    worksheet.write(row, 0, date or "", date_format)
+                    worksheet.write(row, 1, move_type or "", text_format)
+                    worksheet.write(row, 2, qty or 0.0, number_format)
+                    worksheet.write(row, 3, source or "", text_format)
+                    worksheet.write(row, 4, person or "", text_format)
+                    worksheet.write(row, 5, customer or "", text_format)
+                    row += 1
+                last_id = page[-1][0]
 
             workbook.close()
-            output.seek(0)
-
-            # Save file in binary field for download
-            product.excel_file = base64.b64encode(output.read())
-            product.excel_filename = f"{product.name}_Product_Movements.xlsx"
+            if row == 1:
+                return {
+                    "type": "ir.actions.client",
+                    "tag": "display_notification",
+                    "params": {
+                        "title": "Export Failed",
+                        "message": "No data available to export for the selected date range.",
+                        "type": "warning",
+                    },
+                }
 
-            # Return an action to download the file
-            return {
-                "type": "ir.actions.act_url",
-                "url": f"/web/content/my_product.product/{product.id}/excel_file?download=true",
-                "target": "self",
+            with open(path, "rb") as xlsx:
+                data = xlsx.read()
+
+        # Serve the file as a private attachment replacing the previous export,
+        # instead of storing it on the product record
+        Attachment = self.env["ir.attachment"]
+        filename = f"{product.name}_Product_Movements.xlsx"
+        Attachment.search(
+            [
+                ("res_model", "=", self._name),
+                ("res_id", "=", product.id),
+                ("name", "=like", "%_Product_Movements.xlsx"),
+            ]
+        ).unlink()
+        attachment = Attachment.create(
+            {
+                "name": filename,
+                "raw": data,
+                "res_model": self._name,
+                "res_id": product.id,
+                "mimetype": "application/vnd.openxmlformats-officedocument"
+                ".spreadsheetml.sheet",
             }
+        )
+
+        # Return an action to download the file
+        return {
+            "type": "ir.actions.act_url",
+            "url": f"/web/content/{attachment.id}?download=true",
+            "target": "self",
+        }
 
     @api.onchange("asset_currency_id")
     def _onchange_asset_currency_id(self):
@@ -525,6 +642,9 @@ class Product(models.Model):
 
     def write(self, vals):
         res = super(Product, self).write(vals)
+        if {"cost", "bom_id", "is_cost_manual_purchase"} & set(vals):
+            # BOMs using this product as a sub-assembly cache its cost.
+            self.env["idil.bom"]._propagate_component_costs(products=self)
 
         return res
 
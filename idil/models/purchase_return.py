@@ -206,7 +206,7 @@ class PurchaseReturn(models.Model):
                     }
                     return_booking_lines.append(reversed_vals)
 
-                self.env["idil.transaction_bookingline"].create(return_booking_lines)
+                trx.post_lines(return_booking_lines)
 
                 VendorTransaction = self.env["idil.vendor_transaction"]
                 vendor_tx = VendorTransaction.search(
@@ -501,7 +501,7 @@ class PurchaseReturnLine(models.Model):
                         }
                     )
 
-                    self.env["idil.transaction_bookingline"].create(
+                    booking.post_lines(
                         [
                             {
                                 "order_line": line.order_line_id.id,
@@ -511,7 +511,6 @@ class PurchaseReturnLine(models.Model):
                                 "account_number": stock_account,
                                 "transaction_type": "cr",
                                 "cr_amount": amount,
-                                "transaction_booking_id": booking.id,
                                 "transaction_date": fields.Date.today(),
                             },
                             {
@@ -522,7 +521,6 @@ class PurchaseReturnLine(models.Model):
                                 "account_number": purchase_account,
                                 "transaction_type": "dr",
                                 "dr_amount": amount,
-                                "transaction_booking_id": booking.id,
                                 "transaction_date": fields.Date.today(),
                             },
                         ]
@@ -269,73 +269,87 @@ class PurchaseOrder(models.Model):
 
             order.rate = rate_rec.rate or 0.0
 
-    def _create_item_movements(self):
-        for order in self:
-            for line in order.order_lines:
-                self.env["idil.item.movement"].create(
-                    {
-                        "item_id": line.item_id.id,
-                        "purchase_order_line_id": line.id,
-                        "date": order.purchase_date,
-                        "quantity": line.quantity,
-                        "source": "Vendor",
-                        "destination": "Inventory",
-                        "movement_type": "in",
-                        "related_document": f"idil.purchase_order.line,{line.id}",
-                    }
-                )
-                _logger.info(
-                    f"[ITEM MOVEMENT] Created for item {line.item_id.name} | Qty: {line.quantity}"
-                )
+    def _receive_items(self):
+        """Apply the order lines to item stock in one pass.
+
+        The affected items are locked once so concurrent receipts of the same
+        item serialize, on-hand quantities come from one ledger query, and the
+        weighted-average cost of each item is carried across its lines before
+        a single write per item. All movements are inserted with one create,
+        so the stock constraint validates the whole receipt together.
+        """
+        lines = self.mapped("order_lines").filtered("item_id")
+        if not lines:
+            return
 
-    def _update_item_stock(self):
+        items = lines.mapped("item_id")
+        self.env.cr.execute(
+            "SELECT id FROM idil_item WHERE id IN %s ORDER BY id FOR UPDATE",
+            (tuple(items.ids),),
+        )
+        # Re-read costs committed by a receipt we may have waited for.
+        items.invalidate_recordset(["cost_price"])
+        on_hand = self.env["idil.item.stock.ledger"].get_on_hand(items.ids)
+        costs = {item.id: item.cost_price for item in items}
+
+        item_vals = {}
+        movement_vals = []
         for order in self:
             for line in order.order_lines:
                 item = line.item_id
                 quantity = line.quantity
                 cost_price = line.cost_price
-                line_expiry = line.expiration_date  # ← NEW: grab line expiry
 
                 if not item:
                     continue
 
                 if quantity > 0:
-                    current_stock = item.quantity
-                    current_cost_price = item.cost_price
-
-                    total_current_value = current_stock * current_cost_price
-                    total_new_value = quantity * cost_price
+                    current_stock = on_hand[item.id]
                     new_quantity = current_stock + quantity
 
-                    if new_quantity > 0:
-                        new_cost_price = (
-                            total_current_value + total_new_value
-                        ) / new_quantity
-                    else:
-                        new_cost_price = cost_price
-
-                    update_vals = {
-                        "quantity": new_quantity,
-                        "expiration_date": line_expiry,  # ← NEW: always set to line’s date
-                    }
-
+                    vals = item_vals.setdefault(item.id, {})
+                    # Always set to the line's expiry date
+                    vals["expiration_date"] = line.expiration_date
                     if cost_price != 0:
-                        update_vals["cost_price"] = new_cost_price
-
-                    item.with_context(update_transaction_booking=False).write(
-                        update_vals
-                    )
+                        if new_quantity > 0:
+                            costs[item.id] = (
+                                current_stock * costs[item.id] + quantity * cost_price
+                            ) / new_quantity
+                        else:
+                            costs[item.id] = cost_price
+                        vals["cost_price"] = costs[item.id]
+                    on_hand[item.id] = new_quantity
 
                 elif quantity < 0:
-                    if item.quantity >= abs(quantity):
-                        item.with_context(update_transaction_booking=False).write(
-                            {"quantity": item.quantity - abs(quantity)}
-                        )
-                    else:
+                    if on_hand[item.id] < abs(quantity):
                         raise exceptions.ValidationError(
                             f"Insufficient stock for item '{item.name}'. "
-                            f"Available: {item.quantity}, trying to remove: {abs(quantity)}"
+                            f"Available: {on_hand[item.id]}, trying to remove: {abs(quantity)}"
                         )
+                    on_hand[item.id] -= abs(quantity)
+
+                movement_vals.append(
+                    {
+                        "item_id": item.id,
+                        "purchase_order_line_id": line.id,
+                        "date": order.purchase_date,
+                        "quantity": quantity,
+                        "source": "Vendor",
+                        "destination": "Inventory",
+                        "movement_type": "in",
+                        "related_document": f"idil.purchase_order.line,{line.id}",
+                    }
+                )
+
+        for item in items:
+            if item.id in item_vals:
+                item.with_context(update_transaction_booking=False).write(
+                    item_vals[item.id]
+                )
+        self.env["idil.item.movement"].create(movement_vals)
+        _logger.info(
+            f"[ITEM MOVEMENT] Received {len(movement_vals)} line(s) for {len(items)} item(s)"
+        )
 
     def create_vendor_transaction(self):
         transaction = self.env["idil.transaction_booking"].search(
@@ -446,6 +460,7 @@ class PurchaseOrder(models.Model):
         )
 
         # Now create booking lines
+        line_vals = []
         for line in self.order_lines:
             # Fallback to company currency if not explicitly set
             # Validate currency consistency
@@ -482,7 +497,7 @@ class PurchaseOrder(models.Model):
                 purchase_account = self.vendor_id.account_payable_id.id
 
             # DR line (stock)
-            self.env["idil.transaction_bookingline"].create(
+            line_vals.append(
                 {
                     "order_line": line.id,
                     "item_id": line.item_id.id,
@@ -492,12 +507,11 @@ class PurchaseOrder(models.Model):
                     "dr_amount": line.amount,
                     "cr_amount": 0,
                     "transaction_date": self.purchase_date,
-                    "transaction_booking_id": transaction.id,
                 }
             )
 
             # CR line (payment or AP)
-            self.env["idil.transaction_bookingline"].create(
+            line_vals.append(
                 {
                     "order_line": line.id,
                     "item_id": line.item_id.id,
@@ -507,9 +521,9 @@ class PurchaseOrder(models.Model):
                     "dr_amount": 0,
                     "cr_amount": line.amount,
                     "transaction_date": self.purchase_date,
-                    "transaction_booking_id": transaction.id,
                 }
             )
+        transaction.post_lines(line_vals)
 
     @api.model
     def create(self, vals):
@@ -522,8 +536,7 @@ class PurchaseOrder(models.Model):
         order = super(PurchaseOrder, self).create(vals)
         order.create_transaction_booking_with_lines()
         order.create_vendor_transaction()
-        order._update_item_stock()  # 🔁 Shift stock update here
-        order._create_item_movements()  # 👈 Call movement creation here
+        order._receive_items()  # 🔁 Stock, average cost and movements
 
         return order
 
@@ -665,10 +678,9 @@ class PurchaseOrder(models.Model):
             result = super(PurchaseOrder, order).write(vals)
 
             # --- 6. Rebuild Booking, Stock, Vendor Txn, Movement ---
-            order._update_item_stock()
+            order._receive_items()
             order.create_transaction_booking_with_lines()
             order.create_vendor_transaction()
-            order._create_item_movements()
 
             return result
 
@@ -749,12 +761,7 @@ def validate_account_balance(env, account_id, required_amount):
     if not account.exists():
         raise ValidationError(f"Account ID {account_id} not found.")
 
-    lines = env["idil.transaction_bookingline"].search(
-        [("account_number", "=", account_id)]
-    )
-    debit = sum(line.dr_amount for line in lines)
-    credit = sum(line.cr_amount for line in lines)
-    balance = debit - credit
+    balance = env["idil.account.daily.balance"].get_balance(account_id)
 
     if balance < required_amount:
         raise ValidationError(
@@ -306,6 +306,7 @@ class SaleReturn(models.Model):
                 }
             )
 
+            line_vals = []
             for return_line in return_order.return_lines:
                 if return_line.returned_quantity <= 0:
                     continue  # ✅ Skip lines with zero returned quantity
@@ -349,9 +350,8 @@ class SaleReturn(models.Model):
                     )
                 )
 
-                self.env["idil.transaction_bookingline"].create(
+                line_vals.append(
                     {
-                        "transaction_booking_id": transaction_booking.id,
                         "sale_return_id": return_order.id,
                         "description": f"Sales Return for -- Expanses COGS Account ( {product.name} ) ",
                         "product_id": product.id,
@@ -363,9 +363,8 @@ class SaleReturn(models.Model):
                     }
                 )
 
-                self.env["idil.transaction_bookingline"].create(
+                line_vals.append(
                     {
-                        "transaction_booking_id": transaction_booking.id,
                         "sale_return_id": return_order.id,
                         "description": f"Sales Return for -- Product Inventory Account ( {product.name} ) ",
                         "product_id": product.id,
@@ -377,9 +376,8 @@ class SaleReturn(models.Model):
                     }
                 )
 
-                self.env["idil.transaction_bookingline"].create(
+                line_vals.append(
                     {
-                        "transaction_booking_id": transaction_booking.id,
                         "sale_return_id": return_order.id,
                         "description": f"Sales Return for -- Account Receivable Account ( {product.name} ) ",
                         "product_id": product.id,
@@ -391,9 +389,8 @@ class SaleReturn(models.Model):
                     }
                 )
 
-                self.env["idil.transaction_bookingline"].create(
+                line_vals.append(
                     {
-                        "transaction_booking_id": transaction_booking.id,
                         "sale_return_id": return_order.id,
                         "description": f"Sales Return for -- Revenue Account Account ( {product.name} ) ",
                         "product_id": product.id,
@@ -408,9 +405,8 @@ class SaleReturn(models.Model):
                 )
 
                 if product.is_sales_commissionable and commission_amount > 0:
-                    self.env["idil.transaction_bookingline"].create(
+                    line_vals.append(
                         {
-                            "transaction_booking_id": transaction_booking.id,
                             "sale_return_id": return_order.id,
                             "description": f"Sales Return for -- Commission Expense Account ( {product.name} ) ",
                             "product_id": product.id,
@@ -423,9 +419,8 @@ class SaleReturn(models.Model):
                     )
 
                 if discount_amount > 0:
-                    self.env["idil.transaction_bookingline"].create(
+                    line_vals.append(
                         {
-                            "transaction_booking_id": transaction_booking.id,
                             "sale_return_id": return_order.id,
                             "description": f"Sales Return for -- Discount Expense Account ( {product.name} ) ",
                             "product_id": product.id,
@@ -486,6 +481,8 @@ class SaleReturn(models.Model):
 
                 # product.stock_quantity += return_line.returned_quantity
 
+            transaction_booking.post_lines(line_vals)
+
             sales_receipt = self.env["idil.sales.receipt"].search(
                 [("sales_order_id", "=", return_order.sale_order_id.id)], limit=1
             )
@@ -502,6 +502,7 @@ class SaleOrder(models.Model):
                         "idil.salesperson.order.summary"
                     ].create_summary_from_order(order)
 
+                    line_vals = []
                     for line in order.order_lines:
                         product = line.product_id
 
@@ -607,9 +608,8 @@ class SaleOrder(models.Model):
                             )
 
                         # DR COGS
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": transaction_booking.id,
                                 "sale_order_id": order.id,
                                 "description": f"Sales Order -- Expanses COGS account for - {product.name}",
                                 "product_id": product.id,
@@ -622,9 +622,8 @@ class SaleOrder(models.Model):
                             }
                         )
                         # CR Inventory
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": transaction_booking.id,
                                 "sale_order_id": order.id,
                                 "description": f"Sales Inventory account for - {product.name}",
                                 "product_id": product.id,
@@ -637,9 +636,8 @@ class SaleOrder(models.Model):
                             }
                         )
                         # DR Receivable
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": transaction_booking.id,
                                 "sale_order_id": order.id,
                                 "description": f"Sale of {product.name}",
                                 "product_id": product.id,
@@ -652,9 +650,8 @@ class SaleOrder(models.Model):
                             }
                         )
                         # CR Revenue
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": transaction_booking.id,
                                 "sale_order_id": order.id,
                                 "description": f"Sales Revenue - {product.name}",
                                 "product_id": product.id,
@@ -676,9 +673,8 @@ class SaleOrder(models.Model):
                             product.is_sales_commissionable
                             and line.commission_amount > 0
                         ):
-                            self.env["idil.transaction_bookingline"].create(
+                            line_vals.append(
                                 {
-                                    "transaction_booking_id": transaction_booking.id,
                                     "sale_order_id": order.id,
                                     "description": f"Commission Expense - {product.name}",
                                     "product_id": product.id,
@@ -693,9 +689,8 @@ class SaleOrder(models.Model):
 
                         # DR Discount expense
                         if line.discount_amount > 0:
-                            self.env["idil.transaction_bookingline"].create(
+                            line_vals.append(
                                 {
-                                    "transaction_booking_id": transaction_booking.id,
                                     "sale_order_id": order.id,
                                     "description": f"Discount Expense - {product.name}",
                                     "product_id": product.id,
@@ -707,6 +702,8 @@ class SaleOrder(models.Model):
                                     "transaction_date": order.order_date,
                                 }
                             )
+
+                    transaction_booking.post_lines(line_vals)
         except Exception as e:
             _logger.error("transaction failed: %s", e)
             raise ValidationError(("Transaction failed: %s") % e)
@@ -222,56 +222,48 @@ class SalesOpeningBalance(models.Model):
                     )
                     # --- Booking lines ---
                     # 1. Debit salesperson receivable
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "sales_opening_balance_id": record.id,
-                            "account_number": line.sales_person_id.account_receivable_id.id,
-                            "transaction_type": "dr",
-                            "dr_amount": line.amount,
-                            "cr_amount": 0,
-                            "transaction_date": record.date,
-                            "description": f"Opening Balance for {line.sales_person_id.name}",
-                        }
-                    )
-                    # 2. Source clearing (local, credit)
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "sales_opening_balance_id": record.id,
-                            "account_number": source_clearing_account.id,
-                            "transaction_type": "cr",
-                            "dr_amount": 0.0,
-                            "cr_amount": line.amount,
-                            "transaction_date": record.date,
-                            "description": f"Opening Balance for {line.sales_person_id.name}",
-                        }
-                    )
-                    # 3. Owners Equity (credit, USD)
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "sales_opening_balance_id": record.id,
-                            "account_number": EquityAccount.id,
-                            "transaction_type": "cr",
-                            "dr_amount": 0.0,
-                            "cr_amount": cost_amount_usd,
-                            "transaction_date": record.date,
-                            "description": f"Opening Balance for {line.sales_person_id.name}",
-                        }
-                    )
-                    # 4. Target clearing (debit, USD)
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "sales_opening_balance_id": record.id,
-                            "account_number": target_clearing_account.id,
-                            "transaction_type": "dr",
-                            "dr_amount": cost_amount_usd,
-                            "cr_amount": 0.0,
-                            "transaction_date": record.date,
-                            "description": f"Opening Balance for {line.sales_person_id.name}",
-                        }
+                    transaction_booking.post_lines(
+                        [
+                            {
+                                "sales_opening_balance_id": record.id,
+                                "account_number": line.sales_person_id.account_receivable_id.id,
+                                "transaction_type": "dr",
+                                "dr_amount": line.amount,
+                                "cr_amount": 0,
+                                "transaction_date": record.date,
+                                "description": f"Opening Balance for {line.sales_person_id.name}",
+                            },
+                            # 2. Source clearing (local, credit)
+                            {
+                                "sales_opening_balance_id": record.id,
+                                "account_number": source_clearing_account.id,
+                                "transaction_type": "cr",
+                                "dr_amount": 0.0,
+                                "cr_amount": line.amount,
+                                "transaction_date": record.date,
+                                "description": f"Opening Balance for {line.sales_person_id.name}",
+                            },
+                            # 3. Owners Equity (credit, USD)
+                            {
+                                "sales_opening_balance_id": record.id,
+                                "account_number": EquityAccount.id,
+                                "transaction_type": "cr",
+                                "dr_amount": 0.0,
+                                "cr_amount": cost_amount_usd,
+                                "transaction_date": record.date,
+                                "description": f"Opening Balance for {line.sales_person_id.name}",
+                            },
+                            # 4. Target clearing (debit, USD)
+                            {
+                                "sales_opening_balance_id": record.id,
+                                "account_number": target_clearing_account.id,
+                                "transaction_type": "dr",
+                                "dr_amount": cost_amount_usd,
+                                "cr_amount": 0.0,
+                                "transaction_date": record.date,
+                                "description": f"Opening Balance for {line.sales_person_id.name}",
+                            },
+                        ]
                     )
                     # --- Receipt ---
                     self.env["idil.sales.receipt"].create(
@@ -500,10 +492,9 @@ class SalesOpeningBalance(models.Model):
                                 }
                             )
 
-                            self.env["idil.transaction_bookingline"].create(
+                            booking.post_lines(
                                 [
                                     {
-                                        "transaction_booking_id": booking.id,
                                         "sales_opening_balance_id": opening_balance.id,
                                         "account_number": line.account_id.id,
                                         "transaction_type": "dr",
@@ -512,7 +503,6 @@ class SalesOpeningBalance(models.Model):
                                         "description": f"Opening Balance for {line.sales_person_id.name}",
                                     },
                                     {
-                                        "transaction_booking_id": booking.id,
                                         "sales_opening_balance_id": opening_balance.id,
                                         "account_number": source_clearing_account.id,
                                         "transaction_type": "cr",
@@ -521,7 +511,6 @@ class SalesOpeningBalance(models.Model):
                                         "description": f"Opening Balance for {line.sales_person_id.name}",
                                     },
                                     {
-                                        "transaction_booking_id": booking.id,
                                         "sales_opening_balance_id": opening_balance.id,
                                         "account_number": equity_account.id,
                                         "transaction_type": "cr",
@@ -530,7 +519,6 @@ class SalesOpeningBalance(models.Model):
                                         "description": f"Opening Balance for {line.sales_person_id.name}",
                                     },
                                     {
-                                        "transaction_booking_id": booking.id,
                                         "sales_opening_balance_id": opening_balance.id,
                                         "account_number": target_clearing_account.id,
                                         "transaction_type": "dr",
@@ -238,32 +238,29 @@ class SalesReceipt(models.Model):
                         )
 
                     # Create transaction booking lines
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "transaction_type": "dr",
-                            "description": f"Receipt -- {record.cusotmer_sale_order_id.name if record.cusotmer_sale_order_id else record.sales_order_id.name}",
-                            "account_number": record.payment_account.id,
-                            "dr_amount": record.amount_paying,
-                            "cr_amount": 0,
-                            "transaction_date": fields.Datetime.now(),
-                            "description": f"Receipt for {order_name}",
-                            "customer_opening_balance_id": record.customer_opening_balance_id.id,
-                        }
-                    )
-
-                    self.env["idil.transaction_bookingline"].create(
-                        {
-                            "transaction_booking_id": transaction_booking.id,
-                            "transaction_type": "cr",
-                            "description": f"Receipt -- {record.cusotmer_sale_order_id.name if record.cusotmer_sale_order_id else record.sales_order_id.name}",
-                            "account_number": ar_account_id.id,
-                            "dr_amount": 0,
-                            "cr_amount": record.amount_paying,
-                            "transaction_date": fields.Datetime.now(),
-                            "description": f"Receipt for {order_name}",
-                            "customer_opening_balance_id": record.customer_opening_balance_id.id,
-                        }
+                    transaction_booking.post_lines(
+                        [
+                            {
+                                "transaction_type": "dr",
+                                "description": f"Receipt -- {record.cusotmer_sale_order_id.name if record.cusotmer_sale_order_id else record.sales_order_id.name}",
+                                "account_number": record.payment_account.id,
+                                "dr_amount": record.amount_paying,
+                                "cr_amount": 0,
+                                "transaction_date": fields.Datetime.now(),
+                                "description": f"Receipt for {order_name}",
+                                "customer_opening_balance_id": record.customer_opening_balance_id.id,
+                            },
+                            {
+                                "transaction_type": "cr",
+                                "description": f"Receipt -- {record.cusotmer_sale_order_id.name if record.cusotmer_sale_order_id else record.sales_order_id.name}",
+                                "account_number": ar_account_id.id,
+                                "dr_amount": 0,
+                                "cr_amount": record.amount_paying,
+                                "transaction_date": fields.Datetime.now(),
+                                "description": f"Receipt for {order_name}",
+                                "customer_opening_balance_id": record.customer_opening_balance_id.id,
+                            },
+                        ]
                     )
 
                     payment = self.env["idil.sales.payment"].create(
@@ -349,6 +346,55 @@ class SalesReceipt(models.Model):
             logger.error(f"transaction failed: {str(e)}")
             raise ValidationError(f"Transaction failed: {str(e)}")
 
+    def init(self):
+        # Open items: the pending receipts of a partner in FIFO order, as
+        # read by bulk receipt payments.
+        for partner_field in ("customer_id", "salesperson_id"):
+            self.env.cr.execute(
+                f"""
+                CREATE INDEX IF NOT EXISTS idil_sales_receipt_open_{partner_field}_idx
+                ON idil_sales_receipt ({partner_field}, receipt_date, id)
+                INCLUDE (due_amount, paid_amount)
+                WHERE payment_status = 'pending'
+                """
+            )
+        self.env["idil.customer.registration"]._install_balance_trigger()
+
+    @api.model
+    def _get_open_items(self, partner_field, partner_id):
+        """Return the pending receipts of a customer or salesperson, oldest
+        first, as dicts with ``id``, ``receipt_date``, ``due_amount``,
+        ``paid_amount`` and ``open_amount``.
+
+        :param partner_field: ``"customer_id"`` or ``"salesperson_id"``
+        """
+        assert partner_field in ("customer_id", "salesperson_id")
+        self.flush_model(
+            [partner_field, "receipt_date", "due_amount", "paid_amount", "payment_status"]
+        )
+        self.env.cr.execute(
+            f"""
+            SELECT id, receipt_date, due_amount, paid_amount,
+                   COALESCE(due_amount, 0) - COALESCE(paid_amount, 0) AS open_amount
+            FROM idil_sales_receipt
+            WHERE {partner_field} = %s AND payment_status = 'pending'
+            ORDER BY receipt_date, id
+            """,
+            (partner_id,),
+        )
+        return self.env.cr.dictfetchall()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(SalesReceipt, self).create(vals_list)
+        self.env["idil.customer.registration"]._sync_balance_cache(records)
+        return records
+
+    def write(self, vals):
+        res = super(SalesReceipt, self).write(vals)
+        self.env["idil.customer.registration"]._sync_balance_cache(self)
+        return res
+
     def unlink(self):
         try:
             with self.env.cr.savepoint():
@@ -399,7 +445,11 @@ class SalesReceipt(models.Model):
                         Thank you for your understanding and cooperation."""
                     )
 
-                return super(SalesReceipt, self).unlink()
+                res = super(SalesReceipt, self).unlink()
+                self.env["idil.customer.registration"]._sync_balance_cache(
+                    self.browse()
+                )
+                return res
         except Exception as e:
             logger.error(f"transaction failed: {str(e)}")
             raise ValidationError(f"Transaction failed: {str(e)}")
@@ -119,64 +119,48 @@ class ReceiptBulkPayment(models.Model):
                         "Sum of payment methods must equal Amount to Pay."
                     )
 
+    def _get_open_items(self):
+        """Pending receipts of the selected partner, oldest first (see
+        ``idil.sales.receipt._get_open_items``), or None when no partner is
+        selected."""
+        self.ensure_one()
+        Receipt = self.env["idil.sales.receipt"]
+        if self.partner_type == "salesperson" and self.salesperson_id:
+            return Receipt._get_open_items("salesperson_id", self.salesperson_id.id)
+        if self.partner_type == "customer" and self.customer_id:
+            return Receipt._get_open_items("customer_id", self.customer_id.id)
+        return None
+
     @api.depends("salesperson_id", "customer_id", "partner_type")
     def _compute_due_receipt(self):
         for rec in self:
-            if rec.partner_type == "salesperson" and rec.salesperson_id:
-                receipts = rec.env["idil.sales.receipt"].search(
-                    [
-                        ("salesperson_id", "=", rec.salesperson_id.id),
-                        ("payment_status", "=", "pending"),
-                    ]
-                )
-            elif rec.partner_type == "customer" and rec.customer_id:
-                receipts = rec.env["idil.sales.receipt"].search(
-                    [
-                        ("customer_id", "=", rec.customer_id.id),
-                        ("payment_status", "=", "pending"),
-                    ]
-                )
-            else:
-                receipts = rec.env["idil.sales.receipt"]
-            rec.due_receipt_amount = sum(r.due_amount - r.paid_amount for r in receipts)
-            rec.due_receipt_count = len(receipts)
+            open_items = rec._get_open_items() or []
+            rec.due_receipt_amount = sum(item["open_amount"] for item in open_items)
+            rec.due_receipt_count = len(open_items)
 
     @api.onchange("salesperson_id", "customer_id", "amount_to_pay", "partner_type")
     def _onchange_lines(self):
         self.line_ids = [(5, 0, 0)]
-        if self.partner_type == "salesperson" and self.salesperson_id:
-            domain = [
-                ("salesperson_id", "=", self.salesperson_id.id),
-                ("payment_status", "=", "pending"),
-            ]
-        elif self.partner_type == "customer" and self.customer_id:
-            domain = [
-                ("customer_id", "=", self.customer_id.id),
-                ("payment_status", "=", "pending"),
-            ]
-        else:
+        open_items = self._get_open_items()
+        if open_items is None:
             return
-        receipts = self.env["idil.sales.receipt"].search(
-            domain, order="receipt_date asc"
-        )
         remaining_payment = self.amount_to_pay
         lines = []
-        for receipt in receipts:
+        for item in open_items:
             if remaining_payment <= 0:
                 break
-            to_pay = min(receipt.due_amount - receipt.paid_amount, remaining_payment)
+            to_pay = min(item["open_amount"], remaining_payment)
             if to_pay > 0:
                 lines.append(
                     (
                         0,
                         0,
                         {
-                            "receipt_id": receipt.id,
-                            "receipt_date": receipt.receipt_date,  # Make sure this field exists and is set in the receipt
-                            "due_amount": receipt.due_amount,
-                            "paid_amount": receipt.paid_amount,
-                            "remaining_amount": receipt.due_amount
-                            - receipt.paid_amount,
+                            "receipt_id": item["id"],
+                            "receipt_date": item["receipt_date"],
+                            "due_amount": item["due_amount"],
+                            "paid_amount": item["paid_amount"],
+                            "remaining_amount": item["open_amount"],
                             "paid_now": to_pay,
                         },
                     )
@@ -187,23 +171,10 @@ class ReceiptBulkPayment(models.Model):
     @api.constrains("amount_to_pay", "salesperson_id", "customer_id", "partner_type")
     def _check_amount(self):
         for rec in self:
-            if rec.partner_type == "salesperson" and rec.salesperson_id:
-                receipts = rec.env["idil.sales.receipt"].search(
-                    [
-                        ("salesperson_id", "=", rec.salesperson_id.id),
-                        ("payment_status", "=", "pending"),
-                    ]
-                )
-            elif rec.partner_type == "customer" and rec.customer_id:
-                receipts = rec.env["idil.sales.receipt"].search(
-                    [
-                        ("customer_id", "=", rec.customer_id.id),
-                        ("payment_status", "=", "pending"),
-                    ]
-                )
-            else:
+            open_items = rec._get_open_items()
+            if open_items is None:
                 continue
-            total_due = sum(r.due_amount - r.paid_amount for r in receipts)
+            total_due = sum(item["open_amount"] for item in open_items)
             if rec.amount_to_pay > total_due:
                 raise ValidationError(
                     f"Total Amount to Pay ({rec.amount_to_pay}) cannot exceed total due ({total_due})."
@@ -215,6 +186,50 @@ class ReceiptBulkPayment(models.Model):
             if not rec.payment_method_ids:
                 raise ValidationError("At least one payment method must be added.")
 
+    def _allocate_payment(self):
+        """Spread the payment methods over the receipt lines, oldest first.
+
+        The whole allocation is computed in memory before anything is posted.
+
+        :return: list of ``(method, line, amount, settles)`` tuples, ``settles``
+            telling whether ``amount`` clears the receipt
+        """
+        self.ensure_one()
+        lines = self.line_ids.filtered(
+            lambda l: l.receipt_id.due_amount > l.receipt_id.paid_amount
+        )
+        if not lines:
+            raise UserError("No valid receipts with remaining due amount.")
+
+        open_amount = {
+            line.receipt_id.id: line.receipt_id.due_amount - line.receipt_id.paid_amount
+            for line in lines
+        }
+        allocation = []
+        for method in self.payment_method_ids:
+            payment_account = method.payment_account_id
+            if not payment_account:
+                raise UserError("Missing payment account.")
+
+            remaining_amount = method.payment_amount
+            if remaining_amount <= 0:
+                continue
+
+            for line in lines:
+                due_balance = open_amount[line.receipt_id.id]
+                if due_balance <= 0 or remaining_amount <= 0:
+                    continue
+                to_pay = min(due_balance, remaining_amount)
+                allocation.append((method, line, to_pay, to_pay >= due_balance))
+                open_amount[line.receipt_id.id] -= to_pay
+                remaining_amount -= to_pay
+
+            if remaining_amount > 0:
+                raise UserError(
+                    f"⚠️ Payment method '{payment_account.name}' has {remaining_amount:.2f} unallocated."
+                )
+        return allocation
+
     def action_confirm_payment(self):
         try:
             with self.env.cr.savepoint():
@@ -236,182 +251,181 @@ class ReceiptBulkPayment(models.Model):
                 if not trx_source:
                     raise UserError("Transaction source 'Bulk Receipt' not found.")
 
-                remaining_receipts = self.line_ids.filtered(
-                    lambda l: l.receipt_id.due_amount > l.receipt_id.paid_amount
-                )
-
-                if not remaining_receipts:
-                    raise UserError("No valid receipts with remaining due amount.")
-
-                for method in self.payment_method_ids:
+                if self.partner_type not in ("salesperson", "customer"):
+                    raise UserError("Invalid partner type.")
+                is_salesperson = self.partner_type == "salesperson"
+
+                allocation = self._allocate_payment()
+
+                # Receivable account of each allocation, currencies checked
+                # once per (payment account, receivable account) pair.
+                ar_accounts = []
+                checked = set()
+                for method, line, to_pay, settles in allocation:
+                    receipt = line.receipt_id
+                    partner = (
+                        receipt.salesperson_id
+                        if is_salesperson
+                        else receipt.customer_id
+                    )
                     payment_account = method.payment_account_id
-                    if not payment_account:
-                        raise UserError(f"Missing payment account.")
-
-                    remaining_amount = method.payment_amount
-                    if remaining_amount <= 0:
+                    ar_account = partner.account_receivable_id
+                    ar_accounts.append(ar_account)
+                    if (payment_account.id, ar_account.id) in checked:
                         continue
+                    if ar_account.currency_id.id != payment_account.currency_id.id:
+                        raise UserError(
+                            f"Currency mismatch between payment account ({payment_account.currency_id.name}) "
+                            f"and receivable account ({ar_account.currency_id.name}) for {partner.name}."
+                        )
+                    checked.add((payment_account.id, ar_account.id))
 
-                    for line in remaining_receipts:
-                        receipt = line.receipt_id
-                        due_balance = receipt.due_amount - receipt.paid_amount
-
-                        if due_balance <= 0 or remaining_amount <= 0:
-                            continue
-
-                        to_pay = min(due_balance, remaining_amount)
-
-                        if self.partner_type == "salesperson":
-                            ar_account = receipt.salesperson_id.account_receivable_id
-                            entity_name = receipt.salesperson_id.name
-                            is_salesperson = True
-                        elif self.partner_type == "customer":
-                            ar_account = receipt.customer_id.account_receivable_id
-                            entity_name = receipt.customer_id.name
-                            is_salesperson = False
-                        else:
-                            raise UserError("Invalid partner type.")
-
-                        if ar_account.currency_id.id != payment_account.currency_id.id:
-                            raise UserError(
-                                f"Currency mismatch between payment account ({payment_account.currency_id.name}) "
-                                f"and receivable account ({ar_account.currency_id.name}) for {entity_name}."
-                            )
+                now = fields.Datetime.now()
+                description = f"Bulk Receipt - {self.name}"
 
-                        # Create Transaction Booking
-                        trx_booking = self.env["idil.transaction_booking"].create(
-                            {
-                                "order_number": (
-                                    receipt.sales_order_id.name
-                                    if receipt.sales_order_id
-                                    else "/"
-                                ),
-                                "trx_source_id": trx_source.id,
-                                "payment_method": "other",
-                                "customer_id": (
-                                    receipt.customer_id.id
-                                    if receipt.customer_id
-                                    else False
-                                ),
-                                "reffno": self.name,
-                                "rate": self.rate,
-                                "sale_order_id": (
-                                    receipt.sales_order_id.id
-                                    if receipt.sales_order_id
-                                    else False
-                                ),
-                                "payment_status": (
-                                    "paid" if to_pay >= due_balance else "partial_paid"
-                                ),
-                                "customer_opening_balance_id": receipt.customer_opening_balance_id.id,
-                                "trx_date": fields.Datetime.now(),
-                                "amount": to_pay,
-                            }
-                        )
+                # Transaction Bookings, one per receipt / method pair
+                bookings = self.env["idil.transaction_booking"].create(
+                    [
+                        {
+                            "order_number": (
+                                line.receipt_id.sales_order_id.name
+                                if line.receipt_id.sales_order_id
+                                else "/"
+                            ),
+                            "trx_source_id": trx_source.id,
+                            "payment_method": "other",
+                            "customer_id": line.receipt_id.customer_id.id,
+                            "reffno": self.name,
+                            "rate": self.rate,
+                            "sale_order_id": line.receipt_id.sales_order_id.id,
+                            "payment_status": "paid" if settles else "partial_paid",
+                            "customer_opening_balance_id": line.receipt_id.customer_opening_balance_id.id,
+                            "trx_date": now,
+                            "amount": to_pay,
+                        }
+                        for method, line, to_pay, settles in allocation
+                    ]
+                )
 
-                        # Booking lines (DR from method account, CR to AR)
-                        dr_line = self.env["idil.transaction_bookingline"].create(
-                            {
-                                "transaction_booking_id": trx_booking.id,
-                                "transaction_type": "dr",
-                                "account_number": payment_account.id,
-                                "dr_amount": to_pay,
-                                "cr_amount": 0.0,
-                                "transaction_date": fields.Datetime.now(),
-                                "description": f"Bulk Receipt - {self.name}",
-                                "customer_opening_balance_id": receipt.customer_opening_balance_id.id,
-                            }
-                        )
+                # Booking lines (DR from method account, CR to AR). Both legs
+                # carry the same amount in the same currency, checked above.
+                booking_line_vals = []
+                for (method, line, to_pay, settles), booking, ar_account in zip(
+                    allocation, bookings, ar_accounts
+                ):
+                    opening_balance_id = line.receipt_id.customer_opening_balance_id.id
+                    booking_line_vals += [
+                        {
+                            "transaction_booking_id": booking.id,
+                            "transaction_type": "dr",
+                            "account_number": method.payment_account_id.id,
+                            "dr_amount": to_pay,
+                            "cr_amount": 0.0,
+                            "transaction_date": now,
+                            "description": description,
+                            "customer_opening_balance_id": opening_balance_id,
+                        },
+                        {
+                            "transaction_booking_id": booking.id,
+                            "transaction_type": "cr",
+                            "account_number": ar_account.id,
+                            "dr_amount": 0.0,
+                            "cr_amount": to_pay,
+                            "transaction_date": now,
+                            "description": description,
+                            "customer_opening_balance_id": opening_balance_id,
+                        },
+                    ]
+                booking_lines = bookings.post_lines(booking_line_vals)
 
-                        cr_line = self.env["idil.transaction_bookingline"].create(
-                            {
-                                "transaction_booking_id": trx_booking.id,
-                                "transaction_type": "cr",
-                                "account_number": ar_account.id,
-                                "dr_amount": 0.0,
-                                "cr_amount": to_pay,
-                                "transaction_date": fields.Datetime.now(),
-                                "description": f"Bulk Receipt - {self.name}",
-                                "customer_opening_balance_id": receipt.customer_opening_balance_id.id,
-                            }
+                # Sales Payment records (per method), linking the method too
+                payments = self.env["idil.sales.payment"].create(
+                    [
+                        {
+                            "sales_receipt_id": line.receipt_id.id,
+                            "payment_method_ids": [(4, method.id)],
+                            "transaction_booking_ids": [(4, bookings[index].id)],
+                            "transaction_bookingline_ids": [
+                                (4, booking_lines[2 * index].id),
+                                (4, booking_lines[2 * index + 1].id),
+                            ],
+                            "payment_account": method.payment_account_id.id,
+                            "payment_date": now,
+                            "paid_amount": to_pay,
+                        }
+                        for index, (method, line, to_pay, settles) in enumerate(
+                            allocation
                         )
+                    ]
+                )
 
-                        # Sales Payment record (per method)
-                        payment = self.env["idil.sales.payment"].create(
+                # Transactions: salesperson or customer
+                if is_salesperson:
+                    self.env["idil.salesperson.transaction"].create(
+                        [
                             {
-                                "sales_receipt_id": receipt.id,
-                                "payment_method_ids": [(4, method.id)],
-                                "transaction_booking_ids": [(4, trx_booking.id)],
-                                "transaction_bookingline_ids": [
-                                    (4, dr_line.id),
-                                    (4, cr_line.id),
-                                ],
-                                "payment_account": payment_account.id,
-                                "payment_date": fields.Datetime.now(),
-                                "paid_amount": to_pay,
+                                "sales_person_id": line.receipt_id.salesperson_id.id,
+                                "date": fields.Date.today(),
+                                "sales_payment_id": payment.id,
+                                "sales_receipt_id": line.receipt_id.id,
+                                "order_id": line.receipt_id.sales_order_id.id,
+                                "transaction_type": "in",
+                                "amount": to_pay,
+                                "description": f"Bulk Payment - Receipt {line.receipt_id.id} - Order {line.receipt_id.sales_order_id.name or ''}",
                             }
-                        )
-                        method.write(
-                            {"sales_payment_id": payment.id}
-                        )  # If assigning after create
-
-                        # Update receipt
-                        receipt.paid_amount += to_pay
-                        receipt.remaining_amount = (
-                            receipt.due_amount - receipt.paid_amount
-                        )
-                        receipt.payment_status = (
-                            "paid" if receipt.remaining_amount <= 0 else "pending"
-                        )
-                        line.paid_now += to_pay
-
-                        # Transaction: salesperson or customer
-                        if is_salesperson:
-                            self.env["idil.salesperson.transaction"].create(
-                                {
-                                    "sales_person_id": receipt.salesperson_id.id,
-                                    "date": fields.Date.today(),
-                                    "sales_payment_id": payment.id,
-                                    "sales_receipt_id": receipt.id,
-                                    "order_id": (
-                                        receipt.sales_order_id.id
-                                        if receipt.sales_order_id
-                                        else False
-                                    ),
-                                    "transaction_type": "in",
-                                    "amount": to_pay,
-                                    "description": f"Bulk Payment - Receipt {receipt.id} - Order {receipt.sales_order_id.name if receipt.sales_order_id else ''}",
-                                }
+                            for (method, line, to_pay, settles), payment in zip(
+                                allocation, payments
                             )
-                        else:
-                            self.env["idil.customer.sale.payment"].create(
-                                {
-                                    "order_id": (
-                                        receipt.cusotmer_sale_order_id.id
-                                        if receipt.cusotmer_sale_order_id
-                                        else False
-                                    ),
-                                    "customer_id": receipt.customer_id.id,
-                                    "payment_method": "cash",
-                                    "sales_payment_id": payment.id,
-                                    "sales_receipt_id": receipt.id,
-                                    "account_id": payment_account.id,
-                                    "amount": to_pay,
-                                }
+                        ]
+                    )
+                else:
+                    self.env["idil.customer.sale.payment"].create(
+                        [
+                            {
+                                "order_id": line.receipt_id.cusotmer_sale_order_id.id,
+                                "customer_id": line.receipt_id.customer_id.id,
+                                "payment_method": "cash",
+                                "sales_payment_id": payment.id,
+                                "sales_receipt_id": line.receipt_id.id,
+                                "account_id": method.payment_account_id.id,
+                                "amount": to_pay,
+                            }
+                            for (method, line, to_pay, settles), payment in zip(
+                                allocation, payments
                             )
+                        ]
+                    )
 
-                        # Recompute order
-                        if receipt.cusotmer_sale_order_id:
-                            receipt.cusotmer_sale_order_id._compute_total_paid()
-                            receipt.cusotmer_sale_order_id._compute_balance_due()
-
-                        # Deduct from method amount
-                        remaining_amount -= to_pay
+                # Update each receipt and line once with its total
+                paid_by_line = {}
+                for method, line, to_pay, settles in allocation:
+                    paid_by_line[line] = paid_by_line.get(line, 0.0) + to_pay
+                paid_by_receipt = {}
+                for line, paid_now in paid_by_line.items():
+                    line.paid_now += paid_now
+                    paid_by_receipt[line.receipt_id] = (
+                        paid_by_receipt.get(line.receipt_id, 0.0) + paid_now
+                    )
+                receipts = self.env["idil.sales.receipt"]
+                for receipt, paid_now in paid_by_receipt.items():
+                    paid_amount = receipt.paid_amount + paid_now
+                    remaining_amount = receipt.due_amount - paid_amount
+                    receipt.write(
+                        {
+                            "paid_amount": paid_amount,
+                            "remaining_amount": remaining_amount,
+                            "payment_status": (
+                                "paid" if remaining_amount <= 0 else "pending"
+                            ),
+                        }
+                    )
+                    receipts |= receipt
 
-                    if remaining_amount > 0:
-                        raise UserError(
-                            f"⚠️ Payment method '{payment_account.name}' has {remaining_amount:.2f} unallocated."
-                        )
+                # Recompute orders
+                orders = receipts.mapped("cusotmer_sale_order_id")
+                if orders:
+                    orders._compute_total_paid()
+                    orders._compute_balance_due()
 
                 self.state = "confirmed"
         except Exception as e:
@@ -8,8 +8,18 @@ _logger = logging.getLogger(__name__)
 
 class SalesPersonnel(models.Model):
     _name = "idil.sales.sales_personnel"
+    _inherit = ["idil.partner.balance.mixin"]
     _description = "Sales Personnel Information"
 
+    _balance_field = "due_amount"
+    _balance_source = "idil.salesperson.transaction"
+    _balance_key = "sales_person_id"
+    _balance_columns = ("sales_person_id", "transaction_type", "amount")
+    _balance_expression = (
+        "CASE {row}.transaction_type WHEN 'out' THEN COALESCE({row}.amount, 0) "
+        "WHEN 'in' THEN -COALESCE({row}.amount, 0) ELSE 0 END"
+    )
+
     name = fields.Char(string="Name", required=True)
     phone = fields.Char(string="Phone")
     email = fields.Char(string="Email")
@@ -39,21 +49,12 @@ class SalesPersonnel(models.Model):
     )
     due_amount = fields.Float(
         string="Due Amount",
-        compute="_compute_due_amount",
-        store=False,  # Set to True only if you want to store it permanently
+        readonly=True,
+        copy=False,
+        help="Out minus in of the salesperson transactions. Kept in sync by a "
+        "database trigger on idil.salesperson.transaction.",
     )
 
-    @api.depends("transaction_ids.amount", "transaction_ids.transaction_type")
-    def _compute_due_amount(self):
-        for person in self:
-            total_in = sum(
-                t.amount for t in person.transaction_ids if t.transaction_type == "in"
-            )
-            total_out = sum(
-                t.amount for t in person.transaction_ids if t.transaction_type == "out"
-            )
-            person.due_amount = total_out - total_in
-
     @api.onchange("currency_id")
     def _onchange_currency_id(self):
         """Updates the domain for account_id based on the selected currency."""
@@ -100,22 +101,40 @@ class SalesPersonBalanceReport(models.TransientModel):
     remaining_amount = fields.Float(
         string="Remaining Amount", compute="_compute_remaining_amount", store=True
     )
+    as_of_date = fields.Date(string="As of Date")
+    aging_current = fields.Float(string="0-30 Days")
+    aging_31_60 = fields.Float(string="31-60 Days")
+    aging_61_90 = fields.Float(string="61-90 Days")
+    aging_over_90 = fields.Float(string="Over 90 Days")
+
+    @api.depends("balance", "amount_paid")
+    def _compute_remaining_amount(self):
+        for rec in self:
+            rec.remaining_amount = rec.balance - rec.amount_paid
 
     @api.model
-    def generate_sales_person_balances_report(self):
+    def generate_sales_person_balances_report(self, as_of_date=None):
         self.search([]).unlink()  # Clear existing records
-        sales_person_balances = self._get_sales_person_balances()
-        for balance in sales_person_balances:
-            self.create(
+        sales_person_balances = self._get_sales_person_balances(as_of_date)
+        self.create(
+            [
                 {
+                    "sales_person_id": balance["sales_person_id"],
                     "sales_person_name": balance["sales_person_name"],
                     "sales_person_phone": balance["sales_person_phone"],
                     "account_name": balance["account_name"],
                     "account_id": balance["account_id"],
                     "account_code": balance["account_code"],
                     "balance": balance["balance"],
+                    "as_of_date": as_of_date,
+                    "aging_current": balance["aging_current"],
+                    "aging_31_60": balance["aging_31_60"],
+                    "aging_61_90": balance["aging_61_90"],
+                    "aging_over_90": balance["aging_over_90"],
                 }
-            )
+                for balance in sales_person_balances
+            ]
+        )
 
         return {
             "type": "ir.actions.act_window",
@@ -127,74 +146,77 @@ class SalesPersonBalanceReport(models.TransientModel):
             "target": "new",
         }
 
-    def _get_sales_person_balances(self):
-        sales_person_balances = []
+    def _get_sales_person_balances(self, as_of_date=None):
+        """Balance of every active salesperson on their receivable account,
+        from the booking lines of their sale orders.
+
+        All salespeople are computed with one query, aged against
+        ``as_of_date`` (today when not given), see ``_get_aged_balances``.
+        A salesperson in credit, e.g. after overpaying, gets the credit
+        aged like a debit balance.
+        """
+        self.env["idil.transaction_booking"].flush_model(["sale_order_id"])
+        self.env["idil.sale.order"].flush_model(["sales_person_id"])
+
         sales_personnel = self.env["idil.sales.sales_personnel"].search(
             [("active", "=", True)]
         )
+        if not sales_personnel:
+            return []
+        sales_personnel.flush_recordset(["account_receivable_id"])
+
+        rows = sales_personnel._get_aged_balances(
+            """
+            SELECT p.id AS partner_id, bl.id AS line_id
+            FROM idil_transaction_bookingline bl
+            JOIN idil_transaction_booking b ON b.id = bl.transaction_booking_id
+            JOIN idil_sale_order so ON so.id = b.sale_order_id
+            JOIN idil_sales_sales_personnel p
+                ON p.id = so.sales_person_id
+               AND p.account_receivable_id = bl.account_number
+            WHERE p.id IN %(person_ids)s
+            """,
+            {"person_ids": tuple(sales_personnel.ids)},
+            as_of_date,
+        )
+
+        sales_person_balances = []
         for person in sales_personnel:
-            # Initialize balance for each salesperson.
-            booking_lines_balance = 0
-            sales_orders = self.env["idil.sale.order"].search(
-                [("sales_person_id", "=", person.id)]
+            balance, current, days_60, days_90, older = rows.get(
+                person.id, (0.0, 0.0, 0.0, 0.0, 0.0)
             )
-            for order in sales_orders:
-                bookings = self.env["idil.transaction_booking"].search(
-                    [("sale_order_id", "=", order.id)]
-                )
-                for booking in bookings:
-                    # Filter booking lines by account number equal to salesperson's receivable account.
-                    booking_lines = self.env["idil.transaction_bookingline"].search(
-                        [
-                            ("transaction_booking_id", "=", booking.id),
-                            ("account_number", "=", person.account_receivable_id.id),
-                        ]
-                    )
-                    # Calculate debit and credit sums for filtered booking lines.
-                    debit = sum(
-                        booking_lines.filtered(
-                            lambda r: r.transaction_type == "dr"
-                        ).mapped("dr_amount")
-                    )
-                    credit = sum(
-                        booking_lines.filtered(
-                            lambda r: r.transaction_type == "cr"
-                        ).mapped("cr_amount")
-                    )
-                    booking_lines_balance += debit - credit
-
-            # Debugging: Log the calculated balance for each salesperson.
-            _logger.debug(
-                f"Salesperson: {person.name}, Balance: {booking_lines_balance}"
-            )
-
+            account = person.account_receivable_id
             sales_person_balances.append(
                 {
                     "sales_person_id": person.id,
                     "sales_person_name": person.name,
                     "sales_person_phone": person.phone,
-                    "account_name": (
-                        person.account_receivable_id.name
-                        if person.account_receivable_id
-                        else ""
-                    ),
-                    "account_id": (
-                        person.account_receivable_id.id
-                        if person.account_receivable_id
-                        else False
-                    ),
-                    "account_code": (
-                        person.account_receivable_id.code
-                        if person.account_receivable_id
-                        else ""
-                    ),
-                    "balance": booking_lines_balance,
+                    "account_name": account.name if account else "",
+                    "account_id": account.id if account else False,
+                    "account_code": account.code if account else "",
+                    "balance": balance,
+                    "aging_current": current,
+                    "aging_31_60": days_60,
+                    "aging_61_90": days_90,
+                    "aging_over_90": older,
                 }
             )
 
         return sales_person_balances
 
 
+class SalesPersonBalanceWizard(models.TransientModel):
+    _name = "idil.sales.balance.report.wizard"
+    _inherit = "idil.partner.balance.report.wizard"
+    _description = "Sales Personnel Balance Report Wizard"
+
+    def action_generate_report(self):
+        self.ensure_one()
+        return self.env[
+            "idil.sales.balance.report"
+        ].generate_sales_person_balances_report(self.as_of_date)
+
+
 class SalespersonTransaction(models.Model):
     _name = "idil.salesperson.transaction"
     _description = "Salesperson Transaction"
@@ -218,9 +240,7 @@ class SalespersonTransaction(models.Model):
     )
     amount = fields.Float(string="Amount")
     description = fields.Text(string="Description")
-    running_balance = fields.Float(
-        string="Running Balance", compute="_compute_running_balance", store=True
-    )
+    running_balance = fields.Float(string="Running Balance", readonly=True)
     sales_receipt_id = fields.Many2one(
         "idil.sales.receipt", string="Sales Receipt", ondelete="cascade"
     )
@@ -239,24 +259,158 @@ class SalespersonTransaction(models.Model):
         ondelete="cascade",
     )
 
-    @api.depends("sales_person_id", "amount", "transaction_type")
-    def _compute_running_balance(self):
-        for transaction in self:
-            # Get all transactions for the salesperson up to and including this one
-            transactions = self.search(
-                [
-                    ("sales_person_id", "=", transaction.sales_person_id.id),
-                    ("id", "<=", transaction.id),
-                ],
-                order="date asc, id asc",
-            )
+    # Fields that move a transaction's position or value in the running balance
+    _RUNNING_BALANCE_FIELDS = {
+        "sales_person_id",
+        "date",
+        "amount",
+        "transaction_type",
+    }
+
+    def init(self):
+        cr = self.env.cr
+        cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idil_salesperson_transaction_balance_idx
+            ON idil_salesperson_transaction
+                (sales_person_id, COALESCE(date, 'infinity'::date), id)
+            """
+        )
+        # Rows are also removed by ondelete=cascade on their documents, which
+        # skips unlink(): the running balance is kept by a trigger.
+        cr.execute(
+            """
+            CREATE OR REPLACE FUNCTION idil_salesperson_running_balance_from(
+                p_person integer, p_date date, p_id integer
+            ) RETURNS void AS $$
+                WITH prev AS (
+                    SELECT running_balance
+                    FROM idil_salesperson_transaction
+                    WHERE sales_person_id = p_person
+                      AND (COALESCE(date, 'infinity'::date), id) < (p_date, p_id)
+                    ORDER BY COALESCE(date, 'infinity'::date) DESC, id DESC
+                    LIMIT 1
+                ),
+                suffix AS (
+                    SELECT
+                        id,
+                        COALESCE((SELECT running_balance FROM prev), 0)
+                        + SUM(
+                            CASE WHEN transaction_type = 'in'
+                                 THEN COALESCE(amount, 0)
+                                 ELSE -COALESCE(amount, 0)
+                            END
+                        ) OVER (
+                            ORDER BY COALESCE(date, 'infinity'::date), id
+                            ROWS UNBOUNDED PRECEDING
+                        ) AS balance
+                    FROM idil_salesperson_transaction
+                    WHERE sales_person_id = p_person
+                      AND (COALESCE(date, 'infinity'::date), id) >= (p_date, p_id)
+                )
+                UPDATE idil_salesperson_transaction t
+                SET running_balance = suffix.balance
+                FROM suffix
+                WHERE t.id = suffix.id
+                  AND t.running_balance IS DISTINCT FROM suffix.balance
+            $$ LANGUAGE sql;
+
+            CREATE OR REPLACE FUNCTION idil_salesperson_running_balance_sync()
+            RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE'
+                   AND OLD.sales_person_id IS NOT DISTINCT FROM NEW.sales_person_id
+                THEN
+                    PERFORM idil_salesperson_running_balance_from(
+                        NEW.sales_person_id,
+                        LEAST(
+                            COALESCE(OLD.date, 'infinity'::date),
+                            COALESCE(NEW.date, 'infinity'::date)
+                        ),
+                        NEW.id
+                    );
+                    RETURN NULL;
+                END IF;
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    PERFORM idil_salesperson_running_balance_from(
+                        OLD.sales_person_id,
+                        COALESCE(OLD.date, 'infinity'::date),
+                        OLD.id
+                    );
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    PERFORM idil_salesperson_running_balance_from(
+                        NEW.sales_person_id,
+                        COALESCE(NEW.date, 'infinity'::date),
+                        NEW.id
+                    );
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
 
-            # Calculate the running balance
-            balance = 0.0
-            for trans in transactions:
-                if trans.transaction_type == "in":
-                    balance += trans.amount
-                else:  # 'out'
-                    balance -= trans.amount
-                # Update the running balance for this transaction
-                trans.running_balance = balance
+            DROP TRIGGER IF EXISTS idil_salesperson_running_balance_sync
+            ON idil_salesperson_transaction;
+            CREATE TRIGGER idil_salesperson_running_balance_sync
+            AFTER INSERT OR DELETE OR UPDATE OF
+                sales_person_id, date, amount, transaction_type
+            ON idil_salesperson_transaction
+            FOR EACH ROW EXECUTE FUNCTION idil_salesperson_running_balance_sync()
+            """
+        )
+        self.env["idil.sales.sales_personnel"]._install_balance_trigger()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(SalespersonTransaction, self).create(vals_list)
+        self.invalidate_model(["running_balance"])
+        self.env["idil.sales.sales_personnel"]._sync_balance_cache(records)
+        return records
+
+    def write(self, vals):
+        res = super(SalespersonTransaction, self).write(vals)
+        if self._RUNNING_BALANCE_FIELDS.intersection(vals):
+            # Run the triggers, then drop the balances they rewrote.
+            self.flush_recordset(list(self._RUNNING_BALANCE_FIELDS))
+            self.invalidate_model(["running_balance"])
+            self.env["idil.sales.sales_personnel"]._sync_balance_cache(self)
+        return res
+
+    def unlink(self):
+        res = super(SalespersonTransaction, self).unlink()
+        self.env["idil.sales.sales_personnel"]._sync_balance_cache(self.browse())
+        return res
+
+    @api.model
+    def action_rebuild_running_balances(self):
+        """Recompute every salesperson's running balance in one statement."""
+        self.flush_model()
+        self.env.cr.execute(
+            """
+            WITH balances AS (
+                SELECT
+                    id,
+                    SUM(
+                        CASE WHEN transaction_type = 'in'
+                             THEN COALESCE(amount, 0)
+                             ELSE -COALESCE(amount, 0)
+                        END
+                    ) OVER (
+                        PARTITION BY sales_person_id
+                        ORDER BY COALESCE(date, 'infinity'::date), id
+                        ROWS UNBOUNDED PRECEDING
+                    ) AS balance
+                FROM idil_salesperson_transaction
+            )
+            UPDATE idil_salesperson_transaction t
+            SET running_balance = balances.balance
+            FROM balances
+            WHERE t.id = balances.id
+              AND t.running_balance IS DISTINCT FROM balances.balance
+            """
+        )
+        _logger.info(
+            "Rebuilt running balances, %s salesperson transactions updated.",
+            self.env.cr.rowcount,
+        )
+        self.invalidate_model(["running_balance"])
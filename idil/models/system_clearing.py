@@ -72,6 +72,8 @@ class SystemClearingWizard(models.TransientModel):
         Delete FROM public.idil_stock_adjustment;
         Delete FROM public.idil_product_movement;
         Delete FROM public.idil_item_movement;
+        Delete FROM public.idil_product_movement_archive;
+        Delete FROM public.idil_item_movement_archive;
         Delete from my_product_opening_balance;
         Delete from my_product_opening_balance_line;     
         Delete from idil_staff_sales;
@@ -83,5 +85,9 @@ class SystemClearingWizard(models.TransientModel):
         """
 
         self.env.cr.execute(query)
+        # Nothing is archived any more, so no period stays closed.
+        self.env["ir.config_parameter"].sudo().set_param(
+            "idil.movement_archived_until", False
+        )
         self.env.cr.commit()
         _logger.info("✅ System clearing completed successfully.")
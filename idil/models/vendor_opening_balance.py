@@ -222,12 +222,12 @@ class VendorOpeningBalance(models.Model):
                         }
                     )
 
+                    line_vals = []
                     # Create clearing lines if needed (conversion)
                     if vendor_currency.name != "USD":
                         # Credit source clearing account (local)
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": transaction_booking.id,
                                 "vendor_opening_balance_id": line.id,
                                 "account_number": source_clearing_account.id,
                                 "transaction_type": "cr",
@@ -238,9 +238,8 @@ class VendorOpeningBalance(models.Model):
                             }
                         )
                         # Debit target clearing account (USD)
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": transaction_booking.id,
                                 "vendor_opening_balance_id": line.id,
                                 "account_number": target_clearing_account.id,
                                 "transaction_type": "dr",
@@ -252,9 +251,8 @@ class VendorOpeningBalance(models.Model):
                         )
 
                     # Owners Equity (Opening Balance Account) -- always USD
-                    self.env["idil.transaction_bookingline"].create(
+                    line_vals.append(
                         {
-                            "transaction_booking_id": transaction_booking.id,
                             "vendor_opening_balance_id": line.id,
                             "account_number": opening_balance_account.id,
                             "transaction_type": "dr",
@@ -265,9 +263,8 @@ class VendorOpeningBalance(models.Model):
                         }
                     )
                     # Vendor Payable (in vendor's currency)
-                    self.env["idil.transaction_bookingline"].create(
+                    line_vals.append(
                         {
-                            "transaction_booking_id": transaction_booking.id,
                             "vendor_opening_balance_id": line.id,
                             "account_number": vendor_account.id,
                             "transaction_type": "cr",
@@ -277,6 +274,8 @@ class VendorOpeningBalance(models.Model):
                             "description": f"Opening Balance for {line.vendor_id.name}",
                         }
                     )
+                    # The clearing legs are not balanced per currency yet; post as before.
+                    transaction_booking.post_lines(line_vals, check_balance=False)
 
                     # Vendor transaction
                     self.env["idil.vendor_transaction"].create(
@@ -426,10 +425,10 @@ class VendorOpeningBalance(models.Model):
                             booking.booking_lines.unlink()
 
                         # (Re)Create booking lines
+                        line_vals = []
                         if vendor_currency.name != "USD":
-                            self.env["idil.transaction_bookingline"].create(
+                            line_vals.append(
                                 {
-                                    "transaction_booking_id": booking.id,
                                     "vendor_opening_balance_id": line.id,
                                     "account_number": source_clearing_account.id,
                                     "transaction_type": "cr",
@@ -439,9 +438,8 @@ class VendorOpeningBalance(models.Model):
                                     "description": f"Opening Balance Clearing ({vendor_currency.name}) for {line.vendor_id.name}",
                                 }
                             )
-                            self.env["idil.transaction_bookingline"].create(
+                            line_vals.append(
                                 {
-                                    "transaction_booking_id": booking.id,
                                     "vendor_opening_balance_id": line.id,
                                     "account_number": target_clearing_account.id,
                                     "transaction_type": "dr",
@@ -453,9 +451,8 @@ class VendorOpeningBalance(models.Model):
                             )
 
                         # Owner equity (USD)
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": booking.id,
                                 "vendor_opening_balance_id": line.id,
                                 "account_number": opening_balance_account.id,
                                 "transaction_type": "dr",
@@ -467,9 +464,8 @@ class VendorOpeningBalance(models.Model):
                         )
 
                         # Payable (local)
-                        self.env["idil.transaction_bookingline"].create(
+                        line_vals.append(
                             {
-                                "transaction_booking_id": booking.id,
                                 "vendor_opening_balance_id": line.id,
                                 "account_number": vendor_account.id,
                                 "transaction_type": "cr",
@@ -479,6 +475,8 @@ class VendorOpeningBalance(models.Model):
                                 "description": f"Opening Balance for {line.vendor_id.name}",
                             }
                         )
+                        # The clearing legs are not balanced per currency yet; post as before.
+                        booking.post_lines(line_vals, check_balance=False)
 
                         # Update vendor transaction if exists
                         vendor_tx = self.env["idil.vendor_transaction"].search(
@@ -43,6 +43,37 @@ class VendorBulkPayment(models.Model):
         default="pending",  # Default status is pending
         help="Status of the bulk payment process.",
     )
+    vendor_balance = fields.Float(
+        string="Vendor Balance",
+        compute="_compute_vendor_balance",
+        help="Payable balance of the vendor, debit minus credit.",
+    )
+    vendor_aging_current = fields.Float(
+        string="Due 0-30 Days", compute="_compute_vendor_balance"
+    )
+    vendor_aging_31_60 = fields.Float(
+        string="Due 31-60 Days", compute="_compute_vendor_balance"
+    )
+    vendor_aging_61_90 = fields.Float(
+        string="Due 61-90 Days", compute="_compute_vendor_balance"
+    )
+    vendor_aging_over_90 = fields.Float(
+        string="Due Over 90 Days", compute="_compute_vendor_balance"
+    )
+
+    @api.depends("vendor_id", "payment_date")
+    def _compute_vendor_balance(self):
+        # One balance query for all the vendors shown.
+        balances = self.env["idil.vendor.registration"].get_balances(
+            self.vendor_id.ids
+        )
+        for record in self:
+            balance = balances.get(record.vendor_id.id, {})
+            record.vendor_balance = balance.get("balance", 0.0)
+            record.vendor_aging_current = balance.get("aging_current", 0.0)
+            record.vendor_aging_31_60 = balance.get("aging_31_60", 0.0)
+            record.vendor_aging_61_90 = balance.get("aging_61_90", 0.0)
+            record.vendor_aging_over_90 = balance.get("aging_over_90", 0.0)
 
     @api.constrains("amount_paying", "order_ids")
     def _check_amount_paying(self):
@@ -138,24 +169,22 @@ class VendorBulkPayment(models.Model):
                             "This bulk payment has already been processed."
                         )
 
-                    # Ensure the cash account balance is sufficient
-                    vendor_transaction = self.env["idil.vendor_transaction"].search(
-                        [("vendor_id", "=", record.vendor_id.id)], limit=1
-                    )
-                    if not vendor_transaction:
-                        raise exceptions.UserError(
-                            "No vendor transaction found for this vendor."
-                        )
-
-                    has_balance = vendor_transaction._check_cash_account_balance(
-                        record.cash_account_id.id, record.amount_paying
+                vendors_with_transactions = set(
+                    self.env["idil.vendor_transaction"]
+                    .search([("vendor_id", "in", self.vendor_id.ids)])
+                    .mapped("vendor_id")
+                    .ids
+                )
+                if set(self.vendor_id.ids) - vendors_with_transactions:
+                    raise exceptions.UserError(
+                        "No vendor transaction found for this vendor."
                     )
 
-                    if not has_balance:
-                        raise exceptions.ValidationError(
-                            "The cash account balance is not enough to cover the paid amount."
-                        )
+                # Ensure the cash account balances are sufficient, once for the
+                # whole batch
+                self._check_cash_account_balances()
 
+                for record in self:
                     # Call the existing processing function
                     record.process_bulk_payment()
 
@@ -171,112 +200,152 @@ class VendorBulkPayment(models.Model):
             _logger.error(f"transaction failed: {str(e)}")
             raise ValidationError(f"Transaction failed: {str(e)}")
 
+    def _check_cash_account_balances(self):
+        """Check the balance of each payment account against the total paid
+        from it by the bulk payments in ``self``."""
+        required = {}
+        for record in self:
+            account_id = record.cash_account_id.id
+            required[account_id] = required.get(account_id, 0.0) + record.amount_paying
+        balances = self.env["idil.account.daily.balance"].get_balances(required)
+        for account_id, amount in required.items():
+            if balances.get(account_id, 0.0) < amount:
+                raise exceptions.ValidationError(
+                    "The cash account balance is not enough to cover the paid amount."
+                )
+
+    def _allocate_bulk_payment(self):
+        """Spread ``amount_paying`` over the lines, in line order.
+
+        Each line pays the vendor transaction of its order number (the latest
+        one when several share it) as much as it still owes.
+
+        :return: list of ``(line, order, amount)`` tuples
+        """
+        self.ensure_one()
+        VendorTransaction = self.env["idil.vendor_transaction"]
+        order_numbers = [n for n in self.order_ids.mapped("order_number") if n]
+        orders = VendorTransaction.search([("order_number", "in", order_numbers)])
+
+        # Block concurrent payments on these transactions, then read them fresh.
+        if orders:
+            self.env.cr.execute(
+                "SELECT id FROM idil_vendor_transaction WHERE id IN %s FOR UPDATE",
+                (tuple(orders.ids),),
+            )
+            orders.invalidate_recordset()
+
+        order_by_number = {}
+        for order in orders:
+            order_by_number.setdefault(order.order_number, order)
+        due = {order.id: order.remaining_amount for order in orders}
+
+        remaining_amount = self.amount_paying
+        allocation = []
+        for line in self.order_ids:
+            order = order_by_number.get(line.order_number)
+            if order and remaining_amount > 0:
+                # Ensure we only pay what's needed
+                amount_to_pay = min(remaining_amount, due[order.id])
+                allocation.append((line, order, amount_to_pay))
+                due[order.id] -= amount_to_pay
+                remaining_amount -= amount_to_pay
+            if remaining_amount == 0:
+                break  # Stop processing if no more money is left
+        return allocation
+
     def process_bulk_payment(self):
         """Process payments for the selected vendor transactions based on order number, ensuring correct
         distribution."""
 
         try:
             with self.env.cr.savepoint():
-                remaining_amount = (
-                    self.amount_paying
-                )  # The total amount available for payment
-
-                for line in self.order_ids:
-                    # Find the related vendor transaction using the order number
-                    order = self.env["idil.vendor_transaction"].search(
-                        [("order_number", "=", line.order_number)], limit=1
+                allocation = self._allocate_bulk_payment()
+                if not allocation:
+                    raise UserError(
+                        "No vendor transaction found for the selected orders."
                     )
 
-                    if order and remaining_amount > 0:
-                        amount_to_pay = min(
-                            remaining_amount, order.remaining_amount
-                        )  # Ensure we only pay what's needed
-
-                        if amount_to_pay == order.remaining_amount:
-                            # Fully pay the order
-                            order.write(
-                                {
-                                    "paid_amount": order.amount,  # Mark full amount as paid
-                                    "remaining_amount": 0,  # No due amount
-                                    "payment_status": "paid",
-                                    # 'transaction_number': self.reffno,  # Store payment transaction number
-                                }
-                            )
-                            line.write(
-                                {
-                                    # 'transaction_number': self.reffno,
-                                    "payment_status": "paid",
-                                    "remaining_amount": 0,  # Update bulk payment line remaining amount
-                                    "bulk_paid_amount": amount_to_pay,  # ✅ Save paid portion
-                                }
-                            )
-                        else:
-                            # Partially pay the order
-                            order.write(
-                                {
-                                    "paid_amount": order.paid_amount
-                                    + amount_to_pay,  # Add the paid amount
-                                    "remaining_amount": order.remaining_amount
-                                    - amount_to_pay,  # Reduce due amount
-                                    "payment_status": "partial_paid",
-                                    # 'transaction_number': self.reffno,  # Store payment transaction number
-                                }
-                            )
-                            line.write(
-                                {
-                                    # 'transaction_number': self.reffno,
-                                    "payment_status": "partial_paid",
-                                    "remaining_amount": order.remaining_amount,
-                                    "bulk_paid_amount": amount_to_pay,  # ✅ Save paid portion
-                                    # Update bulk payment line remaining amount
-                                }
-                            )
-
-                        # ---- Update existing transaction_booking if linked ----
-                        if order.transaction_booking_id:
-                            booking = order.transaction_booking_id
-                            updated_paid = booking.amount_paid + amount_to_pay
-                            updated_remaining = booking.amount - updated_paid
-
-                            booking.write(
-                                {
-                                    "amount_paid": updated_paid,
-                                    "remaining_amount": updated_remaining,
-                                    "payment_status": (
-                                        "paid"
-                                        if updated_remaining == 0
-                                        else "partial_paid"
-                                    ),
-                                }
-                            )
-
-                        remaining_amount -= amount_to_pay  # Reduce the remaining amount by the actual amount paid
-                        # ✅ **Create a Vendor Payment Record**
-                        self.env["idil.vendor_payment"].create(
-                            {
-                                "vendor_id": self.vendor_id.id,
-                                "vendor_bulk_payment_id": self.id,
-                                "vendor_transaction_id": order.id,
-                                "amount_paid": amount_to_pay,
-                                "cheque_no": self.reffno,
-                                "payment_date": self.payment_date,
-                            }
+                # ---- Update vendor transactions and lines ----
+                paid = {}
+                for line, order, amount_to_pay in allocation:
+                    paid_amount, remaining = paid.get(
+                        order, (order.paid_amount, order.remaining_amount)
+                    )
+                    if amount_to_pay == remaining:
+                        # Fully pay the order
+                        paid[order] = (order.amount, 0)
+                        line_vals = {"payment_status": "paid", "remaining_amount": 0}
+                    else:
+                        # Partially pay the order
+                        paid[order] = (
+                            paid_amount + amount_to_pay,
+                            remaining - amount_to_pay,
                         )
+                        line_vals = {
+                            "payment_status": "partial_paid",
+                            "remaining_amount": remaining - amount_to_pay,
+                        }
+                    # ✅ Save paid portion
+                    line_vals["bulk_paid_amount"] = amount_to_pay
+                    line.write(line_vals)
+
+                for order, (paid_amount, remaining) in paid.items():
+                    order.write(
+                        {
+                            "paid_amount": paid_amount,
+                            "remaining_amount": remaining,
+                            "payment_status": (
+                                "paid" if remaining == 0 else "partial_paid"
+                            ),
+                        }
+                    )
 
-                    if remaining_amount == 0:
-                        break  # Stop processing if no more money is left
-
-                # Log any unused remaining amount
-                if remaining_amount > 0:
-                    _logger.info(
-                        f"Remaining amount of {remaining_amount} was not used."
+                # ---- Update existing transaction_booking if linked ----
+                booking_paid = {}
+                for line, order, amount_to_pay in allocation:
+                    booking = order.transaction_booking_id
+                    if booking:
+                        booking_paid[booking] = (
+                            booking_paid.get(booking, 0.0) + amount_to_pay
+                        )
+                for booking, amount_to_pay in booking_paid.items():
+                    updated_paid = booking.amount_paid + amount_to_pay
+                    updated_remaining = booking.amount - updated_paid
+                    booking.write(
+                        {
+                            "amount_paid": updated_paid,
+                            "remaining_amount": updated_remaining,
+                            "payment_status": (
+                                "paid" if updated_remaining == 0 else "partial_paid"
+                            ),
+                        }
                     )
-                else:
-                    _logger.info("All funds have been allocated.")
 
-                self.env["idil.transaction_bookingline"].create(
+                # ✅ **Create the Vendor Payment Records**
+                self.env["idil.vendor_payment"].create(
+                    [
+                        {
+                            "vendor_id": self.vendor_id.id,
+                            "vendor_bulk_payment_id": self.id,
+                            "vendor_transaction_id": order.id,
+                            "amount_paid": amount_to_pay,
+                            "cheque_no": self.reffno,
+                            "payment_date": self.payment_date,
+                        }
+                        for line, order, amount_to_pay in allocation
+                    ]
+                )
+
+                remaining_amount = self.amount_paying - sum(
+                    amount_to_pay for line, order, amount_to_pay in allocation
+                )
+
+                # The entry of the whole payment goes on the booking of the
+                # last order paid, when it has one.
+                order = allocation[-1][1]
+                payment_line_vals = [
                     {
-                        "transaction_booking_id": order.transaction_booking_id.id,
                         "vendor_bulk_payment_id": self.id,
                         "description": f"Bulk payment for Vendor {self.vendor_id.name}",
                         "account_number": self.cash_account_id.id,
@@ -284,11 +353,8 @@ class VendorBulkPayment(models.Model):
                         "cr_amount": self.amount_paying,  # Use the total amount paying
                         "dr_amount": 0,
                         "transaction_date": self.payment_date,
-                    }
-                )
-                self.env["idil.transaction_bookingline"].create(
+                    },
                     {
-                        "transaction_booking_id": order.transaction_booking_id.id,
                         "vendor_bulk_payment_id": self.id,
                         "description": f"Bulk payment for Vendor {self.vendor_id.name}",
                         "account_number": self.vendor_id.account_payable_id.id,
@@ -296,8 +362,14 @@ class VendorBulkPayment(models.Model):
                         "dr_amount": self.amount_paying,
                         "cr_amount": 0,  # Use the total amount paying
                         "transaction_date": self.payment_date,
-                    }
-                )
+                    },
+                ]
+                if order.transaction_booking_id:
+                    order.transaction_booking_id.post_lines(payment_line_vals)
+                else:
+                    self.env["idil.transaction_bookingline"].create(
+                        payment_line_vals
+                    )
 
                 # Log any unused remaining amount
                 if remaining_amount > 0:
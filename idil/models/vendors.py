@@ -8,13 +8,19 @@ _logger = logging.getLogger(__name__)
 
 class Vendor(models.Model):
     _name = "idil.vendor.registration"
-    _inherit = ["mail.thread", "mail.activity.mixin"]
+    _inherit = ["mail.thread", "mail.activity.mixin", "idil.partner.balance.mixin"]
     _description = "Vendor Registration"
     _sql_constraints = [
         ("unique_email", "UNIQUE(email)", "The email must be unique."),
         ("unique_phone", "UNIQUE(phone)", "The phone number must be unique."),
     ]
 
+    _balance_field = "total_due_amount"
+    _balance_source = "idil.vendor_transaction"
+    _balance_key = "vendor_id"
+    _balance_columns = ("vendor_id", "remaining_amount")
+    _balance_expression = "COALESCE({row}.remaining_amount, 0)"
+
     # Basic Details
     name = fields.Char(string="Name", required=True, tracking=True)
     phone = fields.Char(string="Phone", required=True, tracking=True)
@@ -69,8 +75,10 @@ class Vendor(models.Model):
 
     total_due_amount = fields.Float(
         string="Total Due Amount",
-        compute="_compute_total_due_amount",
-        store=False,  # Change to True if you want it stored
+        readonly=True,
+        copy=False,
+        help="Remaining amount of the vendor transactions. Kept in sync by a "
+        "database trigger on idil.vendor_transaction.",
     )
 
     @api.onchange("currency_id")
@@ -79,13 +87,6 @@ class Vendor(models.Model):
         self.account_payable_id = False
         self.account_receivable_id = False
 
-    @api.depends("vendor_transaction_ids.remaining_amount")
-    def _compute_total_due_amount(self):
-        for vendor in self:
-            vendor.total_due_amount = sum(
-                vendor.vendor_transaction_ids.mapped("remaining_amount")
-            )
-
     @api.model
     def create(self, vals):
         vendor = super(Vendor, self).create(vals)
@@ -105,6 +106,66 @@ class Vendor(models.Model):
                     "Phone number must be at least 10 digits and contain only numbers."
                 )
 
+    @api.model
+    def get_balances(self, vendor_ids, as_of=None):
+        """Return the payable balance and its aging for the given vendors.
+
+        All vendors are computed with one grouped query over the booking
+        lines on their payable account. Lines belong to the vendor of their
+        booking, or to the vendor of the purchase order named by the
+        booking's ``order_number`` for bookings without a vendor. Payments
+        are included whether or not they are tied to an order.
+
+        Payments settle the oldest bills first, see ``_get_aged_balances``.
+
+        :return: ``{vendor_id: {"balance", "aging_current", "aging_31_60",
+            "aging_61_90", "aging_over_90"}}`` with ``balance`` as debit
+            minus credit and the buckets carrying the sign of the balance
+        """
+        vendor_ids = [v for v in set(vendor_ids) if v]
+        empty = dict.fromkeys(
+            (
+                "balance",
+                "aging_current",
+                "aging_31_60",
+                "aging_61_90",
+                "aging_over_90",
+            ),
+            0.0,
+        )
+        balances = {vendor_id: dict(empty) for vendor_id in vendor_ids}
+        if not vendor_ids:
+            return balances
+
+        self.env["idil.transaction_booking"].flush_model(["vendor_id", "order_number"])
+        self.env["idil.purchase_order"].flush_model(["vendor_id"])
+        self.flush_model(["account_payable_id"])
+
+        rows = self._get_aged_balances(
+            """
+            SELECT v.id AS partner_id, bl.id AS line_id
+            FROM idil_transaction_bookingline bl
+            JOIN idil_transaction_booking b ON b.id = bl.transaction_booking_id
+            LEFT JOIN idil_purchase_order po
+                ON b.vendor_id IS NULL AND b.order_number = po.id::text
+            JOIN idil_vendor_registration v
+                ON v.id = COALESCE(b.vendor_id, po.vendor_id)
+               AND v.account_payable_id = bl.account_number
+            WHERE v.id IN %(vendor_ids)s
+            """,
+            {"vendor_ids": tuple(vendor_ids)},
+            as_of,
+        )
+        for vendor_id, (balance, current, days_60, days_90, older) in rows.items():
+            balances[vendor_id] = {
+                "balance": balance,
+                "aging_current": current,
+                "aging_31_60": days_60,
+                "aging_61_90": days_90,
+                "aging_over_90": older,
+            }
+        return balances
+
     # Method to set vendor as inactive
     def set_inactive(self):
         self.active = False
@@ -127,25 +188,19 @@ class VendorBalanceReport(models.TransientModel):
     balance = fields.Float(
         string="Balance", store=True
     )  # Assuming you want to store and display this field
+    as_of_date = fields.Date(string="As of Date")
+    aging_current = fields.Float(string="0-30 Days")
+    aging_31_60 = fields.Float(string="31-60 Days")
+    aging_61_90 = fields.Float(string="61-90 Days")
+    aging_over_90 = fields.Float(string="Over 90 Days")
 
     @api.model
-    def generate_vendor_balances_report(self):
+    def generate_vendor_balances_report(self, as_of_date=None):
         self.search([]).unlink()  # Clear existing records to avoid stale data
-        account_balances = self._get_vendor_balances()
-        for balance in account_balances:
-            self.create(
-                {
-                    "vendor_id": balance["vendor_id"],
-                    "vendor_name": balance["vendor_name"],
-                    "vendor_tel": balance["vendor_tel"],
-                    "account_id": balance["account_id"],
-                    "account_name": balance["account_name"],
-                    "account_code": balance["account_code"],
-                    "balance": balance[
-                        "balance"
-                    ],  # Make sure to store the calculated balance here
-                }
-            )
+        account_balances = self._get_vendor_balances(as_of_date)
+        self.create(
+            [dict(balance, as_of_date=as_of_date) for balance in account_balances]
+        )
 
         return {
             "type": "ir.actions.act_window",
@@ -159,74 +214,40 @@ class VendorBalanceReport(models.TransientModel):
             "target": "new",
         }
 
-    def _get_vendor_balances(self):
-        vendor_balances = []
-        vendor_personnel = self.env["idil.vendor.registration"].search(
-            [("active", "=", True)]
-        )
-        for vendor in vendor_personnel:
-            # Initialize balance for each salesperson.
-            booking_lines_balance = 0
-            purchase_orders = self.env["idil.purchase_order"].search(
-                [("vendor_id", "=", vendor.id)]
-            )
-            for order in purchase_orders:
-                bookings = self.env["idil.transaction_booking"].search(
-                    [("order_number", "=", order.id)]
-                )
-                for booking in bookings:
-                    # Filter booking lines by account number equal to salesperson's receivable account.
-                    booking_lines = self.env["idil.transaction_bookingline"].search(
-                        [
-                            ("transaction_booking_id", "=", booking.id),
-                            ("account_number", "=", vendor.account_payable_id.id),
-                        ]
-                    )
-                    # Calculate debit and credit sums for filtered booking lines.
-                    debit = sum(
-                        booking_lines.filtered(
-                            lambda r: r.transaction_type == "dr"
-                        ).mapped("dr_amount")
-                    )
-                    credit = sum(
-                        booking_lines.filtered(
-                            lambda r: r.transaction_type == "cr"
-                        ).mapped("cr_amount")
-                    )
-                    booking_lines_balance += debit - credit
-
-            # Debugging: Log the calculated balance for each salesperson.
-            _logger.debug(
-                f"Vendor Person: {vendor.name}, Balance: {booking_lines_balance}"
-            )
+    def _get_vendor_balances(self, as_of_date=None):
+        vendors = self.env["idil.vendor.registration"].search([("active", "=", True)])
+        balances = vendors.get_balances(vendors.ids, as_of_date)
 
+        vendor_balances = []
+        for vendor in vendors:
+            account = vendor.account_payable_id
             vendor_balances.append(
-                {
-                    "vendor_id": vendor.id,
-                    "vendor_name": vendor.name,
-                    "vendor_tel": vendor.phone,
-                    "account_id": (
-                        vendor.account_payable_id.id
-                        if vendor.account_payable_id
-                        else ""
-                    ),
-                    "account_name": (
-                        vendor.account_payable_id.name
-                        if vendor.account_payable_id
-                        else False
-                    ),
-                    "account_code": (
-                        vendor.account_payable_id.code
-                        if vendor.account_payable_id
-                        else ""
-                    ),
-                    "balance": booking_lines_balance,
-                }
+                dict(
+                    balances[vendor.id],
+                    vendor_id=vendor.id,
+                    vendor_name=vendor.name,
+                    vendor_tel=vendor.phone,
+                    account_id=account.id,
+                    account_name=account.name or "",
+                    account_code=account.code or "",
+                )
             )
 
         return vendor_balances
 
 
+class VendorBalanceWizard(models.TransientModel):
+    _name = "idil.vendor.balance.report.wizard"
+    _inherit = "idil.partner.balance.report.wizard"
+    _description = "Vendor Balance Report Wizard"
+
+    def action_generate_report(self):
+        self.ensure_one()
+        return self.env["idil.vendor.balance.report"].generate_vendor_balances_report(
+            self.as_of_date
+        )
+
+
 class VendorTransactionReport(models.TransientModel):
     _name = "idil.vendor.transaction.report"
     _description = "Vendor Transaction Report"